@@ -4,294 +4,83 @@ DRX Trading Tracker - Production Version
 KEINE DEMO-DATEN - Nur Live-Trading oder Import
 """
 
+import sys
+import time
+
+# Startzeitpunkt für die Startup-Messung (startup_benchmark.py)
+_MODULE_START = time.perf_counter()
+
+# Headless-Modus: vor allen GUI-/Plotting-Imports verzweigen
+if __name__ == "__main__" and "--headless" in sys.argv:
+    from drx_headless import main as headless_main
+    sys.exit(headless_main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import json
-import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
 from datetime import datetime, timedelta
-import requests
+import importlib
 import threading
-import time
 import os
 import platform
 import webbrowser
 import subprocess
-import sys
+import multiprocessing
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
-# System-spezifische Imports
-SYSTEM = platform.system()
-winshell_available = False
-mt5_available = False
+from drx_core import (
+    SYSTEM, APP_VERSION, APP_NAME, data_dir, DATABASE_FILE, CONFIG_FILE, ALERT_LOG_FILE,
+    MARKET_DATA_DIR, SNAPSHOT_FILE, Trade, TradeFilter, DatabaseManager, MT5Connector,
+    SymbolCache, sync_open_trades, archive_cutoff
+)
+from drx_alerts import Alert, AlertEngine, LogSink
+from drx_backup import BackupManager, BackupResult, format_size
+from drx_exposure import ExposureEngine
+from drx_snapshot import TRADES_PAGE, load_snapshot, save_snapshot
 
-if SYSTEM == "Windows":
-    try:
-        import winshell
-        winshell_available = True
-    except ImportError:
-        winshell_available = False
-    
-    try:
-        import MetaTrader5
-        mt5_available = True
-    except ImportError:
-        mt5_available = False
+# Schwere Module (numpy, pandas, matplotlib) erst nach dem ersten Frame laden.
+# Analytics, Marktdaten und Monte Carlo importieren numpy beim Laden.
+PREFETCH_MODULES = (
+    "numpy",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+    "drx_analytics",
+    "drx_montecarlo",
+    "drx_excursions",
+    "pandas",
+)
 
-# Konfiguration
-APP_VERSION = "1.2.1"
-APP_NAME = "DRX Trading Tracker"
+# Umgebungsvariablen für startup_benchmark.py
+STARTUP_PROBE_ENV = "DRX_STARTUP_PROBE"
+STARTUP_T0_ENV = "DRX_STARTUP_T0"
 
-# Platform-spezifische Pfade
-if SYSTEM == "Windows":
-    data_dir = Path.home() / "Documents" / "DRX Trading Tracker"
-elif SYSTEM == "Darwin":
-    data_dir = Path.home() / "Documents" / "DRX Trading Tracker"
-else:
-    data_dir = Path.home() / ".drx_trading_tracker"
+# Trades-Tabelle: sortierbare Spalten -> indizierte DB-Spalte
+TRADE_SORT_COLUMNS = {
+    'ID': 'id',
+    'Eröffnet': 'open_time',
+    'Symbol': 'symbol',
+    'Lots': 'lots',
+    'P&L': 'profit',
+}
+DEFAULT_TRADE_SORT = ('open_time', True)
+TRADE_STATUS_CHOICES = ('Alle', 'open', 'closed')
+# Wartezeit nach der letzten Eingabe in der Filterleiste
+FILTER_DEBOUNCE_MS = 250
 
-data_dir.mkdir(parents=True, exist_ok=True)
+# Konto-Verlauf im Dashboard: Zeitraum -> Sekunden (die DB wählt die passende Stufe)
+ACCOUNT_CHART_RANGES = {
+    '1 Tag': 86400,
+    '1 Woche': 7 * 86400,
+    '1 Monat': 30 * 86400,
+    '1 Jahr': 365 * 86400,
+    'Alles': 20 * 365 * 86400,
+}
+ACCOUNT_TIER_LABELS = {0: 'Rohwerte', 60: '1 min', 3600: '1 h', 86400: '1 Tag'}
+ACCOUNT_CHART_POINTS = 1500
+# Sekunden zwischen zwei Aktualisierungen des Konto-Charts durch den Auto-Sync
+ACCOUNT_CHART_REFRESH = 60
 
-DATABASE_FILE = str(data_dir / "drx_trades.db")
-CONFIG_FILE = str(data_dir / "drx_config.json")
-LOG_FILE = str(data_dir / "drx_log.txt")
-
-@dataclass
-class Trade:
-    """Trade-Datenklasse"""
-    id: str
-    symbol: str
-    type: str
-    lots: float
-    open_price: float
-    close_price: Optional[float] = None
-    open_time: Optional[datetime] = None
-    close_time: Optional[datetime] = None
-    profit: float = 0.0
-    commission: float = 0.0
-    swap: float = 0.0
-    comment: str = ""
-    magic: int = 0
-    status: str = "open"
-
-class DatabaseManager:
-    """Datenbank-Manager"""
-    
-    def __init__(self, db_file: str = DATABASE_FILE):
-        self.db_file = db_file
-        self.init_database()
-    
-    def init_database(self):
-        """Datenbank initialisieren"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    id TEXT PRIMARY KEY,
-                    symbol TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    lots REAL NOT NULL,
-                    open_price REAL NOT NULL,
-                    close_price REAL,
-                    open_time TEXT,
-                    close_time TEXT,
-                    profit REAL DEFAULT 0,
-                    commission REAL DEFAULT 0,
-                    swap REAL DEFAULT 0,
-                    comment TEXT,
-                    magic INTEGER DEFAULT 0,
-                    status TEXT DEFAULT 'open'
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            print(f"Datenbank-Fehler: {e}")
-    
-    def save_trade(self, trade: Trade):
-        """Trade speichern"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO trades 
-                (id, symbol, type, lots, open_price, close_price, open_time, close_time, 
-                 profit, commission, swap, comment, magic, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                trade.id, trade.symbol, trade.type, trade.lots, trade.open_price,
-                trade.close_price, 
-                trade.open_time.isoformat() if trade.open_time else None,
-                trade.close_time.isoformat() if trade.close_time else None,
-                trade.profit, trade.commission, trade.swap, trade.comment, 
-                trade.magic, trade.status
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            print(f"Trade-Speichern Fehler: {e}")
-    
-    def get_all_trades(self) -> List[Trade]:
-        """Alle Trades laden"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM trades ORDER BY open_time DESC')
-            rows = cursor.fetchall()
-            conn.close()
-            
-            trades = []
-            for row in rows:
-                trade = Trade(
-                    id=row[0], symbol=row[1], type=row[2], lots=row[3],
-                    open_price=row[4], close_price=row[5],
-                    open_time=datetime.fromisoformat(row[6]) if row[6] else None,
-                    close_time=datetime.fromisoformat(row[7]) if row[7] else None,
-                    profit=row[8], commission=row[9], swap=row[10],
-                    comment=row[11], magic=row[12], status=row[13]
-                )
-                trades.append(trade)
-            
-            return trades
-            
-        except Exception as e:
-            print(f"Trade-Laden Fehler: {e}")
-            return []
-
-class BrokerConnector:
-    """Basis-Klasse für Broker-Verbindungen"""
-    
-    def __init__(self, broker_name: str):
-        super().__init__()
-        self.broker_name = broker_name
-        self.connected = False
-        self.account_info = {}
-        self.credentials = {}
-        self.system = SYSTEM
-    
-    def connect(self, credentials: Dict) -> bool:
-        """Verbindung herstellen"""
-        self.credentials = credentials
-        return True
-    
-    def disconnect(self):
-        """Verbindung trennen"""
-        self.connected = False
-        self.account_info = {}
-    
-    def get_account_info(self) -> Dict:
-        """Account-Info"""
-        return self.account_info
-    
-    def get_open_trades(self) -> List[Trade]:
-        """Offene Trades"""
-        return []
-
-class MT5Connector(BrokerConnector):
-    """MetaTrader 5 Connector"""
-    
-    def __init__(self):
-        super().__init__("MetaTrader 5")
-        self.mt5_available = mt5_available
-        self.mt5 = None
-        
-        if SYSTEM == "Windows" and mt5_available:
-            try:
-                import MetaTrader5 as mt5
-                self.mt5 = mt5
-                self.mt5_available = True
-                print("✅ MT5 verfügbar")
-            except ImportError as e:
-                print(f"❌ MT5 Fehler: {e}")
-                self.mt5_available = False
-        else:
-            print(f"ℹ️ MT5 nur unter Windows (aktuell: {SYSTEM})")
-    
-    def connect(self, credentials: Dict) -> bool:
-        """MT5 Verbindung"""
-        if not self.mt5_available or self.mt5 is None:
-            print(f"❌ MT5 nicht verfügbar unter {SYSTEM}!")
-            return False
-        
-        try:
-            if not self.mt5.initialize():
-                error_code = self.mt5.last_error()
-                print(f"❌ MT5 Init fehlgeschlagen: {error_code}")
-                return False
-            
-            account = int(credentials.get('account', ''))
-            password = credentials.get('password', '')
-            server = credentials.get('server', '')
-            
-            if not self.mt5.login(account, password=password, server=server):
-                error_code = self.mt5.last_error()
-                print(f"❌ MT5 Login fehlgeschlagen: {error_code}")
-                return False
-            
-            account_info = self.mt5.account_info()
-            if account_info is None:
-                print("❌ Kontoinfo nicht verfügbar!")
-                return False
-            
-            self.connected = True
-            self.account_info = account_info._asdict()
-            
-            print(f"✅ MT5 VERBUNDEN!")
-            print(f"   Account: {self.account_info.get('login')}")
-            print(f"   Balance: €{self.account_info.get('balance', 0):.2f}")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ MT5 Verbindung: {e}")
-            return False
-    
-    def get_open_trades(self) -> List[Trade]:
-        """MT5 Trades laden"""
-        if not self.connected or not self.mt5_available or self.mt5 is None:
-            return []
-        
-        try:
-            positions = self.mt5.positions_get()
-            if positions is None:
-                return []
-            
-            trades = []
-            for pos in positions:
-                trade = Trade(
-                    id=str(pos.ticket),
-                    symbol=pos.symbol,
-                    type='buy' if pos.type == 0 else 'sell',
-                    lots=pos.volume,
-                    open_price=pos.price_open,
-                    open_time=datetime.fromtimestamp(pos.time),
-                    profit=pos.profit,
-                    commission=pos.commission,
-                    swap=pos.swap,
-                    comment=pos.comment,
-                    magic=pos.magic,
-                    status='open'
-                )
-                trades.append(trade)
-            
-            return trades
-            
-        except Exception as e:
-            print(f"❌ Trade-Laden: {e}")
-            return []
 
 def open_file_manager(path: Path):
     """Datei-Manager öffnen"""
@@ -305,6 +94,39 @@ def open_file_manager(path: Path):
     except Exception as e:
         print(f"Datei-Manager Fehler: {e}")
 
+class ModulePrefetcher:
+    """Module im Hintergrund-Thread importieren, während die UI schon läuft"""
+    
+    def __init__(self, modules=PREFETCH_MODULES):
+        self.modules = modules
+        self.done = threading.Event()
+        self.seconds = 0.0
+    
+    def start(self):
+        threading.Thread(target=self.run, name="prefetch", daemon=True).start()
+    
+    def run(self):
+        start = time.perf_counter()
+        for name in self.modules:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Prefetch Fehler ({name}): {e}")
+        self.seconds = time.perf_counter() - start
+        self.done.set()
+
+class LazyTab:
+    """Notebook-Tab, dessen Inhalt erst beim ersten Anzeigen gebaut wird"""
+    
+    def __init__(self, frame: ttk.Frame, build: Callable[[ttk.Frame], None],
+                 refresh: Optional[Callable[[], bool]] = None):
+        self.frame = frame
+        self.build = build
+        self.refresh = refresh
+        self.built = False
+        # Daten geändert, seit der Tab zuletzt aktualisiert wurde
+        self.dirty = True
+
 class DRXTradingApp:
     """DRX Trading Tracker Main App"""
     
@@ -315,6 +137,7 @@ class DRXTradingApp:
         
         # Instanzvariablen initialisieren
         self.notebook: Optional[ttk.Notebook] = None
+        self.lazy_tabs: Dict[str, LazyTab] = {}
         self.connection_status: Optional[ttk.Label] = None
         self.broker_var: Optional[tk.StringVar] = None
         self.details_frame: Optional[ttk.LabelFrame] = None
@@ -323,16 +146,58 @@ class DRXTradingApp:
         self.password_entry: Optional[ttk.Entry] = None
         self.server_entry: Optional[ttk.Entry] = None
         self.info_labels: Dict[str, ttk.Label] = {}
+        self.rolling_labels: Dict[int, ttk.Label] = {}
+        self.rolling_frame: Optional[ttk.LabelFrame] = None
+        self.rolling = None
+        self.chart_frame: Optional[ttk.LabelFrame] = None
         self.fig = None
         self.ax = None
+        self.monte_carlo = None  # letztes Simulationsergebnis (Bänder im Equity-Chart)
+        self.account_ax = None
+        self.account_range_var: Optional[tk.StringVar] = None
         self.canvas = None
         self.trades_tree: Optional[ttk.Treeview] = None
+        self.trades_filter_vars: Dict[str, tk.StringVar] = {}
+        self.trades_count_label: Optional[ttk.Label] = None
+        self.trades_more_btn: Optional[ttk.Button] = None
+        self.breakdown_tree: Optional[ttk.Treeview] = None
+        self.breakdown_var: Optional[tk.StringVar] = None
+        self.exposure_tree: Optional[ttk.Treeview] = None
+        self.exposure_label: Optional[ttk.Label] = None
+        self.backup_progress: Optional[ttk.Progressbar] = None
+        self.backup_label: Optional[ttk.Label] = None
+        
+        # Lazy Loading: Kennzahlen und Chart erst nach dem Prefetch
+        self.prefetcher = ModulePrefetcher()
+        self.analytics_ready = False
+        self.startup_probe = os.environ.get(STARTUP_PROBE_ENV) == "1"
+        
+        # Dashboard-Snapshot: zuletzt angezeigte Daten + Generation der trades-Tabelle
+        self.snapshot: Optional[Dict] = None
+        self.snapshot_data: Dict = {}
+        self.snapshot_valid = False
+        self.data_generation: Optional[int] = None
+        
+        # Trades-Tabelle: Sortierung, Seitenschlüssel und laufende Abfrage
+        self.trades_sort = DEFAULT_TRADE_SORT
+        self.trades_next_key: Optional[tuple] = None
+        self.trades_total = 0
+        self.trades_query_id = 0
+        self.trades_cancel: Optional[threading.Event] = None
+        self.trades_debounce: Optional[str] = None
         
         # Icon laden
         self.load_icon()
         
         # Core Components
         self.db = DatabaseManager()
+        self.symbol_cache = SymbolCache(self.db)
+        self.exposure = ExposureEngine(self.symbol_cache)
+        self.config: Dict = {}
+        self.alerts = AlertEngine([])
+        self.backups = BackupManager(DATABASE_FILE)
+        self.market_data = None
+        self.excursions = None
         self.connector = None
         self.auto_sync = False
         self.sync_thread = None
@@ -341,6 +206,7 @@ class DRXTradingApp:
         self.setup_styles()
         self.create_widgets()
         self.load_config()
+        self.load_dashboard_snapshot()
         
         # Auto-Sync für Windows
         if SYSTEM == "Windows":
@@ -389,9 +255,50 @@ class DRXTradingApp:
         self.notebook.pack(fill='both', expand=True, pady=10)
         
         self.create_connection_tab()
-        self.create_dashboard_tab()
-        self.create_trades_tab()
-        self.create_settings_tab()
+        
+        # Restliche Tabs erst beim ersten Anzeigen aufbauen
+        self.add_lazy_tab('dashboard', '📊 Dashboard', self.create_dashboard_tab,
+                          self.refresh_dashboard)
+        self.add_lazy_tab('trades', '📈 Trades', self.create_trades_tab, self.refresh_trades)
+        self.add_lazy_tab('breakdown', '🧩 Aufschlüsselung', self.create_breakdown_tab,
+                          self.refresh_breakdown)
+        self.add_lazy_tab('settings', '⚙️ Einstellungen', self.create_settings_tab)
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+    
+    def add_lazy_tab(self, name: str, text: str, build: Callable[[ttk.Frame], None],
+                     refresh: Optional[Callable[[], bool]] = None):
+        """Leeren Tab anlegen, Inhalt folgt in on_tab_changed"""
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        self.lazy_tabs[name] = LazyTab(frame, build, refresh)
+    
+    def current_lazy_tab(self) -> Optional[LazyTab]:
+        if not self.notebook:
+            return None
+        selected = self.notebook.select()
+        return next((tab for tab in self.lazy_tabs.values() if str(tab.frame) == selected), None)
+    
+    def on_tab_changed(self, event=None):
+        """Tab beim ersten Anzeigen bauen und veraltete Daten nachladen"""
+        tab = self.current_lazy_tab()
+        if tab is None:
+            return
+        
+        if not tab.built:
+            tab.build(tab.frame)
+            tab.built = True
+        self.refresh_current_tab()
+    
+    def refresh_current_tab(self):
+        """Nur den sichtbaren Tab aktualisieren, wenn er veraltet ist"""
+        tab = self.current_lazy_tab()
+        if tab is None or not tab.built or not tab.dirty or tab.refresh is None:
+            return
+        
+        # refresh() liefert False, wenn noch nicht alles geladen werden konnte
+        if tab.refresh() is not False:
+            tab.dirty = False
     
     def create_header(self, parent):
         """Header"""
@@ -522,11 +429,8 @@ class DRXTradingApp:
                 justify='left')
             csv_info.pack(pady=10)
     
-    def create_dashboard_tab(self):
+    def create_dashboard_tab(self, dash_frame: ttk.Frame):
         """Dashboard"""
-        dash_frame = ttk.Frame(self.notebook)
-        self.notebook.add(dash_frame, text='📊 Dashboard')
-        
         # Account Info
         account_frame = ttk.LabelFrame(dash_frame, text="Account Overview", padding=20)
         account_frame.pack(fill='x', padx=20, pady=20)
@@ -538,7 +442,13 @@ class DRXTradingApp:
             ("Trades gesamt:", "total_trades"),
             ("Offene Positionen:", "open_positions"),
             ("Gewinn-Rate:", "win_rate"),
-            ("Gesamt P&L:", "total_pnl")
+            ("Gesamt P&L:", "total_pnl"),
+            ("Profit Factor:", "profit_factor"),
+            ("Erwartungswert:", "expectancy"),
+            ("Ø Gewinn / Verlust:", "avg_win_loss"),
+            ("Max. Drawdown:", "max_drawdown"),
+            ("Sharpe / Sortino:", "sharpe_sortino"),
+            ("Serien (W/L):", "streaks")
         ]
         
         self.info_labels = {}
@@ -553,11 +463,30 @@ class DRXTradingApp:
             label.grid(row=row, column=col+1, sticky='w', padx=10, pady=5)
             self.info_labels[key] = label
         
-        # Performance Chart
-        chart_frame = ttk.LabelFrame(dash_frame, text="Performance", padding=20)
-        chart_frame.pack(fill='both', expand=True, padx=20, pady=20)
+        # Offene Positionen: Exposure je Symbol (vom Auto-Sync nachgeführt)
+        exposure_frame = ttk.LabelFrame(dash_frame, text="Exposure", padding=10)
+        exposure_frame.pack(fill='x', padx=20, pady=(0, 10))
+        
+        self.exposure_label = ttk.Label(exposure_frame, text="Keine offenen Positionen")
+        self.exposure_label.pack(anchor='w', pady=(0, 5))
+        
+        columns = ('Symbol', 'Positionen', 'Netto-Lots', 'Long', 'Short', 'Offene P&L', 'Margin (geschätzt)')
+        self.exposure_tree = ttk.Treeview(exposure_frame, columns=columns, show='headings', height=4)
+        for col in columns:
+            self.exposure_tree.heading(col, text=col)
+            self.exposure_tree.column(col, width=120)
+        self.exposure_tree.tag_configure('profit', foreground='#00C851')
+        self.exposure_tree.tag_configure('loss', foreground='#ff4444')
+        self.exposure_tree.pack(fill='x')
+        self.show_exposure()
+        
+        # Performance Chart (Inhalt folgt nach dem Prefetch, siehe create_analytics_widgets)
+        self.chart_frame = ttk.LabelFrame(dash_frame, text="Performance", padding=20)
+        self.chart_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
-        self.create_performance_chart(chart_frame)
+        # Rollierende Kennzahlen neben der Equity-Kurve
+        self.rolling_frame = ttk.LabelFrame(self.chart_frame, text="Rollierend", padding=10)
+        self.rolling_frame.pack(side='right', fill='y', padx=(10, 0))
         
         # Actions
         actions_frame = ttk.Frame(dash_frame)
@@ -566,24 +495,88 @@ class DRXTradingApp:
         ttk.Button(actions_frame, text="🔄 Aktualisieren", 
                   command=self.refresh_all_data).pack(side='left', padx=10)
         
+        ttk.Button(actions_frame, text="🎲 Monte Carlo", 
+                  command=self.run_monte_carlo).pack(side='left', padx=10)
+        
         ttk.Button(actions_frame, text="📁 Daten-Ordner", 
                   command=lambda: open_file_manager(data_dir)).pack(side='left', padx=10)
+        
+        ttk.Label(actions_frame, text="Konto-Verlauf:").pack(side='left', padx=(30, 5))
+        self.account_range_var = tk.StringVar(value='1 Tag')
+        account_range = ttk.Combobox(actions_frame, textvariable=self.account_range_var,
+                                     values=list(ACCOUNT_CHART_RANGES), state='readonly', width=10)
+        account_range.pack(side='left')
+        account_range.bind('<<ComboboxSelected>>', lambda e: self.update_account_chart())
+        
+        if self.analytics_ready:
+            self.create_analytics_widgets()
+    
+    def show_exposure(self):
+        """Exposure-Summen anzeigen (Kopie der Summen - unabhängig von der Anzahl Positionen)"""
+        if not self.exposure_tree or not self.exposure_label:
+            return
+        
+        snapshot = self.exposure.snapshot()
+        if not snapshot.positions:
+            self.exposure_label.config(text="Keine offenen Positionen")
+        else:
+            parts = [f"{snapshot.positions} Positionen", f"Offene P&L: €{snapshot.unrealized:.2f}"]
+            if snapshot.margin_usage is not None:
+                parts.append(f"Margin: {snapshot.margin_usage:.1f}% der Equity")
+            largest = sorted(snapshot.currencies.items(), key=lambda item: -abs(item[1]))[:4]
+            if largest:
+                parts.append("Netto: " + ", ".join(f"{currency} {amount:+,.0f}" for currency, amount in largest))
+            if snapshot.unknown_symbols:
+                parts.append(f"ohne Symbol-Daten: {', '.join(snapshot.unknown_symbols)}")
+            self.exposure_label.config(text="   |   ".join(parts))
+        
+        self.exposure_tree.delete(*self.exposure_tree.get_children())
+        for symbol in sorted(snapshot.symbols):
+            entry = snapshot.symbols[symbol]
+            tag = 'profit' if entry.unrealized > 0 else 'loss' if entry.unrealized < 0 else ''
+            self.exposure_tree.insert('', 'end', values=(
+                symbol,
+                entry.positions,
+                f"{entry.net_lots:+.2f}",
+                f"{entry.long_lots:.2f}",
+                f"{entry.short_lots:.2f}",
+                f"€{entry.unrealized:.2f}",
+                f"{entry.margin:,.2f} {entry.margin_currency}" if entry.margin_currency else "-"
+            ), tags=(tag,) if tag else ())
+    
+    def create_analytics_widgets(self):
+        """Rollierende Kennzahlen und Chart (benötigen numpy/matplotlib)"""
+        from drx_analytics import RollingMetrics
+        
+        self.rolling = RollingMetrics()
+        self.rolling_labels = {}
+        if self.rolling_frame:
+            for size in self.rolling.windows:
+                ttk.Label(self.rolling_frame, text=f"Letzte {size} Trades",
+                          font=('Arial', 10, 'bold')).pack(anchor='w', pady=(5, 0))
+                label = ttk.Label(self.rolling_frame, text="-", justify='left')
+                label.pack(anchor='w')
+                self.rolling_labels[size] = label
+        
+        if self.chart_frame:
+            self.create_performance_chart(self.chart_frame)
     
     def create_performance_chart(self, parent):
         """Performance Chart"""
-        self.fig, self.ax = plt.subplots(figsize=(10, 4))
+        # Figure statt pyplot: kein globaler Figure-Manager, schnellerer Import
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        self.fig = Figure(figsize=(10, 4))
+        # Links P&L aus den Trades, rechts Balance/Equity aus dem Konto-Verlauf
+        self.ax, self.account_ax = self.fig.subplots(1, 2, gridspec_kw={'width_ratios': (3, 2)})
         self.fig.patch.set_facecolor('white')
         
         self.canvas = FigureCanvasTkAgg(self.fig, parent)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
-        
-        self.update_performance_chart()
     
-    def create_trades_tab(self):
+    def create_trades_tab(self, trades_frame: ttk.Frame):
         """Trades Tab"""
-        trades_frame = ttk.Frame(self.notebook)
-        self.notebook.add(trades_frame, text='📈 Trades')
-        
         # Controls
         controls_frame = ttk.Frame(trades_frame)
         controls_frame.pack(fill='x', padx=20, pady=10)
@@ -597,16 +590,58 @@ class DRXTradingApp:
         ttk.Button(controls_frame, text="📁 Import", 
                   command=self.import_trades).pack(side='left', padx=10)
         
+        # Filterleiste (Datum als JJJJ-MM-TT, "Bis" inklusive).
+        # Mit Suchbegriff nach Relevanz sortiert (Volltextsuche im Kommentar)
+        filter_frame = ttk.Frame(trades_frame)
+        filter_frame.pack(fill='x', padx=20)
+        
+        self.trades_filter_vars = {
+            'text': tk.StringVar(),
+            'symbol': tk.StringVar(),
+            'date_from': tk.StringVar(),
+            'date_to': tk.StringVar(),
+            'status': tk.StringVar(value=TRADE_STATUS_CHOICES[0]),
+            'min_pnl': tk.StringVar(),
+        }
+        
+        for label, name, width in [("🔎 Suche:", 'text', 20), ("Symbol:", 'symbol', 12),
+                                   ("Von:", 'date_from', 11), ("Bis:", 'date_to', 11)]:
+            ttk.Label(filter_frame, text=label).pack(side='left', padx=(10, 2))
+            ttk.Entry(filter_frame, textvariable=self.trades_filter_vars[name],
+                     width=width).pack(side='left')
+        
+        ttk.Label(filter_frame, text="Status:").pack(side='left', padx=(10, 2))
+        ttk.Combobox(filter_frame, textvariable=self.trades_filter_vars['status'],
+                    values=TRADE_STATUS_CHOICES, state='readonly', width=8).pack(side='left')
+        
+        ttk.Label(filter_frame, text="Min. P&L:").pack(side='left', padx=(10, 2))
+        ttk.Entry(filter_frame, textvariable=self.trades_filter_vars['min_pnl'],
+                 width=10).pack(side='left')
+        
+        for var in self.trades_filter_vars.values():
+            var.trace_add('write', self.on_trades_filter_changed)
+        
+        self.trades_count_label = ttk.Label(filter_frame, text="")
+        self.trades_count_label.pack(side='right', padx=10)
+        
         # Trades Table
         table_frame = ttk.Frame(trades_frame)
         table_frame.pack(fill='both', expand=True, padx=20, pady=10)
         
-        columns = ('ID', 'Symbol', 'Typ', 'Lots', 'Entry', 'Exit', 'P&L', 'Status')
+        columns = ('ID', 'Eröffnet', 'Symbol', 'Typ', 'Lots', 'Entry', 'Exit', 'P&L', 'Status')
         self.trades_tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=15)
         
         for col in columns:
-            self.trades_tree.heading(col, text=col)
-            self.trades_tree.column(col, width=100)
+            if col in TRADE_SORT_COLUMNS:
+                self.trades_tree.heading(col, text=col,
+                                         command=lambda c=col: self.sort_trades_by(c))
+            else:
+                self.trades_tree.heading(col, text=col)
+            self.trades_tree.column(col, width=130 if col == 'Eröffnet' else 100)
+        self.update_trades_headings()
+        
+        self.trades_tree.tag_configure('profit', foreground='#00C851')
+        self.trades_tree.tag_configure('loss', foreground='#ff4444')
         
         # Scrollbars
         v_scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.trades_tree.yview)
@@ -617,12 +652,47 @@ class DRXTradingApp:
         
         table_frame.rowconfigure(0, weight=1)
         table_frame.columnconfigure(0, weight=1)
+        
+        self.trades_more_btn = ttk.Button(trades_frame, text="⬇️ Mehr laden",
+                                          command=self.load_more_trades, state='disabled')
+        self.trades_more_btn.pack(pady=(0, 10))
     
-    def create_settings_tab(self):
-        """Settings"""
-        settings_frame = ttk.Frame(self.notebook)
-        self.notebook.add(settings_frame, text='⚙️ Einstellungen')
+    def create_breakdown_tab(self, breakdown_frame: ttk.Frame):
+        """Aufschlüsselung nach Symbol / Magic / Stunde / Wochentag"""
+        # Controls
+        controls_frame = ttk.Frame(breakdown_frame)
+        controls_frame.pack(fill='x', padx=20, pady=10)
+        
+        ttk.Label(controls_frame, text="Gruppieren nach:").pack(side='left', padx=10)
+        
+        self.breakdown_var = tk.StringVar(value="symbol")
+        for text, value in [("Symbol", "symbol"), ("Magic", "magic"),
+                            ("Stunde", "hour"), ("Wochentag", "weekday")]:
+            ttk.Radiobutton(controls_frame, text=text, variable=self.breakdown_var,
+                           value=value, command=self.refresh_breakdown).pack(side='left', padx=5)
+        
+        # Tabelle
+        table_frame = ttk.Frame(breakdown_frame)
+        table_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        columns = ('Gruppe', 'Trades', 'Gewinn-Rate', 'P&L', 'Erwartung', 'Profit Factor')
+        self.breakdown_tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=15)
+        
+        for col in columns:
+            self.breakdown_tree.heading(col, text=col)
+            self.breakdown_tree.column(col, width=120)
+        
+        v_scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.breakdown_tree.yview)
+        self.breakdown_tree.configure(yscrollcommand=v_scrollbar.set)
+        
+        self.breakdown_tree.grid(row=0, column=0, sticky='nsew')
+        v_scrollbar.grid(row=0, column=1, sticky='ns')
         
+        table_frame.rowconfigure(0, weight=1)
+        table_frame.columnconfigure(0, weight=1)
+    
+    def create_settings_tab(self, settings_frame: ttk.Frame):
+        """Settings"""
         # System
         system_frame = ttk.LabelFrame(settings_frame, text="System", padding=20)
         system_frame.pack(fill='x', padx=20, pady=20)
@@ -633,6 +703,15 @@ class DRXTradingApp:
         ttk.Button(system_frame, text="💾 Backup", 
                   command=self.create_backup).pack(side='left', padx=10)
         
+        # Fortschritt des laufenden Backups (manuell oder automatisch)
+        self.backup_progress = ttk.Progressbar(system_frame, length=200, mode='determinate')
+        self.backup_progress.pack(side='left', padx=10)
+        self.backup_label = ttk.Label(system_frame, text=self.backup_status())
+        self.backup_label.pack(side='left', padx=10)
+        
+        ttk.Button(system_frame, text="🗄️ Archivieren", 
+                  command=self.archive_old_trades).pack(side='left', padx=10)
+        
         # About
         about_frame = ttk.LabelFrame(settings_frame, text="Über", padding=20)
         about_frame.pack(fill='x', padx=20, pady=20)
@@ -684,10 +763,15 @@ Professional Trading Journal
                 return
             
             if self.connector.connect(credentials):
+                self.init_market_data()
+                self.market_data.set_source(self.connector.mt5)
                 if self.connection_status:
                     self.connection_status.config(text="✅ MT5 Verbunden", style='Success.TLabel')
                 messagebox.showinfo("Erfolg", "MT5 erfolgreich verbunden!")
+                self.symbol_cache.refresh_async(
+                    self.connector, lambda: self.root.after(0, self.on_symbols_refreshed))
                 self.refresh_all_data()
+                self.update_excursions_async()
                 if self.notebook:
                     self.notebook.select(1)  # Dashboard
             else:
@@ -696,112 +780,520 @@ Professional Trading Journal
         except Exception as e:
             messagebox.showerror("Fehler", f"Verbindungsfehler: {str(e)}")
     
+    def on_symbols_refreshed(self):
+        """Neue Symbol-Metadaten: Trades-Tabelle mit den richtigen Nachkommastellen neu zeichnen"""
+        if 'trades' in self.lazy_tabs:
+            self.lazy_tabs['trades'].dirty = True
+            self.refresh_current_tab()
+    
+    def init_market_data(self):
+        """Marktdaten-Cache und MAE/MFE erst bei Bedarf anlegen (numpy)"""
+        if self.market_data is not None:
+            return
+        from drx_market_data import MarketDataStore
+        from drx_excursions import ExcursionAnalyzer
+        
+        self.market_data = MarketDataStore(MARKET_DATA_DIR)
+        self.excursions = ExcursionAnalyzer(self.db, self.market_data)
+    
     def refresh_all_data(self):
-        """Daten aktualisieren"""
-        self.refresh_trades()
+        """Daten aktualisieren - verdeckte Tabs erst, wenn sie angezeigt werden"""
+        # Ab jetzt zeigt die UI echte Daten statt des Snapshots
+        self.snapshot = None
+        self.snapshot_data = {}
+        self.data_generation = None
+        
+        for tab in self.lazy_tabs.values():
+            tab.dirty = True
+        self.refresh_current_tab()
+    
+    def refresh_dashboard(self) -> bool:
+        """Dashboard-Tab: Kennzahlen, rollierende Fenster und Chart"""
+        if self.snapshot is not None:
+            self.show_dashboard_info(self.snapshot['summary'], self.snapshot['stats'])
+            if not self.analytics_ready:
+                return False
+            self.show_rolling_metrics(self.snapshot['rolling'])
+            self.show_equity(self.snapshot['equity'])
+            self.update_account_chart()
+            return True
+        
+        # Kennzahlen und Chart folgen, sobald numpy/matplotlib geladen sind
+        if not self.analytics_ready:
+            return False
+        
+        generation = self.db.get_generation()
         self.update_dashboard_info()
+        self.update_rolling_metrics()
         self.update_performance_chart()
+        self.data_generation = generation if generation >= 0 else None
+        return True
     
     def update_dashboard_info(self):
         """Dashboard aktualisieren"""
-        trades = self.db.get_all_trades()
+        from drx_analytics import compute_performance, load_closed_trades
         
-        total_trades = len(trades)
-        open_trades = len([t for t in trades if t.status == 'open'])
-        closed_trades = [t for t in trades if t.status == 'closed']
+        summary = self.db.get_trade_summary()
         
-        win_trades = len([t for t in closed_trades if t.profit and t.profit > 0])
-        win_rate = (win_trades / len(closed_trades) * 100) if closed_trades else 0
+        try:
+            arrays = load_closed_trades(self.db)
+            stats = compute_performance(arrays, self.starting_balance(float(arrays.net.sum())))
+        except Exception as e:
+            print(f"Analytics Fehler: {e}")
+            return
         
-        total_pnl = sum(t.profit for t in trades if t.profit is not None)
+        self.show_dashboard_info(summary, stats.to_dict())
+    
+    def starting_balance(self, net_pnl: float) -> Optional[float]:
+        """Startkapital: "starting_balance" aus der Config, sonst Kontostand abzüglich Netto-P&L"""
+        configured = self.config.get('starting_balance')
+        if configured:
+            return float(configured)
+        if self.connector and self.connector.connected:
+            balance = self.connector.account_info.get('balance')
+            if balance and balance - net_pnl > 0:
+                return float(balance) - net_pnl
+        return None
+    
+    def show_dashboard_info(self, summary: Dict, stats: Dict):
+        """Kennzahlen anzeigen (aus der DB oder aus dem Snapshot)"""
+        self.snapshot_data['summary'] = summary
+        self.snapshot_data['stats'] = stats
+        total_pnl = summary['total_pnl']
         
         if self.info_labels:
-            self.info_labels['total_trades'].config(text=str(total_trades))
-            self.info_labels['open_positions'].config(text=str(open_trades))
-            self.info_labels['win_rate'].config(text=f"{win_rate:.1f}%")
+            self.info_labels['total_trades'].config(text=str(summary['total_trades']))
+            self.info_labels['open_positions'].config(text=str(summary['open_positions']))
+            self.info_labels['win_rate'].config(text=f"{stats['win_rate']:.1f}%")
             self.info_labels['total_pnl'].config(text=f"€{total_pnl:.2f}")
+            profit_factor = stats['profit_factor']
+            self.info_labels['profit_factor'].config(
+                text="∞" if profit_factor == float('inf') else f"{profit_factor:.2f}")
+            self.info_labels['expectancy'].config(text=f"€{stats['expectancy']:.2f}")
+            self.info_labels['avg_win_loss'].config(
+                text=f"€{stats['avg_win']:.2f} / €{stats['avg_loss']:.2f}")
+            # Prozent und Ratios nur mit Startkapital (siehe starting_balance)
+            drawdown_pct = stats.get('max_drawdown_pct')
+            self.info_labels['max_drawdown'].config(
+                text=f"€{stats['max_drawdown']:.2f} ("
+                     + (f"{drawdown_pct:.1f}%, " if drawdown_pct is not None else "")
+                     + f"{stats['max_drawdown_duration'] / 86400:.0f} Tage)")
+            sharpe, sortino = stats.get('sharpe'), stats.get('sortino')
+            self.info_labels['sharpe_sortino'].config(
+                text=f"{sharpe:.2f} / {sortino:.2f}" if sharpe is not None else "–")
+            self.info_labels['streaks'].config(
+                text=f"{stats['max_win_streak']} / {stats['max_loss_streak']}")
             
             if total_pnl > 0:
                 self.info_labels['total_pnl'].config(foreground='#00C851')
             elif total_pnl < 0:
                 self.info_labels['total_pnl'].config(foreground='#ff4444')
     
+    def update_rolling_metrics(self):
+        """Rollierende Fenster nur um neu geschlossene Trades weiterschieben"""
+        if self.rolling is None:
+            return
+        
+        try:
+            self.rolling.refresh(self.db)
+        except Exception as e:
+            print(f"Rolling-Metriken Fehler: {e}")
+            return
+        
+        self.show_rolling_metrics(self.rolling.snapshot())
+    
+    def show_rolling_metrics(self, snapshot: Dict[int, Dict]):
+        """Rollierende Kennzahlen anzeigen"""
+        self.snapshot_data['rolling'] = snapshot
+        for size, values in snapshot.items():
+            label = self.rolling_labels.get(size)
+            if not label:
+                continue
+            if not values['trades']:
+                label.config(text="-")
+                continue
+            label.config(text=(
+                f"Gewinn-Rate: {values['win_rate']:.1f}%\n"
+                f"Erwartung: €{values['expectancy']:.2f}\n"
+                f"Volatilität: €{values['volatility']:.2f}"
+            ))
+    
+    def refresh_breakdown(self):
+        """Aufschlüsselungs-Tabelle aktualisieren"""
+        if not self.breakdown_tree:
+            return
+        
+        dimension = self.breakdown_var.get() if self.breakdown_var else "symbol"
+        rows = self.db.get_breakdown(dimension)
+        weekdays = ["Sonntag", "Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag"]
+        
+        for item in self.breakdown_tree.get_children():
+            self.breakdown_tree.delete(item)
+        
+        for row in rows:
+            group = row['group']
+            if group is None:
+                group_text = "-"
+            elif dimension == 'hour':
+                group_text = f"{group:02d}:00"
+            elif dimension == 'weekday':
+                group_text = weekdays[group]
+            else:
+                group_text = str(group)
+            
+            values = (
+                group_text,
+                row['trades'],
+                f"{row['win_rate']:.1f}%",
+                f"€{row['net_pnl']:.2f}",
+                f"€{row['expectancy']:.2f}",
+                f"{row['profit_factor']:.2f}"
+            )
+            
+            tags = ('profit',) if row['net_pnl'] > 0 else ('loss',) if row['net_pnl'] < 0 else ()
+            self.breakdown_tree.insert('', 'end', values=values, tags=tags)
+        
+        self.breakdown_tree.tag_configure('profit', foreground='#00C851')
+        self.breakdown_tree.tag_configure('loss', foreground='#ff4444')
+    
     def refresh_trades(self):
-        """Trades-Tabelle aktualisieren"""
+        """Trades-Tabelle aktualisieren (erste Seite für Filter und Sortierung)"""
         if not self.trades_tree:
             return
-            
-        for item in self.trades_tree.get_children():
-            self.trades_tree.delete(item)
         
-        trades = self.db.get_all_trades()
+        if self.trades_debounce is not None:
+            self.root.after_cancel(self.trades_debounce)
+            self.trades_debounce = None
+        
+        # Bis zur Prüfung des Snapshots dessen erste Seite zeigen
+        if self.snapshot is not None and not self.snapshot_valid:
+            rows = [(tuple(values), tag) for values, tag in self.snapshot['trades']]
+            self.show_trades(rows)
+            self.trades_next_key = None
+            self.update_trades_count(len(rows), None)
+            return
+        
+        self.query_trades_async()
+    
+    def load_more_trades(self):
+        """Nächste Seite an die Tabelle anhängen"""
+        if self.trades_next_key is not None:
+            self.query_trades_async(self.trades_next_key)
+    
+    def on_trades_filter_changed(self, *args):
+        """Filtereingabe - Abfrage erst nach einer kurzen Tipp-Pause"""
+        if self.trades_debounce is not None:
+            self.root.after_cancel(self.trades_debounce)
+        self.trades_debounce = self.root.after(FILTER_DEBOUNCE_MS, self.refresh_trades)
+    
+    def sort_trades_by(self, column: str):
+        """Spaltenkopf geklickt: nach der Spalte sortieren, erneut = Richtung umkehren"""
+        sort = TRADE_SORT_COLUMNS[column]
+        current, descending = self.trades_sort
+        self.trades_sort = (sort, not descending) if sort == current else (sort, sort != 'symbol')
+        self.update_trades_headings()
+        self.refresh_trades()
+    
+    def update_trades_headings(self):
+        """Sortierpfeil im aktiven Spaltenkopf"""
+        if not self.trades_tree:
+            return
         
+        sort, descending = self.trades_sort
+        for col, column in TRADE_SORT_COLUMNS.items():
+            arrow = (" ▼" if descending else " ▲") if column == sort else ""
+            self.trades_tree.heading(col, text=col + arrow)
+    
+    def trades_filter(self) -> Optional[TradeFilter]:
+        """TradeFilter aus der Filterleiste (ungültige Eingaben werden ignoriert)"""
+        values = {name: var.get().strip() for name, var in self.trades_filter_vars.items()}
+        trade_filter = TradeFilter()
+        
+        if values.get('text'):
+            trade_filter.text = values['text']
+        if values.get('symbol'):
+            trade_filter.symbol = values['symbol']
+        if values.get('status') in TRADE_STATUS_CHOICES[1:]:
+            trade_filter.status = values['status']
+        
+        for name, attr, shift in [('date_from', 'open_from', 0), ('date_to', 'open_to', 1)]:
+            try:
+                day = datetime.strptime(values.get(name, ''), '%Y-%m-%d')
+            except ValueError:
+                continue
+            setattr(trade_filter, attr, day + timedelta(days=shift))
+        
+        try:
+            trade_filter.profit_min = float(values.get('min_pnl', '').replace(',', '.'))
+        except ValueError:
+            pass
+        
+        return None if trade_filter == TradeFilter() else trade_filter
+    
+    def query_trades_async(self, after: Optional[tuple] = None):
+        """
+        Seite im Hintergrund laden.
+        
+        Eine neue Abfrage bricht die laufende ab; Ergebnisse älterer Abfragen
+        werden verworfen.
+        """
+        if self.trades_cancel is not None:
+            self.trades_cancel.set()
+        cancel = threading.Event()
+        self.trades_cancel = cancel
+        self.trades_query_id += 1
+        query_id = self.trades_query_id
+        
+        trade_filter = self.trades_filter()
+        sort, descending = self.trades_sort
+        default_view = trade_filter is None and self.trades_sort == DEFAULT_TRADE_SORT
+        
+        def worker():
+            if trade_filter is not None and trade_filter.text:
+                page = self.db.search_trades(trade_filter, TRADES_PAGE, after, cancel=cancel)
+            else:
+                page = self.db.query_trades(trade_filter, sort, descending, TRADES_PAGE, after,
+                                            cancel=cancel)
+            total = None if after else self.db.count_trades(trade_filter, cancel=cancel)
+            if cancel.is_set():
+                return
+            rows = self.trade_rows(page.trades)
+            self.root.after(0, lambda: self.on_trades_loaded(
+                query_id, rows, page.next_key, total, after is not None, default_view))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def on_trades_loaded(self, query_id: int, rows: List, next_key: Optional[tuple],
+                         total: Optional[int], append: bool, default_view: bool):
+        """Ergebnis einer Hintergrund-Abfrage anzeigen (veraltete verwerfen)"""
+        if query_id != self.trades_query_id:
+            return
+        
+        self.trades_cancel = None
+        self.trades_next_key = next_key
+        if total is not None:
+            self.trades_total = total
+        
+        if append:
+            self.append_trades(rows)
+        else:
+            self.show_trades(rows)
+            if default_view:
+                self.snapshot_data['trades'] = rows
+        
+        shown = len(self.trades_tree.get_children()) if self.trades_tree else len(rows)
+        self.update_trades_count(shown, self.trades_total)
+    
+    def update_trades_count(self, shown: int, total: Optional[int]):
+        """Trade-Anzahl ("x von N") und Mehr-laden-Button aktualisieren"""
+        if self.trades_count_label:
+            text = f"{shown} Trades" if total is None else f"{shown} von {total} Trades"
+            self.trades_count_label.config(text=text)
+        if self.trades_more_btn:
+            self.trades_more_btn.config(state='normal' if self.trades_next_key else 'disabled')
+    
+    def trade_rows(self, trades: List[Trade]) -> List:
+        """Trades als Tabellenzeilen (Werte, Tag) - Preise mit den Stellen des Symbols"""
+        format_price = self.symbol_cache.format_price
+        rows = []
         for trade in trades:
             values = (
                 trade.id[:8] + "..." if len(trade.id) > 8 else trade.id,
+                trade.open_time.strftime('%Y-%m-%d %H:%M') if trade.open_time else "",
                 trade.symbol,
                 trade.type.upper(),
                 f"{trade.lots:.2f}",
-                f"{trade.open_price:.5f}",
-                f"{trade.close_price:.5f}" if trade.close_price else "Open",
+                format_price(trade.symbol, trade.open_price),
+                format_price(trade.symbol, trade.close_price) if trade.close_price else "Open",
                 f"€{trade.profit:.2f}",
                 trade.status.upper()
             )
             
-            tags = ()
+            tag = ''
             if trade.profit and trade.profit > 0:
-                tags = ('profit',)
+                tag = 'profit'
             elif trade.profit and trade.profit < 0:
-                tags = ('loss',)
+                tag = 'loss'
             
-            self.trades_tree.insert('', 'end', values=values, tags=tags)
+            rows.append((values, tag))
         
-        self.trades_tree.tag_configure('profit', foreground='#00C851')
-        self.trades_tree.tag_configure('loss', foreground='#ff4444')
+        return rows
+    
+    def show_trades(self, rows: List):
+        """Zeilen (Werte, Tag) in die Trades-Tabelle schreiben"""
+        if not self.trades_tree:
+            return
+        
+        self.trades_tree.delete(*self.trades_tree.get_children())
+        self.append_trades(rows)
+        self.trades_tree.yview_moveto(0)
+    
+    def append_trades(self, rows: List):
+        """Zeilen (Werte, Tag) an die Trades-Tabelle anhängen"""
+        if not self.trades_tree:
+            return
+        
+        for values, tag in rows:
+            self.trades_tree.insert('', 'end', values=values, tags=(tag,) if tag else ())
     
     def update_performance_chart(self):
         """Performance Chart"""
         if not self.ax:
             return
-            
-        trades = self.db.get_all_trades()
-        closed_trades = [t for t in trades if t.status == 'closed' and t.close_time]
+        
+        self.show_equity(self.load_equity())
+        self.update_account_chart()
+    
+    def load_equity(self) -> List:
+        """Equity-Kurve als (Tag, kumulierter P&L) aus dem Tages-Rollup"""
+        equity = []
+        running_total = 0.0
+        for day, pnl, _count, _wins in self.db.get_daily_pnl('day'):
+            if day is None:
+                continue
+            running_total += pnl or 0
+            equity.append((day, running_total))
+        
+        return equity
+    
+    def show_equity(self, equity: List):
+        """Equity-Kurve aus (Tag, kumulierter P&L) zeichnen"""
+        self.snapshot_data['equity'] = equity
+        if not self.ax:
+            return
         
         self.ax.clear()
         
-        if not closed_trades:
+        if not equity:
             self.ax.text(0.5, 0.5, 'Keine Daten\n\nImportiere CSV oder verbinde MT5', 
                         ha='center', va='center', transform=self.ax.transAxes, fontsize=12)
         else:
-            closed_trades.sort(key=lambda x: x.close_time or datetime.min)
-            
-            cumulative_pnl = []
-            running_total = 0
-            dates = []
-            
-            for trade in closed_trades:
-                if trade.profit is not None and trade.close_time:
-                    running_total += trade.profit
-                    cumulative_pnl.append(running_total)
-                    dates.append(trade.close_time)
+            dates = [datetime.strptime(day, "%Y-%m-%d") for day, _ in equity]
+            cumulative_pnl = [value for _, value in equity]
             
-            if dates and cumulative_pnl:
-                self.ax.plot(dates, cumulative_pnl, 'b-', linewidth=2, label='Equity Curve')
-                self.ax.axhline(y=0, color='gray', linestyle='--', alpha=0.5)
-                self.ax.set_title('Performance')
-                self.ax.set_ylabel('P&L (€)')
-                self.ax.grid(True, alpha=0.3)
-                self.ax.legend()
-                self.fig.autofmt_xdate()
+            self.ax.plot(dates, cumulative_pnl, 'b-', linewidth=2, label='Equity Curve')
+            if self.monte_carlo is not None:
+                self.draw_monte_carlo(dates, cumulative_pnl)
+            self.ax.axhline(y=0, color='gray', linestyle='--', alpha=0.5)
+            self.ax.set_title('Performance')
+            self.ax.set_ylabel('P&L (€)')
+            self.ax.grid(True, alpha=0.3)
+            self.ax.legend()
+            self.fig.autofmt_xdate()
         
         if self.canvas:
             self.canvas.draw()
     
+    def refresh_account_chart(self):
+        """Periodisches Neuzeichnen des Konto-Charts - verdeckt nur als veraltet markieren"""
+        tab = self.lazy_tabs.get('dashboard')
+        if tab is not None and self.current_lazy_tab() is not tab:
+            tab.dirty = True
+            return
+        self.update_account_chart()
+    
+    def update_account_chart(self):
+        """Balance/Equity des Kontos im gewählten Zeitraum (Stufe je nach Zeitraum)"""
+        if not self.account_ax:
+            return
+        
+        span = ACCOUNT_CHART_RANGES.get(self.account_range_var.get() if self.account_range_var else '',
+                                        86400)
+        end = time.time()
+        tier, rows = self.db.get_account_history(end - span, end, ACCOUNT_CHART_POINTS)
+        
+        ax = self.account_ax
+        ax.clear()
+        
+        if not rows:
+            ax.text(0.5, 0.5, 'Kein Konto-Verlauf\n\nWird beim MT5-Sync aufgezeichnet',
+                    ha='center', va='center', transform=ax.transAxes, fontsize=10)
+        else:
+            def column(index):
+                return [float('nan') if row[index] is None else row[index] for row in rows]
+        
+            times = [datetime.fromtimestamp(row[0]) for row in rows]
+            if tier:
+                # Spanne zwischen Equity-Tief und -Hoch je Bucket
+                ax.fill_between(times, column(3), column(4), color='b', alpha=0.15, linewidth=0)
+            ax.plot(times, column(2), 'b-', linewidth=1.5, label='Equity')
+            ax.plot(times, column(1), color='gray', linestyle='--', linewidth=1, label='Balance')
+            ax.set_title(f"Konto ({ACCOUNT_TIER_LABELS.get(tier, tier)})")
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+            for label in ax.get_xticklabels():
+                label.set_rotation(30)
+                label.set_horizontalalignment('right')
+        
+        if self.canvas:
+            self.canvas.draw()
+    
+    def update_excursions_async(self):
+        """MAE/MFE für neue Trades im Hintergrund berechnen"""
+        if self.excursions is None:
+            return
+        
+        def worker():
+            try:
+                self.excursions.update()
+            except Exception as e:
+                print(f"MAE/MFE Fehler: {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def run_monte_carlo(self):
+        """Monte-Carlo-Simulation im Hintergrund starten"""
+        profits = self.db.get_closed_trade_profits()
+        if len(profits) < 10:
+            messagebox.showinfo("Monte Carlo", "Mindestens 10 geschlossene Trades benötigt")
+            return
+        
+        balance = 10000.0
+        if self.connector and self.connector.connected:
+            balance = float(self.connector.account_info.get('balance', balance)) or balance
+        
+        def worker():
+            from drx_montecarlo import run_monte_carlo
+            
+            try:
+                result = run_monte_carlo(profits, n_paths=10000, initial_balance=balance)
+                self.root.after(0, lambda: self.show_monte_carlo(result))
+            except Exception as e:
+                print(f"Monte Carlo Fehler: {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def show_monte_carlo(self, result):
+        """Simulation in den Equity-Chart des Dashboards übernehmen"""
+        self.monte_carlo = result
+        self.show_equity(self.snapshot_data.get('equity') or self.load_equity())
+    
+    def draw_monte_carlo(self, dates: List, cumulative_pnl: List):
+        """
+        Perzentil-Bänder als Fortsetzung der Equity-Kurve. Die simulierten Trades
+        werden mit dem bisherigen Handelstempo (Trades je Tag) auf Daten abgebildet.
+        """
+        result = self.monte_carlo
+        days_per_trade = max((dates[-1] - dates[0]).days, 1) / max(result.trades, 1)
+        x = [dates[-1] + timedelta(days=float(n) * days_per_trade) for n in result.band_x]
+        base = cumulative_pnl[-1]
+        bands = {p: base + band for p, band in result.bands.items()}
+        
+        self.ax.fill_between(x, bands[5], bands[95], alpha=0.15, color='b', label='MC 5-95%')
+        self.ax.fill_between(x, bands[25], bands[75], alpha=0.3, color='b', label='MC 25-75%')
+        self.ax.plot(x, bands[50], 'b--', linewidth=1.5, label='MC Median')
+        
+        summary = (
+            f"🎲 {result.paths:,} Pfade über {result.trades:,} Trades\n"
+            f"Ruin: {result.ruin_probability * 100:.2f}%  |  Median: €{result.final_pnl[50]:.2f}\n"
+            f"Max. DD (95%): €{result.max_drawdown[95]:.2f} ({result.max_drawdown_pct[95]:.1f}%)"
+        )
+        self.ax.text(0.01, 0.99, summary, transform=self.ax.transAxes, va='top', ha='left',
+                     fontsize=8, bbox={'boxstyle': 'round', 'facecolor': 'white', 'alpha': 0.8})
+    
     def export_trades(self):
         """CSV Export"""
-        trades = self.db.get_all_trades()
-        
-        if not trades:
+        if self.db.count_trades() == 0:
             messagebox.showinfo("Export", "Keine Trades vorhanden")
             return
         
@@ -814,28 +1306,36 @@ Professional Trading Journal
         
         if filename:
             try:
-                data = []
-                for trade in trades:
-                    data.append({
-                        'ID': trade.id,
-                        'Symbol': trade.symbol,
-                        'Type': trade.type,
-                        'Lots': trade.lots,
-                        'Open Price': trade.open_price,
-                        'Close Price': trade.close_price,
-                        'Open Time': trade.open_time.isoformat() if trade.open_time else '',
-                        'Close Time': trade.close_time.isoformat() if trade.close_time else '',
-                        'Profit': trade.profit,
-                        'Commission': trade.commission,
-                        'Swap': trade.swap,
-                        'Comment': trade.comment,
-                        'Status': trade.status
-                    })
+                import csv
                 
-                df = pd.DataFrame(data)
-                df.to_csv(filename, index=False)
+                columns = ['ID', 'Symbol', 'Type', 'Lots', 'Open Price', 'Close Price',
+                           'Open Time', 'Close Time', 'Profit', 'Commission', 'Swap',
+                           'Comment', 'Status']
+                exported = 0
                 
-                messagebox.showinfo("Export", f"✅ {len(trades)} Trades exportiert!")
+                # Zeilenweise aus dem Cursor schreiben - kein Laden aller Trades
+                with open(filename, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=columns)
+                    writer.writeheader()
+                    for trade in self.db.iter_trades():
+                        writer.writerow({
+                            'ID': trade.id,
+                            'Symbol': trade.symbol,
+                            'Type': trade.type,
+                            'Lots': trade.lots,
+                            'Open Price': trade.open_price,
+                            'Close Price': trade.close_price,
+                            'Open Time': trade.open_time.isoformat() if trade.open_time else '',
+                            'Close Time': trade.close_time.isoformat() if trade.close_time else '',
+                            'Profit': trade.profit,
+                            'Commission': trade.commission,
+                            'Swap': trade.swap,
+                            'Comment': trade.comment,
+                            'Status': trade.status
+                        })
+                        exported += 1
+                
+                messagebox.showinfo("Export", f"✅ {exported} Trades exportiert!")
                 
             except Exception as e:
                 messagebox.showerror("Export Fehler", f"❌ {e}")
@@ -850,12 +1350,14 @@ Professional Trading Journal
         
         if filename:
             try:
+                import pandas as pd
+                
                 df = pd.read_csv(filename)
                 
-                imported_count = 0
+                trades = []
                 for _, row in df.iterrows():
                     trade = Trade(
-                        id=str(row.get('ID', f"IMPORT_{imported_count}")),
+                        id=str(row.get('ID', f"IMPORT_{len(trades)}")),
                         symbol=str(row.get('Symbol', '')),
                         type=str(row.get('Type', 'buy')),
                         lots=float(row.get('Lots', 0)),
@@ -869,10 +1371,10 @@ Professional Trading Journal
                         comment=str(row.get('Comment', '')),
                         status=str(row.get('Status', 'closed'))
                     )
-                    
-                    self.db.save_trade(trade)
-                    imported_count += 1
+                    trades.append(trade)
                 
+                # Ein Auftrag, eine Transaktion - danach ist der Stand lesbar
+                imported_count = self.db.save_trades(trades).result()
                 self.refresh_all_data()
                 messagebox.showinfo("Import", f"✅ {imported_count} Trades importiert!")
                 
@@ -892,16 +1394,72 @@ Professional Trading Journal
             initialfile=backup_name
         )
         
-        if filename:
+        if not filename:
+            return
+        
+        # Online-Backup im Hintergrund - der Sync schreibt währenddessen weiter
+        def worker():
             try:
-                import shutil
-                shutil.copy2(DATABASE_FILE, filename)
-                messagebox.showinfo("Backup", "✅ Backup erstellt!")
+                result = self.backups.backup_to(filename, self.report_backup_progress)
+                self.root.after(0, self.on_backup_done, result, True)
             except Exception as e:
-                messagebox.showerror("Backup Fehler", f"❌ {e}")
+                self.root.after(0, messagebox.showerror, "Backup Fehler", f"❌ {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def report_backup_progress(self, done: int, total: int):
+        """Fortschritt aus dem Backup-Thread an die UI weitergeben"""
+        def show():
+            if self.backup_progress:
+                self.backup_progress.config(maximum=max(total, 1), value=done)
+        self.root.after(0, show)
+    
+    def backup_status(self) -> str:
+        """Letztes Backup und Zeitplan"""
+        last = self.backups.last_backup()
+        text = f"Letztes Backup: {last.strftime('%d.%m.%Y %H:%M')}" if last else "Noch kein Backup"
+        if self.backups.thread is not None:
+            kind = "inkrementell" if self.backups.incremental else "voll"
+            text += f"  |  Auto: alle {self.backups.interval / 3600:g} h ({kind})"
+        return text
+    
+    def on_backup_done(self, result: BackupResult, manual: bool = False):
+        """Backup abgeschlossen (UI-Thread)"""
+        if self.backup_label:
+            self.backup_label.config(text=self.backup_status())
+        if manual:
+            messagebox.showinfo("Backup", f"✅ Backup erstellt!\n\n{result.path}\n"
+                                          f"{format_size(result.stored_bytes)} in {result.seconds:.1f}s")
+    
+    def archive_old_trades(self):
+        """Alte geschlossene Trades in die Jahres-Archive verschieben"""
+        archive_config = self.config.get('archive') or {}
+        cutoff = archive_cutoff(archive_config)
+        if not messagebox.askyesno(
+                "Archivieren",
+                f"Geschlossene Trades vor dem {cutoff.strftime('%d.%m.%Y')} archivieren?\n\n"
+                f"Sie bleiben in allen Auswertungen sichtbar.\n📁 {self.db.archive_dir}"):
+            return
+        
+        # Kopieren und Löschen im Hintergrund - der Sync schreibt währenddessen weiter
+        def worker():
+            try:
+                moved = self.db.archive_trades(cutoff, compress=bool(archive_config.get('compress')))
+                self.root.after(0, self.on_archive_done, moved)
+            except Exception as e:
+                self.root.after(0, messagebox.showerror, "Archiv Fehler", f"❌ {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def on_archive_done(self, moved: Dict[int, int]):
+        """Archivieren abgeschlossen (UI-Thread)"""
+        self.refresh_all_data()
+        years = "\n".join(f"{year}: {count} Trades" for year, count in moved.items() if count)
+        messagebox.showinfo("Archivieren", f"✅ {sum(moved.values())} Trades archiviert\n\n{years}".rstrip())
     
     def show_system_info(self):
         """System Info anzeigen"""
+        writer = self.db.writer.metrics()
         info = f"""
 🖥️ System Information
 ━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -912,6 +1470,8 @@ App: {APP_NAME} v{APP_VERSION}
 
 📁 Daten: {data_dir}
 💾 DB: {DATABASE_FILE}
+📝 DB-Writer: {writer['jobs']} Aufträge in {writer['batches']} Batches, Queue {writer['queue_depth']} (max {writer['max_queue_depth']})
+⏱️ Commit: Ø {writer['avg_commit_ms']:.1f} ms, max {writer['max_commit_ms']:.1f} ms
 
 🔌 MT5: {'✅ Verfügbar' if SYSTEM == 'Windows' else '❌ Nur Windows'}
         """
@@ -923,15 +1483,26 @@ App: {APP_NAME} v{APP_VERSION}
             return
         
         def sync_worker():
+            version = self.db.get_generation()
+            chart_updated = time.monotonic()
             while True:
                 time.sleep(5)
                 if self.connector and self.connector.connected:
                     try:
-                        open_trades = self.connector.get_open_trades()
-                        for trade in open_trades:
-                            self.db.save_trade(trade)
+                        sync_open_trades(self.connector, self.db, self.symbol_cache, self.exposure)
+                        self.root.after(0, self.show_exposure)
+                        if time.monotonic() - chart_updated >= ACCOUNT_CHART_REFRESH:
+                            chart_updated = time.monotonic()
+                            self.root.after(0, self.refresh_account_chart)
+                        if self.alerts.rules:
+                            self.alerts.on_sync(self.exposure.snapshot(), self.db.get_day_pnl())
                         
-                        self.root.after(0, self.refresh_all_data)
+                        # Nur aktualisieren, wenn sich trades tatsächlich geändert hat
+                        # (archivierte Trades bleiben über die Abfragen sichtbar)
+                        changes = self.db.changes_since(version)
+                        version = changes.version
+                        if changes.changed_ids() or changes.deleted_ids() or not changes.complete:
+                            self.root.after(0, self.refresh_all_data)
                     except Exception as e:
                         print(f"Auto-Sync Fehler: {e}")
         
@@ -943,38 +1514,148 @@ App: {APP_NAME} v{APP_VERSION}
         try:
             if os.path.exists(CONFIG_FILE):
                 with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
-                    print(f"Config geladen: {len(config)} Einträge")
+                    self.config = json.load(f)
+                    print(f"Config geladen: {len(self.config)} Einträge")
         except Exception as e:
             print(f"Config Fehler: {e}")
+        
+        # Alert-Regeln aus dem Abschnitt "alerts" - Meldung im Fenster und im Alert-Log
+        sinks = [LogSink(ALERT_LOG_FILE), lambda alert: self.root.after(0, self.show_alert, alert)]
+        self.alerts = AlertEngine.from_config(self.config.get('alerts') or {}, sinks,
+                                              equity_peak=self.db.get_equity_peak())
+        
+        # Automatische Backups aus dem Abschnitt "backup"
+        backup_config = self.config.get('backup') or {}
+        self.backups = BackupManager.from_config(DATABASE_FILE, backup_config)
+        if backup_config.get('auto'):
+            self.backups.start(lambda result: self.root.after(0, self.on_backup_done, result),
+                               self.report_backup_progress)
+    
+    def show_alert(self, alert: Alert):
+        """Alert als Meldung anzeigen (UI-Thread)"""
+        messagebox.showwarning("⚠️ Alert", f"{alert.time.strftime('%H:%M:%S')}  {alert.message}")
     
     def save_config(self):
-        """Config speichern"""
+        """Config speichern (übrige Einträge wie sync_interval und alerts bleiben erhalten)"""
         try:
-            config = {
+            config = dict(self.config)
+            config.update({
                 'system': SYSTEM,
                 'version': APP_VERSION,
                 'data_dir': str(data_dir)
-            }
+            })
             
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(config, f, indent=2)
         except Exception as e:
             print(f"Config-Speichern Fehler: {e}")
     
+    def load_dashboard_snapshot(self):
+        """Gespeicherten Snapshot laden - die Tabs zeigen ihn bis zur Prüfung an"""
+        snapshot = load_snapshot(SNAPSHOT_FILE, self.db.db_file)
+        if snapshot is None:
+            return
+        
+        self.snapshot = snapshot
+        self.snapshot_valid = False
+        self.data_generation = snapshot['generation']
+    
+    def revalidate_snapshot(self):
+        """Generation der trades-Tabelle im Hintergrund mit dem Snapshot vergleichen"""
+        def worker():
+            generation = self.db.get_generation()
+            self.root.after(0, lambda: self.on_snapshot_checked(generation))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def on_snapshot_checked(self, generation: int):
+        """Snapshot behalten oder durch aktuelle Daten ersetzen"""
+        if self.snapshot is None:
+            return  # bereits durch echte Daten ersetzt
+        
+        if generation < 0 or generation != self.snapshot['generation']:
+            print("🔄 Snapshot veraltet - Daten werden neu geladen")
+            self.refresh_all_data()
+            return
+        
+        # Unverändert: Kennzahlen bleiben, Trades über die erste Seite hinaus nachladen
+        self.snapshot_valid = True
+        if self.snapshot['summary']['total_trades'] > TRADES_PAGE:
+            self.lazy_tabs['trades'].dirty = True
+            self.refresh_current_tab()
+    
+    def save_dashboard_snapshot(self):
+        """Angezeigte Daten für den nächsten Start speichern"""
+        if self.data_generation is None:
+            return  # Kein vollständiger Stand (z.B. Analytics noch nicht geladen)
+        
+        data = dict(self.snapshot_data)
+        data['generation'] = self.data_generation
+        if 'trades' not in data:
+            data['trades'] = self.trade_rows(self.db.query_trades(limit=TRADES_PAGE).trades)
+        if 'equity' not in data:
+            data['equity'] = self.load_equity()
+        save_snapshot(SNAPSHOT_FILE, self.db.db_file, data)
+    
     def on_closing(self):
         """App schließen"""
         self.save_config()
+        self.save_dashboard_snapshot()
+        self.backups.stop()
+        self.db.close()
         if self.connector:
             self.connector.disconnect()
+        if self.market_data:
+            self.market_data.set_source(None)
         self.root.quit()
         self.root.destroy()
     
     def run(self):
         """App starten"""
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.refresh_all_data()
+        
+        # Erst das Fenster zeichnen, dann schwere Module im Hintergrund laden
+        self.root.update()
+        self.report_startup("first_frame")
+        self.prefetcher.start()
+        
+        if self.snapshot is not None:
+            self.revalidate_snapshot()
+        else:
+            self.refresh_all_data()
+        self.root.after(20, self.wait_for_prefetch)
         self.root.mainloop()
+    
+    def wait_for_prefetch(self):
+        """Nach dem Prefetch Kennzahlen und Chart aufbauen (im UI-Thread)"""
+        if not self.prefetcher.done.is_set():
+            self.root.after(20, self.wait_for_prefetch)
+            return
+        
+        try:
+            self.analytics_ready = True
+            if self.lazy_tabs['dashboard'].built:
+                self.create_analytics_widgets()
+            self.refresh_current_tab()
+        except Exception as e:
+            print(f"Analytics-Start Fehler: {e}")
+        
+        self.report_startup("ready")
+        if self.startup_probe:
+            self.root.after(0, self.root.destroy)
+    
+    def report_startup(self, stage: str):
+        """Startzeiten für startup_benchmark.py auf stderr ausgeben"""
+        if not self.startup_probe:
+            return
+        
+        self.root.update_idletasks()
+        t0 = os.environ.get(STARTUP_T0_ENV)
+        elapsed = time.time() - float(t0) if t0 else time.perf_counter() - _MODULE_START
+        heavy = sorted(name for name in ("numpy", "pandas", "matplotlib", "seaborn", "requests")
+                       if name in sys.modules)
+        print(f"STARTUP {stage} {elapsed:.4f} {','.join(heavy) or '-'}",
+              file=sys.stderr, flush=True)
 
 def main():
     """Hauptfunktion"""
@@ -991,4 +1672,6 @@ def main():
         messagebox.showerror("Kritischer Fehler", f"App konnte nicht gestartet werden:\n{str(e)}")
 
 if __name__ == "__main__":
+    # Für Monte-Carlo-Worker in der gepackten .exe
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
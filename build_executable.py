@@ -61,7 +61,8 @@ hiddenimports = [
     'pandas',
     'matplotlib',
     'matplotlib.backends.backend_tkagg',
-    'seaborn',
+    'matplotlib.figure',
+    'numpy',
     'sqlite3',
     'json',
     'datetime',
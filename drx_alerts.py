@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Alerts
+Regeln (Tagesverlust, Drawdown, Exposure, Haltedauer) bei jedem Sync prüfen
+
+Die Regeln lesen nur nachgeführten Zustand: den ExposureSnapshot (offene
+P&L, Lots je Symbol, älteste Position, account_info), das heutige Ergebnis
+aus dem daily_pnl-Rollup und den Equity-Höchststand. trades wird nie gescannt.
+
+Jede Regel löst einmal aus und wird erst wieder scharf, wenn der Wert unter
+die Rückstellschwelle fällt (Hysterese). Benachrichtigungen sind je Regel
+(Cooldown) und insgesamt (pro Stunde) begrenzt - eine zurückgehaltene Meldung
+wird beim nächsten erlaubten Tick nachgeholt, solange die Schwelle überschritten ist.
+Der Equity-Höchststand kommt beim Start aus dem Konto-Verlauf (account_rollup).
+
+Senken sind einfache Aufrufe alert -> None: Tk-Meldung (GUI), Log-Datei
+(JSON-Zeilen) und Webhook (HTTP POST, z.B. an einen lokalen Stub).
+
+Konfiguration in drx_config.json:
+    "alerts": {
+        "daily_loss": 500,
+        "drawdown_pct": 10,
+        "exposure_lots": {"EURUSD": 5},
+        "position_hours": 48,
+        "webhook_url": "http://127.0.0.1:8765/alerts"
+    }
+
+Nur Standardbibliothek - läuft auch im Headless-Sync.
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from drx_exposure import ExposureSnapshot
+
+# Rückstellung bei 90 % der Schwelle
+HYSTERESIS = 0.1
+# Mindestabstand zwischen zwei Meldungen derselben Regel (Sekunden)
+ALERT_COOLDOWN = 15 * 60
+ALERT_MAX_PER_HOUR = 20
+
+AlertSink = Callable[["Alert"], None]
+
+
+@dataclass
+class AlertState:
+    """Zustand eines Sync-Ticks"""
+    time: datetime
+    exposure: ExposureSnapshot
+    realized_today: float  # geschlossene Trades heute (daily_pnl)
+    equity: Optional[float]
+    equity_peak: Optional[float]
+
+    @property
+    def daily_pnl(self) -> float:
+        """Heutiges Ergebnis inkl. offener P&L"""
+        return self.realized_today + self.exposure.unrealized
+
+
+@dataclass
+class Alert:
+    """Ausgelöste Regel"""
+    rule: str
+    message: str
+    value: float
+    threshold: float
+    time: datetime
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['time'] = self.time.isoformat()
+        return data
+
+
+class AlertRule(ABC):
+    """
+    Basis-Regel: löst bei value() > threshold aus, wird bei value() < clear
+    wieder scharf (Standard: threshold abzüglich HYSTERESIS).
+    """
+
+    def __init__(self, name: str, threshold: float, clear: Optional[float] = None):
+        self.name = name
+        self.threshold = threshold
+        self.clear = threshold * (1 - HYSTERESIS) if clear is None else clear
+
+    @abstractmethod
+    def value(self, state: AlertState) -> Optional[float]:
+        """Gemessener Wert (None = nicht bewertbar, z.B. ohne Kontoinfo)"""
+
+    @abstractmethod
+    def message(self, value: float, state: AlertState) -> str:
+        """Meldungstext zum ausgelösten Wert"""
+
+
+class DailyLossRule(AlertRule):
+    """Heutiger Verlust (geschlossen + offen) in Kontowährung"""
+
+    def __init__(self, limit: float, clear: Optional[float] = None):
+        super().__init__('daily_loss', limit, clear)
+
+    def value(self, state: AlertState) -> Optional[float]:
+        return -state.daily_pnl
+
+    def message(self, value: float, state: AlertState) -> str:
+        return f"Tagesverlust €{value:.2f} (Grenze €{self.threshold:.2f})"
+
+
+class DrawdownRule(AlertRule):
+    """Rückgang der Equity vom Höchststand in %"""
+
+    def __init__(self, percent: float, clear: Optional[float] = None):
+        super().__init__('drawdown', percent, clear)
+
+    def value(self, state: AlertState) -> Optional[float]:
+        if state.equity is None or not state.equity_peak:
+            return None
+        return (state.equity_peak - state.equity) / state.equity_peak * 100
+
+    def message(self, value: float, state: AlertState) -> str:
+        return (f"Drawdown {value:.1f}% vom Equity-Hoch €{state.equity_peak:.2f} "
+                f"(Grenze {self.threshold:.1f}%)")
+
+
+class ExposureRule(AlertRule):
+    """Netto-Lots eines Symbols (long oder short)"""
+
+    def __init__(self, symbol: str, max_lots: float, clear: Optional[float] = None):
+        super().__init__(f"exposure_{symbol}", max_lots, clear)
+        self.symbol = symbol
+
+    def value(self, state: AlertState) -> Optional[float]:
+        entry = state.exposure.symbols.get(self.symbol)
+        return abs(entry.net_lots) if entry else 0.0
+
+    def message(self, value: float, state: AlertState) -> str:
+        return f"Exposure {self.symbol}: {value:.2f} Lots netto (Grenze {self.threshold:.2f})"
+
+
+class PositionAgeRule(AlertRule):
+    """Haltedauer der ältesten offenen Position in Stunden"""
+
+    def __init__(self, hours: float, clear: Optional[float] = None):
+        super().__init__('position_age', hours, clear)
+
+    def value(self, state: AlertState) -> Optional[float]:
+        oldest = state.exposure.oldest
+        if oldest is None:
+            return 0.0
+        return (state.time - oldest[2]).total_seconds() / 3600
+
+    def message(self, value: float, state: AlertState) -> str:
+        trade_id, symbol, _ = state.exposure.oldest
+        return f"Position {trade_id} ({symbol}) seit {value:.1f} h offen (Grenze {self.threshold:g} h)"
+
+
+class AlertEngine:
+    """Regeln je Sync-Tick prüfen, mit Hysterese und Begrenzung an die Senken melden"""
+
+    def __init__(self, rules: Iterable[AlertRule], sinks: Iterable[AlertSink] = (),
+                 cooldown: float = ALERT_COOLDOWN, max_per_hour: int = ALERT_MAX_PER_HOUR,
+                 clock: Callable[[], float] = time.monotonic,
+                 equity_peak: Optional[float] = None):
+        self.rules = list(rules)
+        self.sinks = list(sinks)
+        self.cooldown = cooldown
+        self.max_per_hour = max_per_hour
+        self.clock = clock
+        self.active: Set[str] = set()
+        self.last_sent: Dict[str, float] = {}
+        self.sent: Deque[float] = deque()
+        self.suppressed = 0
+        self.equity_peak = equity_peak
+
+    @classmethod
+    def from_config(cls, config: Dict, sinks: Iterable[AlertSink] = (),
+                    equity_peak: Optional[float] = None) -> "AlertEngine":
+        """
+        Regeln aus dem Abschnitt "alerts" der Config (fehlende Schlüssel = Regel aus).
+        equity_peak: gespeicherter Höchststand (DatabaseManager.get_equity_peak).
+        """
+        rules: List[AlertRule] = []
+        if config.get('daily_loss'):
+            rules.append(DailyLossRule(float(config['daily_loss'])))
+        if config.get('drawdown_pct'):
+            rules.append(DrawdownRule(float(config['drawdown_pct'])))
+        for symbol, lots in (config.get('exposure_lots') or {}).items():
+            rules.append(ExposureRule(symbol, float(lots)))
+        if config.get('position_hours'):
+            rules.append(PositionAgeRule(float(config['position_hours'])))
+
+        sinks = list(sinks)
+        if config.get('webhook_url'):
+            sinks.append(WebhookSink(config['webhook_url']))
+        return cls(rules, sinks,
+                   cooldown=float(config.get('cooldown', ALERT_COOLDOWN)),
+                   max_per_hour=int(config.get('max_per_hour', ALERT_MAX_PER_HOUR)),
+                   equity_peak=equity_peak)
+
+    def on_sync(self, exposure: ExposureSnapshot, realized_today: float,
+                now: Optional[datetime] = None) -> List[Alert]:
+        """Equity-Hoch nachführen und alle Regeln prüfen (im Sync-Thread)"""
+        equity = None
+        if exposure.accounts:
+            equity = sum(info.get('equity') or 0.0 for info in exposure.accounts.values())
+            self.equity_peak = equity if self.equity_peak is None else max(self.equity_peak, equity)
+
+        state = AlertState(now or datetime.now(), exposure, realized_today, equity, self.equity_peak)
+        return self.evaluate(state)
+
+    def evaluate(self, state: AlertState) -> List[Alert]:
+        """Gesendete Alerts dieses Ticks"""
+        sent = []
+        for rule in self.rules:
+            value = rule.value(state)
+            if value is None:
+                continue
+
+            if rule.name in self.active:
+                if value < rule.clear:
+                    self.active.discard(rule.name)
+                continue
+            if value <= rule.threshold:
+                continue
+
+            # Erst nach dem Senden aktiv - zurückgehaltene Meldungen kommen beim nächsten Tick
+            if not self._allow(rule.name):
+                self.suppressed += 1
+                continue
+
+            self.active.add(rule.name)
+            alert = Alert(rule.name, rule.message(value, state), value, rule.threshold, state.time)
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception as e:
+                    print(f"Alert-Senke Fehler: {e}")
+            sent.append(alert)
+        return sent
+
+    def _allow(self, name: str) -> bool:
+        """Cooldown je Regel und Obergrenze pro Stunde"""
+        now = self.clock()
+        last = self.last_sent.get(name)
+        if last is not None and now - last < self.cooldown:
+            return False
+
+        while self.sent and now - self.sent[0] >= 3600:
+            self.sent.popleft()
+        if len(self.sent) >= self.max_per_hour:
+            return False
+
+        self.last_sent[name] = now
+        self.sent.append(now)
+        return True
+
+
+class LogSink:
+    """Alerts als JSON-Zeilen an eine Datei anhängen"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, alert: Alert):
+        line = json.dumps(alert.to_dict(), ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+
+class WebhookSink:
+    """Alerts per HTTP POST (JSON) senden - im Hintergrund, der Sync wartet nicht"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alert: Alert):
+        threading.Thread(target=self.post, args=(alert.to_dict(),), daemon=True).start()
+
+    def post(self, payload: Dict) -> bool:
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                return True
+        except Exception as e:
+            print(f"Webhook Fehler: {e}")
+            return False
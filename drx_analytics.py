@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Analytics Engine
+Performance-Kennzahlen auf zusammenhängenden NumPy-Arrays
+
+Eingabe sind die geschlossenen Trades als Spalten (profit, commission, swap,
+close_time in Unix-Sekunden), per DatabaseManager.load_columns direkt aus
+SQLite geladen. Jede Kennzahl wird in einem vektorisierten Durchlauf
+berechnet - keine Python-Schleife pro Trade.
+
+Benchmark:
+    python drx_analytics.py --benchmark 10000000
+"""
+
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from drx_core import DatabaseManager
+
+DAY_SECONDS = 86400
+TRADING_DAYS_PER_YEAR = 252
+ROLLING_WINDOWS = (20, 50, 100)
+# Mehr geänderte Trades seit dem letzten Stand: rollierende Fenster neu aufsetzen
+ROLLING_MAX_CHANGES = 500
+
+
+@dataclass
+class TradeArrays:
+    """Spalten der geschlossenen Trades, nach close_time sortiert"""
+    profit: np.ndarray
+    commission: np.ndarray
+    swap: np.ndarray
+    close_time: np.ndarray
+
+    @property
+    def net(self) -> np.ndarray:
+        return self.profit + self.commission + self.swap
+
+    def __len__(self) -> int:
+        return len(self.profit)
+
+
+@dataclass
+class PerformanceStats:
+    """Ergebnis der Performance-Analyse"""
+    trades: int = 0
+    wins: int = 0
+    losses: int = 0
+    win_rate: float = 0.0
+    net_pnl: float = 0.0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    profit_factor: float = 0.0
+    expectancy: float = 0.0
+    avg_win: float = 0.0
+    avg_loss: float = 0.0
+    max_drawdown: float = 0.0
+    # Prozent und Ratios nur mit bekanntem Startkapital (sonst None)
+    max_drawdown_pct: Optional[float] = None
+    max_drawdown_duration: float = 0.0  # Sekunden
+    sharpe: Optional[float] = None
+    sortino: Optional[float] = None
+    max_win_streak: int = 0
+    max_loss_streak: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def load_closed_trades(db: "DatabaseManager", ids: Optional[Sequence[str]] = None) -> TradeArrays:
+    """
+    Geschlossene Trades spaltenweise aus SQLite laden.
+
+    ids: nur diese Trades (z.B. changed_ids() aus DatabaseManager.changes_since).
+    """
+    where = "status = 'closed' AND close_time IS NOT NULL"
+    params: Tuple = ()
+    if ids is not None:
+        if not ids:
+            empty = np.empty(0)
+            return TradeArrays(empty, empty, empty, np.empty(0, dtype=np.int64))
+        where += f" AND id IN ({', '.join('?' * len(ids))})"
+        params = tuple(ids)
+    columns = db.load_columns(
+        ('profit', 'commission', 'swap', 'close_time'),
+        where=where,
+        params=params,
+        order_by='close_time',
+    )
+    return TradeArrays(
+        profit=np.nan_to_num(columns['profit']),
+        commission=np.nan_to_num(columns['commission']),
+        swap=np.nan_to_num(columns['swap']),
+        close_time=columns['close_time'],
+    )
+
+
+# =============================================================================
+# EINZELNE KENNZAHLEN
+# =============================================================================
+
+def drawdown(net: np.ndarray, close_time: np.ndarray,
+             initial_balance: float = 0.0) -> Tuple[float, float, float]:
+    """Max. Drawdown absolut, in Prozent vom Hoch und längste Dauer unter Hoch (s)"""
+    if len(net) == 0:
+        return 0.0, 0.0, 0.0
+
+    # Startpunkt vor dem ersten Trade mitnehmen (Hoch = Startkapital)
+    equity = np.empty(len(net) + 1)
+    equity[0] = initial_balance
+    np.cumsum(net, out=equity[1:])
+    equity[1:] += initial_balance
+
+    peak = np.maximum.accumulate(equity)
+    dd = peak - equity
+    max_dd = float(dd.max())
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd_pct = np.where(peak > 0, dd / peak, 0.0)
+    max_dd_pct = float(dd_pct.max()) * 100.0
+
+    # Dauer: Abstand zum letzten Hoch (Index des letzten Punkts mit dd == 0)
+    times = np.empty(len(net) + 1, dtype=np.int64)
+    times[0] = close_time[0]
+    times[1:] = close_time
+    at_peak = np.where(dd == 0, np.arange(len(dd)), 0)
+    last_peak = np.maximum.accumulate(at_peak)
+    max_duration = float((times - times[last_peak]).max())
+
+    return max_dd, max_dd_pct, max_duration
+
+
+def daily_returns(net: np.ndarray, close_time: np.ndarray,
+                  initial_balance: float = 0.0) -> np.ndarray:
+    """
+    Tägliche Returns (Mo-Fr mit Nullen aufgefüllt, Wochenende nur mit Trades).
+    Ohne Startkapital werden die täglichen P&L-Beträge zurückgegeben.
+    """
+    if len(net) == 0:
+        return np.empty(0)
+
+    days = close_time // DAY_SECONDS
+    first = int(days.min())
+    pnl = np.bincount(days - first, weights=net)
+
+    # 1970-01-01 war ein Donnerstag -> (Tag + 3) % 7: 0 = Montag
+    weekday = (np.arange(first, first + len(pnl)) + 3) % 7
+    keep = (weekday < 5) | (pnl != 0)
+    pnl = pnl[keep]
+
+    if initial_balance <= 0:
+        return pnl
+
+    start_equity = initial_balance + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(start_equity > 0, pnl / start_equity, 0.0)
+    return returns
+
+
+def sharpe_sortino(returns: np.ndarray,
+                   periods_per_year: int = TRADING_DAYS_PER_YEAR) -> Tuple[float, float]:
+    """Annualisierte Sharpe- und Sortino-Ratio (risikofreier Zins = 0)"""
+    if len(returns) < 2:
+        return 0.0, 0.0
+
+    mean = returns.mean()
+    std = returns.std(ddof=1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    scale = np.sqrt(periods_per_year)
+
+    sharpe = float(mean / std * scale) if std > 0 else 0.0
+    sortino = float(mean / downside * scale) if downside > 0 else 0.0
+    return sharpe, sortino
+
+
+def streaks(net: np.ndarray) -> Tuple[int, int]:
+    """Längste Gewinn- und Verlustserie (Run-Length über Vorzeichenwechsel)"""
+    if len(net) == 0:
+        return 0, 0
+
+    sign = np.sign(net).astype(np.int8)
+    change = np.flatnonzero(np.diff(sign)) + 1
+    starts = np.concatenate(([0], change))
+    lengths = np.diff(np.concatenate((starts, [len(sign)])))
+    run_sign = sign[starts]
+
+    max_win = int(lengths[run_sign > 0].max()) if (run_sign > 0).any() else 0
+    max_loss = int(lengths[run_sign < 0].max()) if (run_sign < 0).any() else 0
+    return max_win, max_loss
+
+
+# =============================================================================
+# GESAMT
+# =============================================================================
+
+def compute_performance(arrays: TradeArrays,
+                        initial_balance: Optional[float] = None) -> PerformanceStats:
+    """
+    Alle Kennzahlen für die geschlossenen Trades berechnen.
+
+    Drawdown in % sowie Sharpe/Sortino (auf täglichen Returns) brauchen das
+    Startkapital - ohne bleiben sie None statt auf P&L-Beträgen zu rechnen.
+    """
+    stats = PerformanceStats()
+    n = len(arrays)
+    if n == 0:
+        return stats
+
+    balance = float(initial_balance or 0.0)
+    net = arrays.net
+    close_time = arrays.close_time
+
+    wins = net > 0
+    losses = net < 0
+    gross_profit = float(net[wins].sum())
+    gross_loss = float(-net[losses].sum())
+
+    stats.trades = n
+    stats.wins = int(wins.sum())
+    stats.losses = int(losses.sum())
+    stats.win_rate = stats.wins / n * 100.0
+    stats.net_pnl = float(net.sum())
+    stats.gross_profit = gross_profit
+    stats.gross_loss = gross_loss
+    if gross_loss > 0:
+        stats.profit_factor = gross_profit / gross_loss
+    elif gross_profit > 0:
+        stats.profit_factor = float('inf')
+    stats.expectancy = stats.net_pnl / n
+    stats.avg_win = gross_profit / stats.wins if stats.wins else 0.0
+    stats.avg_loss = -gross_loss / stats.losses if stats.losses else 0.0
+
+    max_dd, max_dd_pct, stats.max_drawdown_duration = drawdown(net, close_time, balance)
+    stats.max_drawdown = max_dd
+    if balance > 0:
+        stats.max_drawdown_pct = max_dd_pct
+        stats.sharpe, stats.sortino = sharpe_sortino(daily_returns(net, close_time, balance))
+    stats.max_win_streak, stats.max_loss_streak = streaks(net)
+
+    return stats
+
+
+# =============================================================================
+# ROLLIERENDE FENSTER
+# =============================================================================
+
+class RollingWindow:
+    """
+    Rollierendes Fenster über die letzten `size` Trade-Ergebnisse.
+
+    append() ist O(1) (amortisiert): laufende Summe und Gewinnzähler,
+    Welford-Varianz mit Entfernen des ältesten Werts und monotone Deques
+    für Minimum/Maximum.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Deque[float] = deque()
+        self.count = 0          # insgesamt verarbeitete Werte
+        self.wins = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._min: Deque[Tuple[int, float]] = deque()
+
+    def append(self, value: float):
+        """Neues Ergebnis aufnehmen, ältestes ggf. verdrängen"""
+        value = float(value)
+        self.values.append(value)
+        self.wins += value > 0
+
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            self.wins -= old > 0
+            # Welford mit konstanter Fensterlänge (Austausch old -> value)
+            old_mean = self.mean
+            self.mean += (value - old) / self.size
+            self.m2 += (value - old) * (value - self.mean + old - old_mean)
+        else:
+            n = len(self.values)
+            delta = value - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (value - self.mean)
+
+        index = self.count
+        self.count += 1
+        expired = self.count - self.size
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._max[0][0] < expired:
+            self._max.popleft()
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._min[0][0] < expired:
+            self._min.popleft()
+
+    def extend(self, values: Iterable[float]):
+        for value in values:
+            self.append(value)
+
+    def seed(self, tail: np.ndarray, total_count: int, mean: float, m2: float, wins: int):
+        """Zustand aus vektorisiert berechneten Werten übernehmen"""
+        self.values = deque(float(v) for v in tail)
+        self.count = total_count
+        self.wins = int(wins)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+        # Monotone Deques aus dem (kleinen) Fensterinhalt aufbauen
+        self._max.clear()
+        self._min.clear()
+        first_index = total_count - len(tail)
+        for offset, value in enumerate(self.values):
+            index = first_index + offset
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((index, value))
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((index, value))
+
+    @property
+    def filled(self) -> int:
+        return len(self.values)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / len(self.values) * 100.0 if self.values else 0.0
+
+    @property
+    def expectancy(self) -> float:
+        return self.mean if self.values else 0.0
+
+    @property
+    def volatility(self) -> float:
+        n = len(self.values)
+        return float(np.sqrt(max(self.m2, 0.0) / (n - 1))) if n > 1 else 0.0
+
+    @property
+    def maximum(self) -> float:
+        return self._max[0][1] if self._max else 0.0
+
+    @property
+    def minimum(self) -> float:
+        return self._min[0][1] if self._min else 0.0
+
+
+def rolling_series(net: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    """Komplette rollierende Reihen per Cumsum-Differenzen (für Start und Charts)"""
+    n = len(net)
+    if n == 0:
+        empty = np.empty(0)
+        return {'wins': np.empty(0, dtype=np.int64), 'win_rate': empty, 'expectancy': empty,
+                'volatility': empty}
+
+    csum = np.concatenate(([0.0], np.cumsum(net)))
+    csq = np.concatenate(([0.0], np.cumsum(net * net)))
+    cwin = np.concatenate(([0], np.cumsum(net > 0)))
+
+    end = np.arange(1, n + 1)
+    start = np.maximum(end - size, 0)
+    length = (end - start).astype(np.float64)
+
+    total = csum[end] - csum[start]
+    total_sq = csq[end] - csq[start]
+    mean = total / length
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = np.where(length > 1, (total_sq - length * mean * mean) / (length - 1), 0.0)
+
+    wins = cwin[end] - cwin[start]
+    return {
+        'wins': wins,
+        'win_rate': wins / length * 100.0,
+        'expectancy': mean,
+        'volatility': np.sqrt(np.maximum(var, 0.0)),
+    }
+
+
+class RollingMetrics:
+    """Mehrere rollierende Fenster (Standard 20/50/100 Trades)"""
+
+    def __init__(self, sizes: Tuple[int, ...] = ROLLING_WINDOWS):
+        self.windows = {size: RollingWindow(size) for size in sizes}
+        self.initialized = False
+        self.last_close_time: Optional[int] = None  # jüngster verarbeiteter Trade (Unix-Sekunden)
+        self.version = 0  # Generation der trades-Tabelle, bis zu der nachgeführt ist
+
+    @property
+    def count(self) -> int:
+        first = next(iter(self.windows.values()), None)
+        return first.count if first else 0
+
+    def initialize(self, net: np.ndarray, close_time: Optional[np.ndarray] = None):
+        """Startzustand vektorisiert aus allen bisherigen Ergebnissen (nach close_time sortiert)"""
+        net = np.asarray(net, dtype=np.float64)
+        self.last_close_time = int(close_time[-1]) if close_time is not None and len(close_time) else None
+        for size, window in self.windows.items():
+            tail = net[-size:]
+            mean = m2 = 0.0
+            wins = 0
+            if len(tail):
+                # Endstand der Cumsum-Reihen = aktuelles Fenster
+                series = rolling_series(net, size)
+                mean = float(series['expectancy'][-1])
+                m2 = float(series['volatility'][-1]) ** 2 * (len(tail) - 1)
+                wins = int(series['wins'][-1])
+            window.seed(tail, len(net), mean, m2, wins)
+        self.initialized = True
+
+    def can_extend(self, close_time: np.ndarray) -> bool:
+        """
+        Neue Trades (nach close_time sortiert) lassen sich nur anhängen, wenn keiner
+        vor dem zuletzt verarbeiteten geschlossen wurde - sonst neu aufsetzen
+        (z.B. Import oder verspätet synchronisierter Trade).
+        """
+        if len(close_time) == 0 or self.last_close_time is None:
+            return True
+        return int(close_time[0]) >= self.last_close_time
+
+    def extend(self, net: Iterable[float], close_time: Optional[np.ndarray] = None):
+        """Nur neu geschlossene Trades nachschieben"""
+        for value in net:
+            for window in self.windows.values():
+                window.append(value)
+        if close_time is not None and len(close_time):
+            last = int(close_time[-1])
+            self.last_close_time = last if self.last_close_time is None else max(self.last_close_time, last)
+
+    def refresh(self, db: "DatabaseManager"):
+        """
+        Aus der Datenbank nachführen: neue geschlossene Trades über das Änderungs-Log
+        anhängen, bei Löschungen, Änderungen bereits gezählter Trades (Anzahl passt
+        dann nicht) oder älterer close_time komplett neu aufsetzen.
+        """
+        if self.initialized:
+            changes = db.changes_since(self.version)
+            if (changes.complete and not changes.deleted_ids()
+                    and len(changes.changed_ids()) <= ROLLING_MAX_CHANGES):
+                closed_count = db.get_trade_summary()['closed_trades']
+                new = load_closed_trades(db, ids=changes.changed_ids())
+                if self.count + len(new) == closed_count and self.can_extend(new.close_time):
+                    self.extend(new.net, new.close_time)
+                    self.version = changes.version
+                    return
+
+        version = db.get_generation()
+        arrays = load_closed_trades(db)
+        self.initialize(arrays.net, arrays.close_time)
+        self.version = max(version, 0)
+
+    def snapshot(self) -> Dict[int, Dict[str, float]]:
+        return {
+            size: {
+                'trades': window.filled,
+                'win_rate': window.win_rate,
+                'expectancy': window.expectancy,
+                'volatility': window.volatility,
+                'best': window.maximum,
+                'worst': window.minimum,
+            }
+            for size, window in self.windows.items()
+        }
+
+
+def synthetic_trades(n: int, seed: int = 42) -> TradeArrays:
+    """Zufällige Trades für Benchmarks"""
+    rng = np.random.default_rng(seed)
+    start = 1_500_000_000
+    close_time = start + np.sort(rng.integers(0, 8 * 365 * DAY_SECONDS, size=n))
+    return TradeArrays(
+        profit=rng.normal(5.0, 100.0, size=n),
+        commission=-np.abs(rng.normal(2.0, 0.5, size=n)),
+        swap=rng.normal(0.0, 1.0, size=n),
+        close_time=close_time.astype(np.int64),
+    )
+
+
+def run_benchmark(n: int = 10_000_000):
+    """Benchmark über n synthetische Trades"""
+    print(f"🧪 Analytics Benchmark mit {n:,} Trades")
+
+    t0 = time.perf_counter()
+    arrays = synthetic_trades(n)
+    t1 = time.perf_counter()
+    print(f"   Daten erzeugt:  {t1 - t0:.2f}s")
+
+    net = arrays.net
+    timings = {}
+    for name, func in [
+        ("Drawdown", lambda: drawdown(net, arrays.close_time, 100_000.0)),
+        ("Daily Returns", lambda: daily_returns(net, arrays.close_time, 100_000.0)),
+        ("Streaks", lambda: streaks(net)),
+        ("Gesamt", lambda: compute_performance(arrays, 100_000.0)),
+    ]:
+        start = time.perf_counter()
+        func()
+        timings[name] = time.perf_counter() - start
+        print(f"   {name + ':':<15} {timings[name]:.3f}s")
+
+    stats = compute_performance(arrays, 100_000.0)
+    print(f"   Profit Factor {stats.profit_factor:.2f}, Sharpe {stats.sharpe:.2f}, "
+          f"Max DD {stats.max_drawdown_pct:.1f}%")
+    return timings
+
+
+if __name__ == "__main__":
+    count = 10_000_000
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        count = int(sys.argv[2])
+    run_benchmark(count)
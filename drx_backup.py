@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Backup
+Online-Backups über die SQLite-Backup-API, auch während der Sync schreibt
+
+Die Kopie läuft in Seiten-Batches innerhalb einer Lesetransaktion: der
+Stand ist konsistent, Schreiber (WAL) laufen weiter, und die Kopie muss
+nicht bei jeder Änderung neu beginnen.
+
+Inkrementell (optional): Jede Seite wird gehasht und nur geänderte, noch
+unbekannte Seiten werden komprimiert im Seiten-Speicher (drx_pages.db)
+abgelegt. Ein Snapshot speichert nur die Seiten, die sich gegenüber dem
+vorherigen geändert haben.
+
+Konfiguration in drx_config.json:
+    "backup": {
+        "auto": true,
+        "interval_hours": 1,
+        "incremental": true,
+        "keep_last": 24,
+        "keep_daily": 14,
+        "keep_weekly": 8
+    }
+
+Verwendung:
+    python drx_backup.py                     Vollbackup nach BACKUP_DIR
+    python drx_backup.py --incremental       Snapshot im Seiten-Speicher
+    python drx_backup.py --list
+    python drx_backup.py --restore 12 wiederhergestellt.db
+
+Nur Standardbibliothek - läuft auch im Headless-Sync.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from drx_core import BACKUP_DIR, DATABASE_FILE
+
+# Seiten je Backup-Schritt und Pause dazwischen (Sekunden)
+BACKUP_PAGES = 1024
+BACKUP_SLEEP = 0.005
+
+BACKUP_PREFIX = "drx_backup_"
+BACKUP_TIME_FORMAT = "%Y%m%d_%H%M%S"
+PAGE_STORE_FILE = "drx_pages.db"
+PAGE_COMPRESSION = 6
+PAGE_HASH_SIZE = 16
+
+# Standard-Aufbewahrung (Anzahl Backups bzw. Tage/Wochen mit je einem Backup)
+DEFAULT_KEEP_LAST = 10
+DEFAULT_KEEP_DAILY = 7
+DEFAULT_KEEP_WEEKLY = 4
+
+# Fortschritt: (kopierte Seiten, Seiten gesamt)
+BackupProgress = Callable[[int, int], None]
+
+
+@dataclass
+class BackupResult:
+    """Ergebnis eines Backups"""
+    path: str
+    created: datetime
+    pages: int
+    stored_pages: int  # neu geschriebene Seiten (Vollbackup: alle)
+    stored_bytes: int
+    seconds: float
+    snapshot_id: Optional[int] = None
+
+
+def online_backup(src_file: str, dest_file: str, pages: int = BACKUP_PAGES,
+                  progress: Optional[BackupProgress] = None, sleep: float = BACKUP_SLEEP) -> int:
+    """Konsistente Kopie per Backup-API (temporäre Datei + os.replace) - gibt die Seitenzahl zurück"""
+    tmp_file = f"{dest_file}.tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    src = sqlite3.connect(src_file, isolation_level=None)
+    try:
+        # Lesetransaktion offen halten: ohne sie beginnt die Kopie bei jedem
+        # Commit eines anderen Prozesses von vorn
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        dest = sqlite3.connect(tmp_file)
+        try:
+            def on_step(status, remaining, total):
+                if progress is not None:
+                    progress(total - remaining, total)
+
+            src.backup(dest, pages=pages, progress=on_step, sleep=sleep)
+            page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            dest.close()
+        src.execute("COMMIT")
+    finally:
+        src.close()
+
+    os.replace(tmp_file, dest_file)
+    return page_count
+
+
+def backup_name(created: datetime) -> str:
+    return f"{BACKUP_PREFIX}{created.strftime(BACKUP_TIME_FORMAT)}.db"
+
+
+def backup_time(name: str) -> Optional[datetime]:
+    """Zeitpunkt aus dem Dateinamen eines Vollbackups (None = keine Backup-Datei)"""
+    if not (name.startswith(BACKUP_PREFIX) and name.endswith(".db")):
+        return None
+    try:
+        return datetime.strptime(name[len(BACKUP_PREFIX):-3], BACKUP_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def expired_backups(times: Sequence[datetime], keep_last: int = DEFAULT_KEEP_LAST,
+                    keep_daily: int = DEFAULT_KEEP_DAILY,
+                    keep_weekly: int = DEFAULT_KEEP_WEEKLY) -> List[int]:
+    """
+    Indizes der zu löschenden Backups. Erhalten bleiben die letzten keep_last,
+    das jeweils neueste der letzten keep_daily Tage und keep_weekly Wochen.
+    """
+    order = sorted(range(len(times)), key=lambda i: times[i], reverse=True)
+    keep = set(order[:keep_last])
+    days: set = set()
+    weeks: set = set()
+    for i in order:
+        day = times[i].date()
+        if len(days) < keep_daily and day not in days:
+            days.add(day)
+            keep.add(i)
+        week = times[i].isocalendar()[:2]
+        if len(weeks) < keep_weekly and week not in weeks:
+            weeks.add(week)
+            keep.add(i)
+    return sorted(i for i in range(len(times)) if i not in keep)
+
+
+class PageStore:
+    """
+    Seiten-Speicher für inkrementelle Backups.
+
+    pages enthält jede unterschiedliche Seite einmal (zlib, eindeutiger Hash),
+    snapshot_pages je Snapshot nur die gegenüber dem Vorgänger geänderten
+    Seiten. Der Stand eines Snapshots ist je Seite der Eintrag mit der
+    höchsten snapshot_id <= Snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = self._connect()
+        try:
+            conn.executescript('''
+                PRAGMA auto_vacuum = INCREMENTAL;
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS pages (
+                    id INTEGER PRIMARY KEY,
+                    hash BLOB NOT NULL UNIQUE,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    created TEXT NOT NULL,
+                    page_size INTEGER NOT NULL,
+                    page_count INTEGER NOT NULL,
+                    stored_pages INTEGER NOT NULL DEFAULT 0,
+                    stored_bytes INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS snapshot_pages (
+                    snapshot_id INTEGER NOT NULL,
+                    page_no INTEGER NOT NULL,
+                    page_id INTEGER NOT NULL REFERENCES pages (id),
+                    PRIMARY KEY (snapshot_id, page_no)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_snapshot_pages_latest
+                ON snapshot_pages (page_no, snapshot_id, page_id);
+                CREATE INDEX IF NOT EXISTS idx_snapshot_pages_page ON snapshot_pages (page_id);
+            ''')
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, isolation_level=None)
+
+    def snapshots(self) -> List[Tuple[int, datetime, int, int, int]]:
+        """(id, Zeitpunkt, Seiten, neu gespeicherte Seiten, neu gespeicherte Bytes) - älteste zuerst"""
+        conn = self._connect()
+        try:
+            return [
+                (row[0], datetime.fromisoformat(row[1]), row[2], row[3], row[4])
+                for row in conn.execute('''
+                    SELECT id, created, page_count, stored_pages, stored_bytes FROM snapshots ORDER BY id
+                ''')
+            ]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _latest_pages(conn: sqlite3.Connection, snapshot_id: int, page_count: int):
+        """(page_no, page_id, hash) des Snapshots, nach Seite sortiert"""
+        return conn.execute('''
+            SELECT latest.page_no, latest.page_id, pages.hash
+            FROM (
+                SELECT page_no, page_id, MAX(snapshot_id) FROM snapshot_pages
+                WHERE snapshot_id <= ? AND page_no < ?
+                GROUP BY page_no
+            ) AS latest
+            JOIN pages ON pages.id = latest.page_id
+            ORDER BY latest.page_no
+        ''', (snapshot_id, page_count))
+
+    def add(self, snapshot_file: str, created: Optional[datetime] = None) -> Tuple[int, int, int, int]:
+        """Datenbank-Kopie aufnehmen - (snapshot_id, Seiten, neue Seiten, neue Bytes)"""
+        with open(snapshot_file, 'rb') as f:
+            header = f.read(100)
+        # Seitengröße steht big-endian an Offset 16 (1 = 65536)
+        page_size = int.from_bytes(header[16:18], 'big')
+        page_size = 65536 if page_size == 1 else page_size
+        page_count = os.path.getsize(snapshot_file) // page_size
+        created = created or datetime.now()
+
+        conn = self._connect()
+        try:
+            previous: List[Optional[bytes]] = []
+            row = conn.execute("SELECT id, page_count FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+            if row is not None:
+                previous = [None] * row[1]
+                for page_no, _, digest in self._latest_pages(conn, row[0], row[1]):
+                    previous[page_no] = digest
+
+            conn.execute("BEGIN IMMEDIATE")
+            snapshot_id = conn.execute('''
+                INSERT INTO snapshots (created, page_size, page_count) VALUES (?, ?, ?)
+            ''', (created.isoformat(), page_size, page_count)).lastrowid
+
+            stored_pages = stored_bytes = 0
+            changed: List[tuple] = []
+            with open(snapshot_file, 'rb') as f:
+                for page_no in range(page_count):
+                    page = f.read(page_size)
+                    digest = hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).digest()
+                    if page_no < len(previous) and previous[page_no] == digest:
+                        continue
+
+                    known = conn.execute("SELECT id FROM pages WHERE hash = ?", (digest,)).fetchone()
+                    if known is not None:
+                        page_id = known[0]
+                    else:
+                        data = zlib.compress(page, PAGE_COMPRESSION)
+                        page_id = conn.execute("INSERT INTO pages (hash, data) VALUES (?, ?)",
+                                               (digest, data)).lastrowid
+                        stored_pages += 1
+                        stored_bytes += len(data)
+                    changed.append((snapshot_id, page_no, page_id))
+
+                    if len(changed) >= 10000:
+                        conn.executemany("INSERT INTO snapshot_pages VALUES (?, ?, ?)", changed)
+                        changed.clear()
+
+            conn.executemany("INSERT INTO snapshot_pages VALUES (?, ?, ?)", changed)
+            conn.execute("UPDATE snapshots SET stored_pages = ?, stored_bytes = ? WHERE id = ?",
+                         (stored_pages, stored_bytes, snapshot_id))
+            conn.execute("COMMIT")
+            return snapshot_id, page_count, stored_pages, stored_bytes
+
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def restore(self, snapshot_id: int, dest_file: str):
+        """Snapshot als Datenbank-Datei schreiben"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT page_count FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Snapshot {snapshot_id} nicht gefunden")
+            page_count = row[0]
+
+            tmp_file = f"{dest_file}.tmp"
+            expected = 0
+            with open(tmp_file, 'wb') as f:
+                for page_no, page_id, _ in self._latest_pages(conn, snapshot_id, page_count).fetchall():
+                    if page_no != expected:
+                        raise ValueError(f"Snapshot {snapshot_id}: Seite {expected} fehlt")
+                    data = conn.execute("SELECT data FROM pages WHERE id = ?", (page_id,)).fetchone()[0]
+                    f.write(zlib.decompress(data))
+                    expected += 1
+            if expected != page_count:
+                raise ValueError(f"Snapshot {snapshot_id}: {page_count - expected} Seiten fehlen")
+            os.replace(tmp_file, dest_file)
+        finally:
+            conn.close()
+
+    def delete(self, snapshot_ids: Sequence[int]) -> int:
+        """
+        Snapshots löschen. Einträge, die der Nachfolger noch braucht, gehen auf
+        ihn über; danach werden nicht mehr referenzierte Seiten entfernt.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for snapshot_id in sorted(snapshot_ids):
+                successor = conn.execute("SELECT MIN(id) FROM snapshots WHERE id > ?",
+                                         (snapshot_id,)).fetchone()[0]
+                if successor is not None:
+                    conn.execute('''
+                        INSERT OR IGNORE INTO snapshot_pages (snapshot_id, page_no, page_id)
+                        SELECT ?, page_no, page_id FROM snapshot_pages WHERE snapshot_id = ?
+                    ''', (successor, snapshot_id))
+                conn.execute("DELETE FROM snapshot_pages WHERE snapshot_id = ?", (snapshot_id,))
+                conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+
+            removed = conn.execute('''
+                DELETE FROM pages WHERE NOT EXISTS (
+                    SELECT 1 FROM snapshot_pages WHERE snapshot_pages.page_id = pages.id
+                )
+            ''').rowcount
+            conn.execute("COMMIT")
+            # Freie Seiten abgeben - executescript, da execute nur eine Seite freigibt
+            conn.executescript("PRAGMA incremental_vacuum;")
+            return removed
+
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+class BackupManager:
+    """
+    Voll- und inkrementelle Backups nach backup_dir mit Aufbewahrungsregel.
+
+    Es läuft immer nur ein Backup gleichzeitig; start() prüft im Hintergrund
+    einmal pro Minute, ob ein automatisches Backup fällig ist.
+    """
+
+    def __init__(self, db_file: str = DATABASE_FILE, backup_dir: Path = BACKUP_DIR,
+                 interval: float = 24 * 3600, incremental: bool = False,
+                 keep_last: int = DEFAULT_KEEP_LAST, keep_daily: int = DEFAULT_KEEP_DAILY,
+                 keep_weekly: int = DEFAULT_KEEP_WEEKLY):
+        self.db_file = db_file
+        self.backup_dir = Path(backup_dir)
+        self.interval = interval
+        self.incremental = incremental
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self._store: Optional[PageStore] = None
+
+    @classmethod
+    def from_config(cls, db_file: str, config: Dict) -> "BackupManager":
+        """Aus dem Abschnitt "backup" der Config"""
+        return cls(db_file, Path(config.get('dir') or BACKUP_DIR),
+                   interval=float(config.get('interval_hours', 24)) * 3600,
+                   incremental=bool(config.get('incremental', False)),
+                   keep_last=int(config.get('keep_last', DEFAULT_KEEP_LAST)),
+                   keep_daily=int(config.get('keep_daily', DEFAULT_KEEP_DAILY)),
+                   keep_weekly=int(config.get('keep_weekly', DEFAULT_KEEP_WEEKLY)))
+
+    @property
+    def store(self) -> PageStore:
+        if self._store is None:
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            self._store = PageStore(str(self.backup_dir / PAGE_STORE_FILE))
+        return self._store
+
+    def full_backups(self) -> List[Tuple[datetime, Path]]:
+        """Vollbackups in backup_dir, älteste zuerst"""
+        if not self.backup_dir.exists():
+            return []
+        backups = []
+        for path in self.backup_dir.iterdir():
+            created = backup_time(path.name)
+            if created is not None:
+                backups.append((created, path))
+        return sorted(backups)
+
+    def last_backup(self) -> Optional[datetime]:
+        """Zeitpunkt des letzten Backups der gewählten Art"""
+        if self.incremental:
+            if not (self.backup_dir / PAGE_STORE_FILE).exists():
+                return None
+            snapshots = self.store.snapshots()
+            return snapshots[-1][1] if snapshots else None
+        backups = self.full_backups()
+        return backups[-1][0] if backups else None
+
+    def due(self, now: Optional[datetime] = None) -> bool:
+        last = self.last_backup()
+        return last is None or ((now or datetime.now()) - last).total_seconds() >= self.interval
+
+    def backup_to(self, dest_file: str, progress: Optional[BackupProgress] = None) -> BackupResult:
+        """Vollbackup in eine beliebige Datei (z.B. manuell gewählt)"""
+        with self.lock:
+            start = time.perf_counter()
+            created = datetime.now()
+            pages = online_backup(self.db_file, dest_file, progress=progress)
+            return BackupResult(dest_file, created, pages, pages, os.path.getsize(dest_file),
+                                time.perf_counter() - start)
+
+    def run_backup(self, progress: Optional[BackupProgress] = None) -> BackupResult:
+        """Backup der gewählten Art nach backup_dir, danach Aufbewahrungsregel anwenden"""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.now()
+        if not self.incremental:
+            result = self.backup_to(str(self.backup_dir / backup_name(created)), progress)
+        else:
+            with self.lock:
+                start = time.perf_counter()
+                # Kopie nur als Zwischenstand - gespeichert werden die geänderten Seiten
+                tmp_file = str(self.backup_dir / "drx_snapshot.tmp.db")
+                try:
+                    online_backup(self.db_file, tmp_file, progress=progress)
+                    snapshot_id, pages, stored_pages, stored_bytes = self.store.add(tmp_file, created)
+                finally:
+                    if os.path.exists(tmp_file):
+                        os.remove(tmp_file)
+                result = BackupResult(self.store.path, created, pages, stored_pages, stored_bytes,
+                                      time.perf_counter() - start, snapshot_id)
+        self.apply_retention()
+        return result
+
+    def apply_retention(self) -> int:
+        """Abgelaufene Backups löschen - gibt die Anzahl zurück"""
+        with self.lock:
+            removed = 0
+            backups = self.full_backups()
+            for i in expired_backups([created for created, _ in backups],
+                                     self.keep_last, self.keep_daily, self.keep_weekly):
+                try:
+                    backups[i][1].unlink()
+                    removed += 1
+                except OSError as e:
+                    print(f"Backup-Löschen Fehler: {e}")
+
+            if (self.backup_dir / PAGE_STORE_FILE).exists():
+                snapshots = self.store.snapshots()
+                expired = expired_backups([created for _, created, *_ in snapshots],
+                                          self.keep_last, self.keep_daily, self.keep_weekly)
+                if expired:
+                    self.store.delete([snapshots[i][0] for i in expired])
+                    removed += len(expired)
+            return removed
+
+    def start(self, on_done: Optional[Callable[[BackupResult], None]] = None,
+              progress: Optional[BackupProgress] = None, check_interval: float = 60):
+        """Automatische Backups im Hintergrund"""
+        if self.thread is not None:
+            return
+
+        def worker():
+            while not self.stop_event.wait(check_interval):
+                try:
+                    if self.due():
+                        result = self.run_backup(progress)
+                        if on_done is not None:
+                            on_done(result)
+                except Exception as e:
+                    print(f"Auto-Backup Fehler: {e}")
+
+        self.thread = threading.Thread(target=worker, name="db-backup", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def format_size(size: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="DRX Trading Tracker - Backup")
+    parser.add_argument('--db', default=DATABASE_FILE, help="Pfad zur Datenbank")
+    parser.add_argument('--dir', default=str(BACKUP_DIR), help="Backup-Ordner")
+    parser.add_argument('--incremental', action='store_true', help="Snapshot im Seiten-Speicher")
+    parser.add_argument('--list', action='store_true', help="Vorhandene Backups anzeigen")
+    parser.add_argument('--restore', nargs=2, metavar=('SNAPSHOT', 'ZIEL'),
+                        help="Inkrementellen Snapshot als Datenbank wiederherstellen")
+    args = parser.parse_args(argv)
+
+    manager = BackupManager(args.db, Path(args.dir), incremental=args.incremental)
+
+    if args.list:
+        for created, path in manager.full_backups():
+            print(f"{created:%Y-%m-%d %H:%M:%S}  {path.name}  {format_size(path.stat().st_size)}")
+        if (manager.backup_dir / PAGE_STORE_FILE).exists():
+            for snapshot_id, created, pages, stored_pages, stored_bytes in manager.store.snapshots():
+                print(f"{created:%Y-%m-%d %H:%M:%S}  Snapshot {snapshot_id}: {pages} Seiten, "
+                      f"{stored_pages} neu ({format_size(stored_bytes)})")
+        return 0
+
+    if args.restore:
+        manager.store.restore(int(args.restore[0]), args.restore[1])
+        print(f"✅ Snapshot {args.restore[0]} -> {args.restore[1]}")
+        return 0
+
+    def progress(done: int, total: int):
+        print(f"\r💾 {done}/{total} Seiten", end='', flush=True)
+
+    result = manager.run_backup(progress)
+    print()
+    print(f"✅ {result.path}: {result.pages} Seiten, {result.stored_pages} gespeichert "
+          f"({format_size(result.stored_bytes)}) in {result.seconds:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
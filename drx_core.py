@@ -0,0 +1,2418 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Core
+Datenmodell, Datenbank und Broker-Anbindung ohne GUI-/Plotting-Abhängigkeiten
+
+Wird von der GUI (Drx Trading Tracker.py) und vom Headless-Sync (drx_headless.py)
+gemeinsam genutzt.
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import stat
+import platform
+import queue
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from pathlib import Path
+from dataclasses import dataclass, fields, replace
+from typing import (
+    TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Tuple, Union
+)
+
+if TYPE_CHECKING:
+    from drx_exposure import ExposureEngine
+
+# System-spezifische Imports
+SYSTEM = platform.system()
+winshell_available = False
+mt5_available = False
+
+if SYSTEM == "Windows":
+    try:
+        import winshell
+        winshell_available = True
+    except ImportError:
+        winshell_available = False
+    
+    try:
+        import MetaTrader5
+        mt5_available = True
+    except ImportError:
+        mt5_available = False
+
+# Konfiguration
+APP_VERSION = "1.2.1"
+APP_NAME = "DRX Trading Tracker"
+
+# Platform-spezifische Pfade
+if SYSTEM == "Windows":
+    data_dir = Path.home() / "Documents" / "DRX Trading Tracker"
+elif SYSTEM == "Darwin":
+    data_dir = Path.home() / "Documents" / "DRX Trading Tracker"
+else:
+    data_dir = Path.home() / ".drx_trading_tracker"
+
+data_dir.mkdir(parents=True, exist_ok=True)
+
+DATABASE_FILE = str(data_dir / "drx_trades.db")
+CONFIG_FILE = str(data_dir / "drx_config.json")
+LOG_FILE = str(data_dir / "drx_log.txt")
+ALERT_LOG_FILE = str(data_dir / "drx_alerts.log")
+SNAPSHOT_FILE = str(data_dir / "drx_snapshot.json")
+MARKET_DATA_DIR = data_dir / "market_data"
+BACKUP_DIR = data_dir / "backups"
+
+# Fehlende Zeit in int64-Zeitspalten (entspricht NumPy NaT)
+NAT_SECONDS = -2 ** 63
+
+# Symbol-Metadaten: Gültigkeit und Mindestabstand zwischen Abrufversuchen (Sekunden)
+SYMBOL_INFO_TTL = 24 * 3600
+SYMBOL_INFO_RETRY = 60
+# Dem Terminal unbekannte Symbole (z.B. Import von einem anderen Broker) erst danach erneut anfragen
+SYMBOL_INFO_MISS_TTL = 3600
+
+# Konto-Verlauf: unveränderte Werte höchstens so oft speichern, Aufräumen alle ACCOUNT_PRUNE_INTERVAL (Sekunden)
+ACCOUNT_SAMPLE_HEARTBEAT = 60
+ACCOUNT_PRUNE_INTERVAL = 3600
+
+# Archiv: geschlossene Trades, die älter sind, wandern in Jahres-Dateien (Tage)
+ARCHIVE_KEEP_DAYS = 365
+
+def slotted(cls):
+    """
+    Dataclass mit __slots__ neu erzeugen (wie @dataclass(slots=True) ab Python 3.10).
+    
+    Kein __dict__ pro Instanz - bei Millionen geladener Trades spürbar weniger Speicher.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+@slotted
+@dataclass
+class Trade:
+    """Trade-Datenklasse"""
+    id: str
+    symbol: str
+    type: str
+    lots: float
+    open_price: float
+    close_price: Optional[float] = None
+    open_time: Optional[datetime] = None
+    close_time: Optional[datetime] = None
+    profit: float = 0.0
+    commission: float = 0.0
+    swap: float = 0.0
+    comment: str = ""
+    magic: int = 0
+    status: str = "open"
+
+@dataclass
+class TradeFilter:
+    """Filter für query_trades / iter_trades (None = nicht filtern)"""
+    symbol: Optional[str] = None
+    status: Optional[str] = None
+    type: Optional[str] = None
+    magic: Optional[int] = None
+    open_from: Optional[Union[datetime, str]] = None
+    open_to: Optional[Union[datetime, str]] = None
+    close_from: Optional[Union[datetime, str]] = None
+    close_to: Optional[Union[datetime, str]] = None
+    profit_min: Optional[float] = None
+    profit_max: Optional[float] = None
+    # Volltextsuche über SEARCH_COLUMNS (Wörter, jeweils als Präfix)
+    text: Optional[str] = None
+
+@slotted
+@dataclass
+class SymbolInfo:
+    """Symbol-Metadaten (aus symbol_info / symbols_get)"""
+    name: str
+    digits: int = 5
+    point: float = 0.00001
+    contract_size: float = 100_000.0
+    tick_size: float = 0.00001
+    tick_value: float = 1.0
+    currency_base: str = ""
+    currency_profit: str = ""
+    currency_margin: str = ""
+    updated_at: Optional[datetime] = None
+    
+    def format_price(self, price: float) -> str:
+        return f"{price:.{self.digits}f}"
+    
+    def to_points(self, distance: float) -> float:
+        """Preisabstand in Punkten"""
+        return distance / self.point if self.point else 0.0
+    
+    def point_value(self, lots: float = 1.0) -> float:
+        """Wert eines Punkts in Kontowährung (aus Tick-Wert und Tick-Größe)"""
+        if not self.tick_size:
+            return 0.0
+        return self.tick_value * self.point / self.tick_size * lots
+
+@dataclass
+class TradePage:
+    """Eine Seite aus query_trades"""
+    trades: List[Trade]
+    # Schlüssel für die nächste Seite (after=...), None am Ende
+    next_key: Optional[tuple] = None
+
+@dataclass
+class ChangeSet:
+    """Änderungen an trades seit einer Version (siehe DatabaseManager.changes_since)"""
+    version: int
+    changes: List[Tuple[int, str, str]]  # (version, trade_id, op)
+    # False: Log reicht nicht bis zur angefragten Version zurück - komplett neu laden
+    complete: bool = True
+    
+    def latest(self) -> Dict[str, str]:
+        """Letzte Operation je Trade ('insert', 'update', 'delete' oder 'archive')"""
+        return {trade_id: op for _, trade_id, op in self.changes}
+    
+    def changed_ids(self) -> List[str]:
+        return [trade_id for trade_id, op in self.latest().items() if op in ('insert', 'update')]
+    
+    def deleted_ids(self) -> List[str]:
+        return [trade_id for trade_id, op in self.latest().items() if op == 'delete']
+    
+    def archived_ids(self) -> List[str]:
+        """Ins Jahres-Archiv verschoben - weiterhin über die Abfragen sichtbar"""
+        return [trade_id for trade_id, op in self.latest().items() if op == 'archive']
+
+class DatabaseWriter:
+    """
+    Einziger Schreib-Thread der Datenbank (Write-Behind).
+    
+    Aufträge (Funktionen, die einen Cursor erhalten) landen in einer Queue und
+    werden spätestens nach `flush_interval` Sekunden gemeinsam in einer
+    Transaktion geschrieben. Jeder Auftrag läuft in einem eigenen SAVEPOINT -
+    ein Fehler verwirft nur diesen Auftrag. Aufträge mit gleichem `key` im
+    selben Batch werden zusammengefasst (nur der letzte wird ausgeführt).
+    Das Future wird erst nach dem COMMIT erfüllt.
+    """
+    
+    def __init__(self, db_file: str, flush_interval: float = 0.05, max_batch: int = 1000):
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.closed = False
+        
+        # Metriken
+        self.jobs = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.last_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+        self.total_commit_ms = 0.0
+    
+    def submit(self, job: Callable[[sqlite3.Cursor], Any], key: Any = None) -> Future:
+        """Schreibauftrag einreihen - das Future liefert den Rückgabewert von job"""
+        future: Future = Future()
+        with self.lock:
+            if self.closed:
+                future.set_exception(RuntimeError("DatabaseWriter ist geschlossen"))
+                return future
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self.thread.start()
+            self.queue.put((job, key, future))
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Warten, bis alle bisher eingereihten Aufträge geschrieben sind"""
+        try:
+            self.submit(lambda cursor: None).result(timeout)
+            return True
+        except Exception:
+            return False
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Restliche Aufträge schreiben und den Thread beenden"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread = self.thread
+        if thread is not None:
+            self.queue.put(None)
+            thread.join(timeout)
+    
+    def metrics(self) -> Dict:
+        """Queue-Tiefe und Commit-Latenz"""
+        return {
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'jobs': self.jobs,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_commit_ms': self.last_commit_ms,
+            'avg_commit_ms': self.total_commit_ms / self.batches if self.batches else 0.0,
+            'max_commit_ms': self.max_commit_ms,
+        }
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Transaktionen werden selbst gesteuert (BEGIN/COMMIT)
+        conn = sqlite3.connect(self.db_file, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA recursive_triggers = ON")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+    
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                
+                batch, stop = self._collect(item)
+                self._write(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+    
+    def _collect(self, first: tuple):
+        """Weitere Aufträge bis zum Intervall-Ende oder max_batch einsammeln"""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]):
+        """Einen Batch in einer Transaktion schreiben"""
+        # Gleiche Schlüssel zusammenfassen: nur der letzte Auftrag wird ausgeführt
+        last_index = {key: i for i, (_, key, _) in enumerate(batch) if key is not None}
+        followers: Dict[int, List[Future]] = {}
+        jobs = []
+        for i, (job, key, future) in enumerate(batch):
+            if key is not None and last_index[key] != i:
+                followers.setdefault(last_index[key], []).append(future)
+                self.coalesced += 1
+            else:
+                jobs.append((i, job, future))
+        
+        start = time.perf_counter()
+        results = []
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for i, job, future in jobs:
+                cursor.execute("SAVEPOINT job")
+                try:
+                    result, error = job(cursor), None
+                    cursor.execute("RELEASE job")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO job")
+                    cursor.execute("RELEASE job")
+                    result, error = None, e
+                    self.failed += 1
+                    print(f"DB-Schreibfehler: {e}")
+                results.append((i, future, result, error))
+            cursor.execute("COMMIT")
+            
+        except Exception as e:
+            print(f"DB-Commit Fehler: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        
+        elapsed = (time.perf_counter() - start) * 1000
+        self.batches += 1
+        self.jobs += len(batch)
+        self.last_commit_ms = elapsed
+        self.max_commit_ms = max(self.max_commit_ms, elapsed)
+        self.total_commit_ms += elapsed
+        
+        for i, future, result, error in results:
+            for target in [future] + followers.get(i, []):
+                if error is not None:
+                    target.set_exception(error)
+                else:
+                    target.set_result(result)
+
+class DatabaseManager:
+    """Datenbank-Manager"""
+    
+    SCHEMA_VERSION = 6
+    
+    # Alle Spalten außer rowversion (Änderungen daran zählen als Trade-Änderung);
+    # das Symbol steht als symbol_id (-> symbols.id) in der Tabelle
+    TRADE_COLUMNS = ('id', 'symbol_id', 'type', 'lots', 'open_price', 'close_price', 'open_time',
+                     'close_time', 'profit', 'commission', 'swap', 'comment', 'magic', 'status')
+    
+    TRADES_TABLE_SQL = '''
+        id TEXT PRIMARY KEY,
+        symbol_id INTEGER NOT NULL REFERENCES symbols (id),
+        type TEXT NOT NULL,
+        lots REAL NOT NULL,
+        open_price REAL NOT NULL,
+        close_price REAL,
+        open_time TEXT,
+        close_time TEXT,
+        profit REAL DEFAULT 0,
+        commission REAL DEFAULT 0,
+        swap REAL DEFAULT 0,
+        comment TEXT,
+        magic INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'open',
+        rowversion INTEGER NOT NULL DEFAULT 0
+    '''
+    
+    # Metadaten-Spalten der symbols-Tabelle (Felder von SymbolInfo)
+    SYMBOL_INFO_COLUMNS = {
+        'digits': "INTEGER",
+        'point': "REAL",
+        'contract_size': "REAL",
+        'tick_size': "REAL",
+        'tick_value': "REAL",
+        'currency_base': "TEXT",
+        'currency_profit': "TEXT",
+        'currency_margin': "TEXT",
+        'updated_at': "TEXT",
+    }
+    
+    # Symbolname zu einer trades-Zeile (Sortierung nach Namen)
+    SYMBOL_NAME_SQL = "(SELECT name FROM symbols WHERE symbols.id = trades.symbol_id)"
+    
+    # Einträge im Änderungs-Log, die beim Start erhalten bleiben
+    CHANGE_LOG_KEEP = 200_000
+    
+    # Konto-Verlauf: Rohwerte (Stufe 0) und Verdichtungsstufen (Bucket in Sekunden)
+    # mit Aufbewahrung in Sekunden (None = unbegrenzt)
+    ACCOUNT_TIERS = (60, 3600, 86400)
+    ACCOUNT_RETENTION = {0: 2 * 86400, 60: 30 * 86400, 3600: 2 * 365 * 86400, 86400: None}
+    
+    # Jahres-Archive: <db>_archive/drx_trades_<Jahr>.db (abgeschlossen ggf. .db.gz)
+    ARCHIVE_PREFIX = "drx_trades_"
+    
+    # Sortierbare Spalten für query_trades (jeweils mit Index auf (Spalte, id))
+    SORT_COLUMNS = ('open_time', 'close_time', 'profit', 'symbol', 'lots', 'id')
+    
+    # Volltextsuche (FTS5) - weitere Textspalten (Notizen, Tags) hier ergänzen
+    SEARCH_COLUMNS = ('comment',)
+    
+    # Spaltentypen für load_columns (Zeiten als Unix-Sekunden)
+    TIME_COLUMNS = ('open_time', 'close_time')
+    TEXT_COLUMNS = ('id', 'symbol', 'type', 'comment', 'status')
+    INTEGER_COLUMNS = ('symbol_id', 'magic', 'rowid', 'rowversion')
+    
+    # Gruppierungen für die Aufschlüsselung (SQL-Ausdruck auf trades)
+    BREAKDOWN_DIMENSIONS = {
+        'symbol': "symbol_id",
+        'magic': "magic",
+        'hour': "CAST(strftime('%H', open_time) AS INTEGER)",
+        'weekday': "CAST(strftime('%w', open_time) AS INTEGER)",
+    }
+    
+    def __init__(self, db_file: str = DATABASE_FILE):
+        self.db_file = db_file
+        self._breakdown_cache: Dict[str, tuple] = {}
+        # symbols.id -> Name (interniert, jeder Name nur einmal im Speicher)
+        self._symbols: Dict[int, str] = {}
+        # Letzter gespeicherter Konto-Wert je Login (Zeit, Werte) und letztes Aufräumen
+        self._account_samples: Dict[int, tuple] = {}
+        self._account_pruned = 0.0
+        # Jahres-Archive neben der Datenbank; Kennzahlen gecacht bis zur Änderung der Dateien
+        self.archive_dir = Path(db_file).parent / f"{Path(db_file).stem}_archive"
+        self._archive_stats_cache: Tuple[tuple, Dict[int, tuple]] = ((), {})
+        self._archive_breakdown_cache: Dict[str, Tuple[tuple, Dict]] = {}
+        self._archive_cache: Optional[tempfile.TemporaryDirectory] = None
+        self._archive_lock = threading.Lock()
+        self.search_available = False
+        self.init_database()
+        # Alle Änderungen laufen über einen Thread; Leser nutzen WAL-Snapshots
+        self.writer = DatabaseWriter(db_file)
+    
+    def _connect(self, archives: bool = False) -> sqlite3.Connection:
+        """
+        Verbindung öffnen (REPLACE löst damit auch DELETE-Trigger aus).
+        
+        archives: Jahres-Archive anhängen, die Sicht trades_all verbindet sie per
+        UNION ALL mit trades (uri=True für schreibgeschützte file:-URIs).
+        """
+        conn = sqlite3.connect(self.db_file, uri=True)
+        conn.execute("PRAGMA recursive_triggers = ON")
+        if archives:
+            self._attach_archives(conn)
+        return conn
+    
+    def init_database(self):
+        """Datenbank initialisieren"""
+        try:
+            conn = self._connect()
+            # WAL: Leser sehen einen konsistenten Stand, während der Writer schreibt
+            conn.execute("PRAGMA journal_mode = WAL")
+            cursor = conn.cursor()
+            
+            # Symbole einmal als Text, Trades verweisen per symbol_id (Metadaten aus symbol_info)
+            info_columns = ', '.join(f"{name} {kind}" for name, kind in self.SYMBOL_INFO_COLUMNS.items())
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS symbols (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE,
+                    {info_columns}
+                )
+            ''')
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS trades ({self.TRADES_TABLE_SQL})")
+            
+            # MAE/MFE Seitentabelle (wird nur für neue Trades berechnet)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trade_excursions (
+                    trade_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    mae REAL,
+                    mfe REAL,
+                    time_to_mfe INTEGER,
+                    left_on_table REAL,
+                    computed_at TEXT
+                )
+            ''')
+            
+            # Generationszähler: jede Änderung an trades erhöht den Wert
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS db_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute("INSERT OR IGNORE INTO db_meta (key, value) VALUES ('trades_generation', 0)")
+            
+            rebuilt = self._migrate(cursor)
+            self._init_change_log(cursor)
+            self._init_daily_pnl(cursor)
+            self._init_account_history(cursor)
+            self._init_search(cursor)
+            
+            self._create_trade_indexes(cursor)
+        
+            conn.commit()
+            if rebuilt:
+                # Platz der alten Tabelle freigeben
+                conn.execute("VACUUM")
+            conn.close()
+            
+        except Exception as e:
+            print(f"Datenbank-Fehler: {e}")
+    
+    def _create_trade_indexes(self, cursor: sqlite3.Cursor, schema: str = "main"):
+        """Indizes auf trades (auch für die Jahres-Archive, dort mit schema)"""
+        # Covering-Indizes für die Aufschlüsselung (kein Zugriff auf die Tabelle nötig)
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS {schema}.idx_trades_symbol_stats
+            ON trades (status, symbol_id, profit, commission, swap)
+        ''')
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS {schema}.idx_trades_magic_stats
+            ON trades (status, magic, profit, commission, swap)
+        ''')
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS {schema}.idx_trades_open_time_stats
+            ON trades (status, open_time, profit, commission, swap)
+        ''')
+        # Geschlossene Trades nach close_time für die Analytics (ohne Sortierung und Tabellenzugriff)
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS {schema}.idx_trades_closed_pnl
+            ON trades (status, close_time, profit, commission, swap)
+        ''')
+        
+        # Sortier-Indizes für query_trades (id als eindeutiger Keyset-Schlüssel)
+        for column in self.SORT_COLUMNS:
+            if column != 'id':
+                key = 'symbol_id' if column == 'symbol' else column
+                cursor.execute(f'''
+                    CREATE INDEX IF NOT EXISTS {schema}.idx_trades_{column}_id ON trades ({key}, id)
+                ''')
+        # Symbol-Filter der Trades-Tabelle mit Standard-Sortierung
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS {schema}.idx_trades_symbol_open_time
+            ON trades (symbol_id, open_time, id)
+        ''')
+    
+    def _migrate(self, cursor: sqlite3.Cursor) -> bool:
+        """Ältere Datenbanken auf SCHEMA_VERSION bringen - True, wenn trades neu aufgebaut wurde"""
+        cursor.execute("SELECT value FROM db_meta WHERE key = 'schema_version'")
+        row = cursor.fetchone()
+        version = row[0] if row else 1
+        if version >= self.SCHEMA_VERSION:
+            return False
+        
+        rebuilt = False
+        
+        if version < 2:
+            # rowversion + Änderungs-Log: Generation-Trigger werden durch die
+            # Log-Trigger ersetzt, UPDATE-Trigger ignorieren rowversion
+            columns = {info[1] for info in cursor.execute("PRAGMA table_info(trades)")}
+            if 'rowversion' not in columns:
+                cursor.execute("ALTER TABLE trades ADD COLUMN rowversion INTEGER NOT NULL DEFAULT 0")
+            for trigger in ('trades_generation_insert', 'trades_generation_update',
+                            'trades_generation_delete', 'daily_pnl_update_old',
+                            'daily_pnl_update_new'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        
+        if version < 3:
+            columns = {info[1] for info in cursor.execute("PRAGMA table_info(trades)")}
+            if 'symbol' in columns:
+                self._normalize_symbols(cursor)
+                rebuilt = True
+        
+        if version < 4:
+            # Metadaten-Spalten für SymbolCache
+            columns = {info[1] for info in cursor.execute("PRAGMA table_info(symbols)")}
+            for name, kind in self.SYMBOL_INFO_COLUMNS.items():
+                if name not in columns:
+                    cursor.execute(f"ALTER TABLE symbols ADD COLUMN {name} {kind}")
+        
+        if version < 6:
+            # Lösch-Trigger wieder ohne 'archiving'-Eintrag in db_meta (neu angelegt)
+            cursor.execute("DROP TRIGGER IF EXISTS trades_change_delete")
+            cursor.execute("DELETE FROM db_meta WHERE key = 'archiving'")
+        
+        cursor.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('schema_version', ?)",
+                       (self.SCHEMA_VERSION,))
+        return rebuilt
+    
+    def _normalize_symbols(self, cursor: sqlite3.Cursor):
+        """
+        trades.symbol (Text je Zeile) durch symbol_id ersetzen.
+        
+        SQLite kann keine Spalte umbauen - die Tabelle wird kopiert. Die rowid bleibt
+        erhalten (FTS-Index); Trigger und Indizes legt init_database neu an.
+        """
+        cursor.execute("INSERT OR IGNORE INTO symbols (name) SELECT DISTINCT symbol FROM trades ORDER BY symbol")
+        cursor.execute(f"CREATE TABLE trades_v3 ({self.TRADES_TABLE_SQL})")
+        columns = ', '.join(self.TRADE_COLUMNS)
+        values = ', '.join('s.id' if column == 'symbol_id' else f"t.{column}"
+                           for column in self.TRADE_COLUMNS)
+        cursor.execute(f'''
+            INSERT INTO trades_v3 (rowid, {columns}, rowversion)
+            SELECT t.rowid, {values}, t.rowversion
+            FROM trades t JOIN symbols s ON s.name = t.symbol
+            ORDER BY t.rowid
+        ''')
+        cursor.execute("DROP TABLE trades")
+        cursor.execute("ALTER TABLE trades_v3 RENAME TO trades")
+        # Rollup wird mit symbol_id neu aufgebaut
+        cursor.execute("DROP TABLE IF EXISTS daily_pnl")
+        cursor.execute("DELETE FROM db_meta WHERE key = 'daily_pnl_backfilled'")
+    
+    def _init_change_log(self, cursor: sqlite3.Cursor):
+        """rowversion und trade_changes über Trigger pflegen"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trade_changes (
+                id INTEGER PRIMARY KEY,
+                trade_id TEXT NOT NULL,
+                op TEXT NOT NULL,
+                version INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trade_changes_version ON trade_changes (version)")
+        
+        # Jede Zeilenänderung erhöht die Generation; deren neuer Wert ist die Version
+        bump = "UPDATE db_meta SET value = value + 1 WHERE key = 'trades_generation';"
+        version = "(SELECT value FROM db_meta WHERE key = 'trades_generation')"
+        stamp = f"UPDATE trades SET rowversion = {version} WHERE rowid = NEW.rowid;"
+        
+        triggers = [
+            ('trades_change_insert', 'INSERT', f'''
+                {bump}
+                {stamp}
+                INSERT INTO trade_changes (trade_id, op, version) VALUES (NEW.id, 'insert', {version});
+            '''),
+            # Nur Datenspalten - das Setzen von rowversion löst den Trigger nicht erneut aus
+            ('trades_change_update', f"UPDATE OF {', '.join(self.TRADE_COLUMNS)}", f'''
+                {bump}
+                {stamp}
+                INSERT INTO trade_changes (trade_id, op, version)
+                SELECT OLD.id, 'delete', {version} WHERE OLD.id <> NEW.id;
+                INSERT INTO trade_changes (trade_id, op, version) VALUES (NEW.id, 'update', {version});
+            '''),
+            # archive_trades markiert seine Einträge danach als 'archive'
+            ('trades_change_delete', 'DELETE', f'''
+                {bump}
+                INSERT INTO trade_changes (trade_id, op, version) VALUES (OLD.id, 'delete', {version});
+            '''),
+        ]
+        for name, event, body in triggers:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {name}
+                AFTER {event} ON trades
+                BEGIN
+                    {body}
+                END
+            ''')
+        
+        self._prune_changes(cursor, self.CHANGE_LOG_KEEP)
+    
+    def _prune_changes(self, cursor: sqlite3.Cursor, keep: int):
+        cursor.execute("DELETE FROM trade_changes WHERE id <= (SELECT MAX(id) FROM trade_changes) - ?",
+                       (keep,))
+    
+    def _init_daily_pnl(self, cursor: sqlite3.Cursor):
+        """Tägliche P&L-Rollup-Tabelle mit Triggern und einmaligem Backfill"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_pnl (
+                date TEXT NOT NULL,
+                symbol_id INTEGER NOT NULL,
+                gross REAL NOT NULL DEFAULT 0,
+                commission REAL NOT NULL DEFAULT 0,
+                swap REAL NOT NULL DEFAULT 0,
+                trade_count INTEGER NOT NULL DEFAULT 0,
+                wins INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (date, symbol_id)
+            )
+        ''')
+        
+        # Kein INSERT OR IGNORE: die Konfliktregel des äußeren INSERT OR REPLACE
+        # würde sie überschreiben und die Zeile zurücksetzen
+        add_new = '''
+            INSERT INTO daily_pnl (date, symbol_id)
+            SELECT date(NEW.close_time), NEW.symbol_id
+            WHERE NOT EXISTS (
+                SELECT 1 FROM daily_pnl WHERE date = date(NEW.close_time) AND symbol_id = NEW.symbol_id
+            );
+            UPDATE daily_pnl SET
+                gross = gross + COALESCE(NEW.profit, 0),
+                commission = commission + COALESCE(NEW.commission, 0),
+                swap = swap + COALESCE(NEW.swap, 0),
+                trade_count = trade_count + 1,
+                wins = wins + (COALESCE(NEW.profit, 0) + COALESCE(NEW.commission, 0) + COALESCE(NEW.swap, 0) > 0)
+            WHERE date = date(NEW.close_time) AND symbol_id = NEW.symbol_id;
+        '''
+        remove_old = '''
+            UPDATE daily_pnl SET
+                gross = gross - COALESCE(OLD.profit, 0),
+                commission = commission - COALESCE(OLD.commission, 0),
+                swap = swap - COALESCE(OLD.swap, 0),
+                trade_count = trade_count - 1,
+                wins = wins - (COALESCE(OLD.profit, 0) + COALESCE(OLD.commission, 0) + COALESCE(OLD.swap, 0) > 0)
+            WHERE date = date(OLD.close_time) AND symbol_id = OLD.symbol_id;
+            DELETE FROM daily_pnl
+            WHERE date = date(OLD.close_time) AND symbol_id = OLD.symbol_id AND trade_count <= 0;
+        '''
+        new_closed = "NEW.status = 'closed' AND NEW.close_time IS NOT NULL"
+        old_closed = "OLD.status = 'closed' AND OLD.close_time IS NOT NULL"
+        
+        update = f"UPDATE OF {', '.join(self.TRADE_COLUMNS)}"
+        triggers = [
+            ('daily_pnl_insert', 'INSERT', new_closed, add_new),
+            ('daily_pnl_delete', 'DELETE', old_closed, remove_old),
+            ('daily_pnl_update_old', update, old_closed, remove_old),
+            ('daily_pnl_update_new', update, new_closed, add_new),
+        ]
+        for name, event, condition, body in triggers:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {name}
+                AFTER {event} ON trades
+                WHEN {condition}
+                BEGIN
+                    {body}
+                END
+            ''')
+        
+        # Einmaliger Backfill für bestehende Datenbanken
+        cursor.execute("SELECT value FROM db_meta WHERE key = 'daily_pnl_backfilled'")
+        if cursor.fetchone() is None:
+            self._rebuild_daily_pnl(cursor)
+            cursor.execute("INSERT INTO db_meta (key, value) VALUES ('daily_pnl_backfilled', 1)")
+    
+    def _init_account_history(self, cursor: sqlite3.Cursor):
+        """
+        Konto-Verlauf (balance, equity, margin, margin_level) je Sync.
+        
+        account_samples hält die Rohwerte (Unix-Sekunden, WITHOUT ROWID), ein
+        Trigger verdichtet jeden neuen Wert in account_rollup für alle
+        ACCOUNT_TIERS (letzter Stand, Equity-Tief/-Hoch, höchste Margin,
+        niedrigstes Margin-Level). Alte Zeilen entfernt prune_account_history.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS account_samples (
+                account INTEGER NOT NULL,
+                time INTEGER NOT NULL,
+                balance REAL,
+                equity REAL,
+                margin REAL,
+                margin_level REAL,
+                PRIMARY KEY (account, time)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS account_rollup (
+                tier INTEGER NOT NULL,
+                account INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                last_time INTEGER NOT NULL,
+                balance REAL,
+                equity REAL,
+                equity_low REAL,
+                equity_high REAL,
+                margin_max REAL,
+                margin_level_min REAL,
+                samples INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (tier, account, bucket)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Wie bei daily_pnl: Zeile anlegen, dann fortschreiben (kein UPSERT)
+        body = []
+        for tier in self.ACCOUNT_TIERS:
+            bucket = f"NEW.time - NEW.time % {tier}"
+            key = f"tier = {tier} AND account = NEW.account AND bucket = {bucket}"
+            body.append(f'''
+                INSERT INTO account_rollup (tier, account, bucket, last_time)
+                SELECT {tier}, NEW.account, {bucket}, NEW.time
+                WHERE NOT EXISTS (SELECT 1 FROM account_rollup WHERE {key});
+                UPDATE account_rollup SET
+                    balance = CASE WHEN NEW.time >= last_time THEN NEW.balance ELSE balance END,
+                    equity = CASE WHEN NEW.time >= last_time THEN NEW.equity ELSE equity END,
+                    last_time = MAX(last_time, NEW.time),
+                    equity_low = COALESCE(MIN(equity_low, NEW.equity), equity_low, NEW.equity),
+                    equity_high = COALESCE(MAX(equity_high, NEW.equity), equity_high, NEW.equity),
+                    margin_max = COALESCE(MAX(margin_max, NEW.margin), margin_max, NEW.margin),
+                    margin_level_min = COALESCE(MIN(margin_level_min, NEW.margin_level),
+                                                margin_level_min, NEW.margin_level),
+                    samples = samples + 1
+                WHERE {key};
+            ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS account_rollup_insert
+            AFTER INSERT ON account_samples
+            BEGIN
+                {''.join(body)}
+            END
+        ''')
+    
+    def _init_search(self, cursor: sqlite3.Cursor):
+        """
+        FTS5-Index über SEARCH_COLUMNS (External Content auf trades, per Trigger gepflegt).
+        
+        Ändern sich die Spalten, werden Index und Trigger neu aufgebaut. Ohne FTS5
+        im SQLite-Build fällt die Suche auf LIKE zurück.
+        """
+        columns = list(self.SEARCH_COLUMNS)
+        existing = [info[1] for info in cursor.execute("PRAGMA table_info(trades_fts)")]
+        
+        try:
+            if existing != columns:
+                for trigger in ('trades_fts_insert', 'trades_fts_delete', 'trades_fts_update'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                cursor.execute("DROP TABLE IF EXISTS trades_fts")
+                cursor.execute(f'''
+                    CREATE VIRTUAL TABLE trades_fts USING fts5(
+                        {', '.join(columns)},
+                        content='trades', content_rowid='rowid',
+                        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                    )
+                ''')
+                # Bestehende Trades einmalig indizieren
+                cursor.execute("INSERT INTO trades_fts (trades_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            print(f"Volltextsuche nicht verfügbar, Suche per LIKE: {e}")
+            return
+        
+        names = ', '.join(columns)
+        new_values = ', '.join(f"NEW.{column}" for column in columns)
+        old_values = ', '.join(f"OLD.{column}" for column in columns)
+        insert_new = f"INSERT INTO trades_fts (rowid, {names}) VALUES (NEW.rowid, {new_values});"
+        # External Content: beim Löschen müssen die alten Werte mitgegeben werden
+        delete_old = (f"INSERT INTO trades_fts (trades_fts, rowid, {names}) "
+                      f"VALUES ('delete', OLD.rowid, {old_values});")
+        
+        triggers = [
+            ('trades_fts_insert', 'INSERT', insert_new),
+            ('trades_fts_delete', 'DELETE', delete_old),
+            ('trades_fts_update', f"UPDATE OF {names}", delete_old + insert_new),
+        ]
+        for name, event, body in triggers:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {name}
+                AFTER {event} ON trades
+                BEGIN
+                    {body}
+                END
+            ''')
+        self.search_available = True
+        
+    @staticmethod
+    def _match_query(words: List[str]) -> str:
+        """Suchwörter -> FTS5-Abfrage: jedes Wort als Präfix, alle müssen vorkommen"""
+        return ' '.join('"' + word.replace('"', '""') + '"*' for word in words)
+    
+    # Tages-Aggregate geschlossener Trades in der Spaltenfolge von daily_pnl
+    DAILY_PNL_SQL = '''
+        SELECT date(close_time), symbol_id,
+               SUM(COALESCE(profit, 0)), SUM(COALESCE(commission, 0)), SUM(COALESCE(swap, 0)),
+               COUNT(*),
+               SUM(COALESCE(profit, 0) + COALESCE(commission, 0) + COALESCE(swap, 0) > 0)
+        FROM trades
+        WHERE {where}
+        GROUP BY date(close_time), symbol_id
+    '''
+    DAILY_PNL_VALUES = ('gross', 'commission', 'swap', 'trade_count', 'wins')
+    
+    def _rebuild_daily_pnl(self, cursor: sqlite3.Cursor, archived: Sequence[tuple] = ()):
+        """Rollup komplett aus trades neu aufbauen, archivierte Tage (vorab gelesen) addieren"""
+        cursor.execute("DELETE FROM daily_pnl")
+        cursor.execute(f'''
+            INSERT INTO daily_pnl (date, symbol_id, {', '.join(self.DAILY_PNL_VALUES)})
+            {self.DAILY_PNL_SQL.format(where="status = 'closed' AND close_time IS NOT NULL")}
+        ''')
+        if archived:
+            self._daily_pnl_add_table(cursor)
+            cursor.executemany("INSERT INTO temp.daily_pnl_add VALUES (?, ?, ?, ?, ?, ?, ?)", archived)
+            self._add_daily_pnl(cursor)
+    
+    @staticmethod
+    def _daily_pnl_add_table(cursor: sqlite3.Cursor):
+        """Leere Hilfstabelle temp.daily_pnl_add (Aufbau wie daily_pnl)"""
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS daily_pnl_add (
+                date TEXT NOT NULL,
+                symbol_id INTEGER NOT NULL,
+                gross REAL NOT NULL,
+                commission REAL NOT NULL,
+                swap REAL NOT NULL,
+                trade_count INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                PRIMARY KEY (date, symbol_id)
+            )
+        ''')
+        cursor.execute("DELETE FROM temp.daily_pnl_add")
+    
+    def _add_daily_pnl(self, cursor: sqlite3.Cursor):
+        """temp.daily_pnl_add auf daily_pnl addieren (fehlende Tage werden angelegt)"""
+        cursor.execute('''
+            INSERT OR IGNORE INTO daily_pnl (date, symbol_id)
+            SELECT date, symbol_id FROM temp.daily_pnl_add
+        ''')
+        match = "a.date = daily_pnl.date AND a.symbol_id = daily_pnl.symbol_id"
+        assignments = ', '.join(
+            f"{column} = {column} + (SELECT a.{column} FROM temp.daily_pnl_add a WHERE {match})"
+            for column in self.DAILY_PNL_VALUES
+        )
+        cursor.execute(f'''
+            UPDATE daily_pnl SET {assignments}
+            WHERE EXISTS (SELECT 1 FROM temp.daily_pnl_add a WHERE {match})
+        ''')
+    
+    # Unveränderte Trades (z.B. wiederholter Sync) werden nicht neu geschrieben -
+    # kein Eintrag im Änderungs-Log, keine neue Generation
+    # symbol_id kommt aus symbols (Name vorher per INSERT_SYMBOL_SQL angelegt)
+    SAVE_TRADE_SQL = f'''
+        INSERT OR REPLACE INTO trades ({', '.join(TRADE_COLUMNS)})
+        SELECT {', '.join('s.id' if column == 'symbol_id' else ':' + column for column in TRADE_COLUMNS)}
+        FROM symbols s
+        WHERE s.name = :symbol AND NOT EXISTS (
+            SELECT 1 FROM trades
+            WHERE {' AND '.join('symbol_id = s.id' if column == 'symbol_id' else f'{column} IS :{column}'
+                                for column in TRADE_COLUMNS)}
+        )
+    '''
+    INSERT_SYMBOL_SQL = "INSERT OR IGNORE INTO symbols (name) VALUES (?)"
+    
+    @staticmethod
+    def _trade_params(trade: Trade) -> Dict:
+        return {
+            'id': trade.id, 'symbol': trade.symbol, 'type': trade.type, 'lots': trade.lots,
+            'open_price': trade.open_price, 'close_price': trade.close_price,
+            'open_time': trade.open_time.isoformat() if trade.open_time else None,
+            'close_time': trade.close_time.isoformat() if trade.close_time else None,
+            'profit': trade.profit, 'commission': trade.commission, 'swap': trade.swap,
+            'comment': trade.comment, 'magic': trade.magic, 'status': trade.status
+        }
+    
+    def save_trade(self, trade: Trade) -> Future:
+        """Trade speichern (über den Writer-Thread)"""
+        params = self._trade_params(trade)
+        
+        def job(cursor: sqlite3.Cursor):
+            cursor.execute(self.INSERT_SYMBOL_SQL, (trade.symbol,))
+            cursor.execute(self.SAVE_TRADE_SQL, params)
+        
+        # Mehrfaches Speichern desselben Trades im selben Batch wird zusammengefasst
+        return self.writer.submit(job, key=('trade', trade.id))
+    
+    def save_trades(self, trades: List[Trade]) -> Future:
+        """Mehrere Trades in einem Auftrag speichern"""
+        params = [self._trade_params(trade) for trade in trades]
+        symbols = sorted({trade.symbol for trade in trades})
+        
+        def job(cursor: sqlite3.Cursor) -> int:
+            cursor.executemany(self.INSERT_SYMBOL_SQL, [(symbol,) for symbol in symbols])
+            cursor.executemany(self.SAVE_TRADE_SQL, params)
+            return len(params)
+        
+        return self.writer.submit(job)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Auf alle ausstehenden Schreibaufträge warten"""
+        return self.writer.flush(timeout)
+    
+    def close(self):
+        """Writer-Thread leeren und beenden"""
+        self.writer.close()
+        if self._archive_cache is not None:
+            # Entpackte Archive dieses Prozesses (sonst spätestens beim Beenden)
+            self._archive_cache.cleanup()
+            self._archive_cache = None
+    
+    def checkpoint(self):
+        """WAL in die Hauptdatei übernehmen (z.B. vor dem Kopieren der Datei)"""
+        self.flush()
+        try:
+            conn = self._connect()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+        except Exception as e:
+            print(f"Checkpoint Fehler: {e}")
+    
+    def _load_symbols(self, conn: Optional[sqlite3.Connection] = None) -> Dict[int, str]:
+        """symbols.id -> Name; Namen werden interniert und im Cache gehalten"""
+        own = conn is None
+        if own:
+            conn = self._connect()
+        try:
+            symbols = {symbol_id: sys.intern(name)
+                       for symbol_id, name in conn.execute("SELECT id, name FROM symbols")}
+        finally:
+            if own:
+                conn.close()
+        self._symbols = symbols
+        return symbols
+    
+    def _symbol_name(self, symbol_id: int) -> str:
+        """Symbolname zu einer symbol_id (Cache, bei unbekannter id neu laden)"""
+        name = self._symbols.get(symbol_id)
+        if name is None:
+            name = self._load_symbols().get(symbol_id, "")
+        return name
+    
+    def get_symbol_infos(self) -> Dict[str, SymbolInfo]:
+        """Gespeicherte Symbol-Metadaten nach Name (nur bereits abgerufene Symbole)"""
+        columns = list(self.SYMBOL_INFO_COLUMNS)
+        try:
+            conn = self._connect()
+            rows = conn.execute(f'''
+                SELECT name, {', '.join(columns)} FROM symbols WHERE updated_at IS NOT NULL
+            ''').fetchall()
+            conn.close()
+            
+        except Exception as e:
+            print(f"Symbol-Laden Fehler: {e}")
+            return {}
+        
+        infos = {}
+        for row in rows:
+            values = dict(zip(columns, row[1:]))
+            values['updated_at'] = datetime.fromisoformat(values['updated_at'])
+            name = sys.intern(row[0])
+            infos[name] = SymbolInfo(name=name, **values)
+        return infos
+    
+    def save_symbol_infos(self, infos: List[SymbolInfo]) -> Future:
+        """
+        Metadaten speichern - nur für Symbole, die schon in symbols stehen (gehandelte).
+        
+        Die id eines Symbols bleibt dabei unverändert (UPDATE statt REPLACE).
+        """
+        columns = list(self.SYMBOL_INFO_COLUMNS)
+        params = []
+        for info in infos:
+            # Benannte Parameter - unabhängig von der Reihenfolge in SYMBOL_INFO_COLUMNS
+            values = {column: getattr(info, column) for column in columns}
+            values['updated_at'] = info.updated_at.isoformat() if info.updated_at else None
+            values['name'] = info.name
+            params.append(values)
+        
+        def job(cursor: sqlite3.Cursor) -> int:
+            cursor.executemany(f'''
+                UPDATE symbols SET {', '.join(f"{column} = :{column}" for column in columns)}
+                WHERE name = :name
+            ''', params)
+            return cursor.rowcount
+        
+        return self.writer.submit(job, key='symbol_infos')
+    
+    def _row_to_trade(self, row: tuple) -> Trade:
+        """Zeile in TRADE_COLUMNS-Reihenfolge in einen Trade umwandeln"""
+        return Trade(
+            id=row[0], symbol=self._symbol_name(row[1]), type=row[2], lots=row[3],
+            open_price=row[4], close_price=row[5],
+            open_time=datetime.fromisoformat(row[6]) if row[6] else None,
+            close_time=datetime.fromisoformat(row[7]) if row[7] else None,
+            profit=row[8], commission=row[9], swap=row[10],
+            comment=row[11], magic=row[12], status=row[13]
+        )
+    
+    @staticmethod
+    def _epoch_sql(column: str) -> str:
+        """ISO-Zeitspalte als Unix-Sekunden (unixepoch ab SQLite 3.38 ist deutlich schneller)"""
+        if sqlite3.sqlite_version_info >= (3, 38, 0):
+            return f"unixepoch({column})"
+        return f"CAST(strftime('%s', {column}) AS INTEGER)"
+        
+    def load_columns(self, columns: Sequence[str], where: Optional[str] = None,
+                     params: Sequence = (), order_by: Optional[str] = None,
+                     dtype: Optional[Dict[str, Any]] = None,
+                     batch_size: int = 50_000) -> Dict[str, Any]:
+        """
+        Einzelne Spalten von trades direkt als NumPy-Arrays laden (ohne Trade-Objekte).
+        
+        where/params: SQL-Bedingung mit Platzhaltern, order_by: ORDER BY-Ausdruck.
+        Zahlen werden float64 (NULL = NaN), open_time/close_time int64 Unix-Sekunden
+        (NULL = NAT_SECONDS), magic/rowid/symbol_id int64 (NULL = 0), Textspalten object.
+        'symbol' wird über symbol_id geladen und auf die internierten Namen abgebildet.
+        dtype überschreibt den Zieltyp einzelner Spalten. Archivierte Trades sind
+        enthalten, ihre rowid ist NULL (0) - rowid-Bedingungen treffen nur trades.
+        """
+        # NumPy erst bei Bedarf laden (Headless-Start bleibt schlank)
+        import numpy as np
+        
+        expressions = []
+        fill_types = []
+        for column in columns:
+            if column == 'symbol':
+                expressions.append("symbol_id")
+                fill_types.append(np.int64)
+            elif column in self.TIME_COLUMNS:
+                expressions.append(f"COALESCE({self._epoch_sql(column)}, {NAT_SECONDS})")
+                fill_types.append(np.int64)
+            elif column in self.INTEGER_COLUMNS:
+                expressions.append(f"COALESCE({column}, 0)")
+                fill_types.append(np.int64)
+            elif column in self.TEXT_COLUMNS:
+                expressions.append(column)
+                fill_types.append(object)
+            elif column in self.TRADE_COLUMNS:
+                expressions.append(column)
+                fill_types.append(np.float64)
+            else:
+                raise ValueError(f"Unbekannte Spalte: {column}")
+        
+        where_sql = f"WHERE {where}" if where else ""
+        order_sql = f"ORDER BY {order_by}" if order_by else ""
+        archives = bool(self.archive_files())
+        source = self._trades_source(archives)
+        
+        conn = self._connect(archives)
+        try:
+            # Eine Lesetransaktion: COUNT und SELECT sehen denselben Stand
+            conn.execute("BEGIN")
+            count = conn.execute(f"SELECT COUNT(*) FROM {source} {where_sql}", params).fetchone()[0]
+            # Zeilen-Tupel lassen sich blockweise direkt in ein strukturiertes Array schreiben
+            buffer = np.empty(count, dtype=[(f"f{i}", kind) for i, kind in enumerate(fill_types)])
+            cursor = conn.execute(f"SELECT {', '.join(expressions)} FROM {source} {where_sql} {order_sql}",
+                                  params)
+            size = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                buffer[size:size + len(rows)] = rows
+                size += len(rows)
+            symbols = self._load_symbols(conn) if 'symbol' in columns else {}
+            conn.rollback()
+        finally:
+            conn.close()
+        
+        names = np.empty(max(symbols, default=0) + 1, dtype=object)
+        for symbol_id, name in symbols.items():
+            names[symbol_id] = name
+        
+        result = {}
+        for i, column in enumerate(columns):
+            values = np.ascontiguousarray(buffer[f"f{i}"][:size])
+            if column == 'symbol':
+                values = names[values]
+            if dtype and column in dtype:
+                values = values.astype(dtype[column], copy=False)
+            result[column] = values
+        return result
+        
+    def _filter_sql(self, trade_filter: Optional[TradeFilter], fts: bool = True) -> Tuple[List[str], List]:
+        """WHERE-Bedingungen und Parameter für einen TradeFilter (fts=False: Text per LIKE)"""
+        conditions: List[str] = []
+        params: List = []
+        if trade_filter is None:
+            return conditions, params
+        
+        def add(condition: str, value):
+            if value is None:
+                return
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            conditions.append(condition)
+            params.append(value)
+        
+        add("symbol_id = (SELECT id FROM symbols WHERE name = ?)", trade_filter.symbol)
+        add("status = ?", trade_filter.status)
+        add("type = ?", trade_filter.type)
+        add("magic = ?", trade_filter.magic)
+        add("open_time >= ?", trade_filter.open_from)
+        add("open_time < ?", trade_filter.open_to)
+        add("close_time >= ?", trade_filter.close_from)
+        add("close_time < ?", trade_filter.close_to)
+        add("profit >= ?", trade_filter.profit_min)
+        add("profit <= ?", trade_filter.profit_max)
+        
+        words = trade_filter.text.split() if trade_filter.text else []
+        if words and self.search_available and fts:
+            add("rowid IN (SELECT rowid FROM trades_fts WHERE trades_fts MATCH ?)",
+                self._match_query(words))
+        else:
+            # Ohne FTS5 (oder über Archive): jedes Wort muss in einer der Textspalten vorkommen (Full Scan)
+            for word in words:
+                conditions.append(f"({' OR '.join(f'{c} LIKE ?' for c in self.SEARCH_COLUMNS)})")
+                params.extend([f"%{word}%"] * len(self.SEARCH_COLUMNS))
+        return conditions, params
+    
+    @staticmethod
+    def _seek_parts(column: str, descending: bool, after: tuple) -> List[Tuple[str, List]]:
+        """
+        Keyset-Bedingungen hinter (Sortwert, id) in Sortierreihenfolge.
+        
+        NULL steht aufsteigend vorne und absteigend hinten. Der NULL-Bereich ist
+        eine eigene Bedingung - ein OR darüber würde die Index-Suche verhindern.
+        """
+        value, trade_id = after
+        op = '<' if descending else '>'
+        if column == 'id':
+            return [(f"id {op} ?", [trade_id])]
+        
+        if value is None:
+            parts = [(f"{column} IS NULL AND id {op} ?", [trade_id])]
+            if not descending:
+                parts.append((f"{column} IS NOT NULL", []))
+            return parts
+        
+        parts = [(f"{column} {op}= ? AND ({column} {op} ? OR id {op} ?)", [value, value, trade_id])]
+        if descending:
+            parts.append((f"{column} IS NULL", []))
+        return parts
+    
+    def _query_sql(self, trade_filter: Optional[TradeFilter], sort: str, descending: bool,
+                   seek: Optional[Tuple[str, List]] = None,
+                   archives: bool = False) -> Tuple[str, List]:
+        if sort not in self.SORT_COLUMNS:
+            raise ValueError(f"Unbekannte Sortierung: {sort}")
+        
+        conditions, params = self._filter_sql(trade_filter, fts=not archives)
+        if seek is not None:
+            conditions.append(seek[0])
+            params.extend(seek[1])
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = self._order_sql(sort, descending)
+        source = self._trades_source(archives)
+        return f"SELECT {', '.join(self.TRADE_COLUMNS)} FROM {source} {where} {order}", params
+    
+    def _order_sql(self, sort: str, descending: bool) -> str:
+        """ORDER BY für eine Sortierspalte (Symbole nach Namen, nicht nach id)"""
+        direction = "DESC" if descending else "ASC"
+        key = self.SYMBOL_NAME_SQL if sort == 'symbol' else sort
+        return f"ORDER BY {key} {direction}" + (f", id {direction}" if sort != 'id' else "")
+    
+    def _symbol_seeks(self, trade_filter: Optional[TradeFilter], descending: bool,
+                      after: Optional[tuple]) -> List[Tuple[str, List]]:
+        """
+        Sortierung nach Symbol als Folge von Index-Suchen auf (symbol_id, id):
+        je Symbol in Namensreihenfolge eine Bedingung, ab next_key (Name, id).
+        """
+        op = '<' if descending else '>'
+        seeks = []
+        for symbol_id, name in sorted(self._load_symbols().items(), key=lambda item: item[1],
+                                      reverse=descending):
+            if trade_filter and trade_filter.symbol is not None and name != trade_filter.symbol:
+                continue
+            if after is not None:
+                if (name > after[0]) if descending else (name < after[0]):
+                    continue
+                if name == after[0]:
+                    seeks.append((f"symbol_id = ? AND id {op} ?", [symbol_id, after[1]]))
+                    continue
+            seeks.append(("symbol_id = ?", [symbol_id]))
+        return seeks
+    
+    @staticmethod
+    def _watch_cancel(conn: sqlite3.Connection, cancel: Optional[threading.Event]):
+        """Laufende Abfrage abbrechen, sobald `cancel` gesetzt wird"""
+        if cancel is not None:
+            conn.set_progress_handler(lambda: 1 if cancel.is_set() else 0, 1000)
+    
+    def query_trades(self, trade_filter: Optional[TradeFilter] = None, sort: str = 'open_time',
+                     descending: bool = True, limit: int = 100,
+                     after: Optional[tuple] = None,
+                     cancel: Optional[threading.Event] = None) -> TradePage:
+        """
+        Eine Seite gefilterter Trades (Keyset-Pagination).
+        
+        after: next_key der vorherigen Seite - kein OFFSET, jede Seite kostet gleich viel.
+        cancel: bricht die Abfrage ab (z.B. wenn eine neuere Abfrage gestartet wurde).
+        """
+        rows: List[tuple] = []
+        try:
+            seeks: List[Optional[Tuple[str, List]]] = [None]
+            order = sort
+            if sort == 'symbol':
+                # Je Symbol nach id - nutzt den Index statt einer Sortierung nach Namen
+                seeks = list(self._symbol_seeks(trade_filter, descending, after))
+                order = 'id'
+            elif after is not None:
+                seeks = list(self._seek_parts(sort, descending, after))
+            
+            archives = self._use_archives(trade_filter)
+            conn = self._connect(archives)
+            self._watch_cancel(conn, cancel)
+            for seek in seeks:
+                sql, params = self._query_sql(trade_filter, order, descending, seek, archives)
+                rows.extend(conn.execute(f"{sql} LIMIT ?", params + [limit - len(rows)]).fetchall())
+                if len(rows) >= limit:
+                    break
+            conn.close()
+            
+        except Exception as e:
+            if not (cancel and cancel.is_set()):
+                print(f"Trade-Abfrage Fehler: {e}")
+            return TradePage([])
+        
+        trades = [self._row_to_trade(row) for row in rows]
+        next_key = None
+        if len(rows) == limit and rows:
+            last = rows[-1]
+            if sort == 'symbol':
+                next_key = (self._symbol_name(last[1]), last[0])
+            else:
+                next_key = (last[self.TRADE_COLUMNS.index(sort)], last[0])
+        return TradePage(trades, next_key)
+    
+    def search_trades(self, trade_filter: TradeFilter, limit: int = 100,
+                      after: Optional[tuple] = None,
+                      cancel: Optional[threading.Event] = None) -> TradePage:
+        """
+        Volltextsuche (trade_filter.text), nach Relevanz (bm25) sortiert.
+        
+        Die übrigen Filterfelder schränken das Ergebnis zusätzlich ein. Pagination
+        über next_key (Rang, rowid); ohne FTS5 oder wenn der Filter archivierte Jahre
+        einschließt (kein FTS-Index im Archiv) wie query_trades nach open_time.
+        """
+        words = trade_filter.text.split() if trade_filter.text else []
+        if not words or not self.search_available or self._use_archives(trade_filter):
+            return self.query_trades(trade_filter, limit=limit, after=after, cancel=cancel)
+        
+        conditions, params = self._filter_sql(replace(trade_filter, text=None))
+        conditions.insert(0, "trades_fts MATCH ?")
+        params.insert(0, self._match_query(words))
+        if after is not None:
+            conditions.append("(trades_fts.rank > ? OR (trades_fts.rank = ? AND t.rowid > ?))")
+            params.extend([after[0], after[0], after[1]])
+        
+        columns = ', '.join(f"t.{column}" for column in self.TRADE_COLUMNS)
+        sql = f'''
+            SELECT {columns}, trades_fts.rank, t.rowid
+            FROM trades_fts JOIN trades t ON t.rowid = trades_fts.rowid
+            WHERE {' AND '.join(conditions)}
+            ORDER BY trades_fts.rank, t.rowid
+            LIMIT ?
+        '''
+        try:
+            conn = self._connect()
+            self._watch_cancel(conn, cancel)
+            rows = conn.execute(sql, params + [limit]).fetchall()
+            conn.close()
+        
+        except Exception as e:
+            if not (cancel and cancel.is_set()):
+                print(f"Suche Fehler: {e}")
+            return TradePage([])
+        
+        trades = [self._row_to_trade(row) for row in rows]
+        next_key = tuple(rows[-1][-2:]) if len(rows) == limit and rows else None
+        return TradePage(trades, next_key)
+    
+    def iter_trades(self, trade_filter: Optional[TradeFilter] = None, sort: str = 'open_time',
+                    descending: bool = True, batch_size: int = 500) -> Iterator[Trade]:
+        """Gefilterte Trades einzeln aus dem Cursor liefern (begrenzter Speicher)"""
+        archives = self._use_archives(trade_filter)
+        sql, params = self._query_sql(trade_filter, sort, descending, archives=archives)
+        conn = self._connect(archives)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_trade(row)
+        finally:
+            conn.close()
+    
+    def count_trades(self, trade_filter: Optional[TradeFilter] = None,
+                     cancel: Optional[threading.Event] = None) -> int:
+        """Anzahl Trades für einen Filter (ohne Filter: Archive aus dem Cache)"""
+        archives = trade_filter is not None and self._use_archives(trade_filter)
+        conditions, params = self._filter_sql(trade_filter, fts=not archives)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            conn = self._connect(archives)
+            self._watch_cancel(conn, cancel)
+            count = conn.execute(f"SELECT COUNT(*) FROM {self._trades_source(archives)} {where}",
+                                 params).fetchone()[0]
+            conn.close()
+            if trade_filter is None:
+                count += sum(stats[0] for stats in self._archive_stats().values())
+            return count
+            
+        except Exception as e:
+            if not (cancel and cancel.is_set()):
+                print(f"Trade-Zählung Fehler: {e}")
+            return 0
+    
+    def get_trade_summary(self) -> Dict:
+        """Anzahl Trades, offene Positionen und Summe P&L per SQL (Archive aus dem Cache)"""
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*),
+                       COALESCE(SUM(status = 'open'), 0),
+                       COALESCE(SUM(status = 'closed' AND close_time IS NOT NULL), 0),
+                       COALESCE(SUM(profit), 0)
+                FROM trades
+            ''')
+            total, open_count, closed_count, total_pnl = cursor.fetchone()
+            conn.close()
+            for archived in self._archive_stats().values():
+                total += archived[0]
+                open_count += archived[1]
+                closed_count += archived[2]
+                total_pnl += archived[3]
+            return {'total_trades': total, 'open_positions': open_count,
+                    'closed_trades': closed_count, 'total_pnl': total_pnl}
+            
+        except Exception as e:
+            print(f"Zusammenfassung Fehler: {e}")
+            return {'total_trades': 0, 'open_positions': 0, 'closed_trades': 0, 'total_pnl': 0.0}
+    
+    def get_generation(self) -> int:
+        """Aktuelle Generation der trades-Tabelle"""
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM db_meta WHERE key = 'trades_generation'")
+            row = cursor.fetchone()
+            conn.close()
+            return row[0] if row else 0
+            
+        except Exception as e:
+            print(f"Generation Fehler: {e}")
+            return -1
+    
+    def changes_since(self, version: int) -> ChangeSet:
+        """
+        Änderungen an trades nach `version` (aus einem früheren ChangeSet oder
+        get_generation). Bei complete=False komplett neu laden.
+        """
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            # Eine Lese-Transaktion: Generation und Log aus demselben WAL-Snapshot
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT value FROM db_meta WHERE key = 'trades_generation'")
+            row = cursor.fetchone()
+            current = row[0] if row else 0
+            
+            if version >= current:
+                conn.close()
+                return ChangeSet(current, [], version == current)
+            
+            cursor.execute("SELECT MIN(version) FROM trade_changes")
+            oldest = cursor.fetchone()[0]
+            cursor.execute('''
+                SELECT version, trade_id, op FROM trade_changes
+                WHERE version > ? AND version <= ?
+                ORDER BY id
+            ''', (version, current))
+            changes = cursor.fetchall()
+            conn.close()
+            
+            complete = oldest is not None and oldest <= version + 1
+            return ChangeSet(current, changes, complete)
+            
+        except Exception as e:
+            print(f"Änderungs-Log Fehler: {e}")
+            return ChangeSet(version, [], False)
+    
+    def prune_changes(self, keep: int = CHANGE_LOG_KEEP) -> Future:
+        """Änderungs-Log auf die letzten `keep` Einträge kürzen"""
+        return self.writer.submit(lambda cursor: self._prune_changes(cursor, keep),
+                                  key='prune_changes')
+    
+    def get_breakdown(self, dimension: str) -> List[Dict]:
+        """Kennzahlen je Symbol/Magic/Stunde/Wochentag (gecacht bis zur nächsten Änderung)"""
+        key_expr = self.BREAKDOWN_DIMENSIONS.get(dimension)
+        if key_expr is None:
+            raise ValueError(f"Unbekannte Dimension: {dimension}")
+        
+        generation = self.get_generation()
+        cached = self._breakdown_cache.get(dimension)
+        if cached and cached[0] == generation and generation >= 0:
+            return cached[1]
+        
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            
+            cursor.execute(self._breakdown_sql(key_expr))
+            rows = cursor.fetchall()
+            conn.close()
+            
+            # Archive ändern sich nicht mit der Generation - ihre Gruppen separat gecacht
+            archived = self._archive_breakdown(dimension, key_expr)
+            if archived:
+                groups = {row[0]: list(row[1:]) for row in rows}
+                for grp, values in archived.items():
+                    totals = groups.setdefault(grp, [0] * len(values))
+                    for i, value in enumerate(values):
+                        totals[i] += value or 0
+                rows = sorted((grp,) + tuple(values) for grp, values in groups.items())
+            
+        except Exception as e:
+            print(f"Aufschlüsselung Fehler: {e}")
+            return []
+        
+        if dimension == 'symbol':
+            rows = sorted(((self._symbol_name(row[0]),) + row[1:] for row in rows),
+                          key=lambda row: row[0])
+        
+        result = []
+        for grp, count, wins, net, gross_win, gross_loss in rows:
+            result.append({
+                'group': grp,
+                'trades': count,
+                'wins': wins or 0,
+                'win_rate': (wins or 0) / count * 100 if count else 0.0,
+                'net_pnl': net or 0.0,
+                'expectancy': (net or 0.0) / count if count else 0.0,
+                'profit_factor': gross_win / gross_loss if gross_loss else 0.0,
+            })
+        
+        self._breakdown_cache[dimension] = (generation, result)
+        return result
+    
+    @staticmethod
+    def _breakdown_sql(key_expr: str) -> str:
+        """Anzahl, Gewinner, Netto, Brutto-Gewinn und -Verlust je Gruppe (summierbar)"""
+        return f'''
+            SELECT {key_expr} AS grp,
+                   COUNT(*),
+                   SUM(net > 0),
+                   SUM(net),
+                   SUM(CASE WHEN net > 0 THEN net ELSE 0 END),
+                   SUM(CASE WHEN net < 0 THEN -net ELSE 0 END)
+            FROM (
+                SELECT symbol_id, magic, open_time,
+                       COALESCE(profit, 0) + COALESCE(commission, 0) + COALESCE(swap, 0) AS net
+                FROM trades
+                WHERE status = 'closed'
+            )
+            GROUP BY grp
+            ORDER BY grp
+        '''
+    
+    def _archive_breakdown(self, dimension: str, key_expr: str) -> Dict:
+        """Aufschlüsselung aller Archive zusammengefasst (gecacht bis zur Änderung der Dateien)"""
+        signature = self._archive_signature()
+        cached = self._archive_breakdown_cache.get(dimension)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        groups: Dict = {}
+        for year, path in self.archive_files():
+            conn = self._open_archive(path)
+            try:
+                for row in conn.execute(self._breakdown_sql(key_expr)):
+                    totals = groups.setdefault(row[0], [0] * (len(row) - 1))
+                    for i, value in enumerate(row[1:]):
+                        totals[i] += value or 0
+            finally:
+                conn.close()
+        self._archive_breakdown_cache[dimension] = (signature, groups)
+        return groups
+    
+    def get_daily_pnl(self, period: str = 'day') -> List[tuple]:
+        """Netto-P&L, Anzahl und Gewinner je Tag/Woche/Monat aus dem Rollup"""
+        period_expr = {
+            'day': "date",
+            'week': "strftime('%Y-W%W', date)",
+            'month': "substr(date, 1, 7)",
+        }.get(period)
+        if period_expr is None:
+            raise ValueError(f"Unbekannte Periode: {period}")
+        
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT {period_expr} AS period,
+                       SUM(gross + commission + swap), SUM(trade_count), SUM(wins)
+                FROM daily_pnl
+                GROUP BY period
+                ORDER BY period
+            ''')
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+            
+        except Exception as e:
+            print(f"Rollup-Laden Fehler: {e}")
+            return []
+    
+    def get_day_pnl(self, day: Optional[str] = None) -> float:
+        """Netto-P&L der an einem Tag (Standard: heute) geschlossenen Trades aus dem Rollup"""
+        day = day or datetime.now().date().isoformat()
+        try:
+            conn = self._connect()
+            row = conn.execute('''
+                SELECT COALESCE(SUM(gross + commission + swap), 0) FROM daily_pnl WHERE date = ?
+            ''', (day,)).fetchone()
+            conn.close()
+            return row[0]
+            
+        except Exception as e:
+            print(f"Rollup-Laden Fehler: {e}")
+            return 0.0
+    
+    def check_daily_pnl(self, tolerance: float = 1e-6) -> List[tuple]:
+        """Rollup gegen trades und Archive prüfen - gibt abweichende (date, symbol_id) zurück"""
+        archives = bool(self.archive_files())
+        conn = self._connect(archives)
+        try:
+            expected = {
+                (row[0], row[1]): row[2:]
+                for row in conn.execute(f'''
+                    SELECT date(close_time), symbol_id,
+                           SUM(COALESCE(profit, 0)), SUM(COALESCE(commission, 0)),
+                           SUM(COALESCE(swap, 0)), COUNT(*),
+                           SUM(COALESCE(profit, 0) + COALESCE(commission, 0) + COALESCE(swap, 0) > 0)
+                    FROM {self._trades_source(archives)}
+                    WHERE status = 'closed' AND close_time IS NOT NULL
+                    GROUP BY date(close_time), symbol_id
+                ''')
+            }
+            actual = {
+                (row[0], row[1]): row[2:]
+                for row in conn.execute('''
+                    SELECT date, symbol_id, gross, commission, swap, trade_count, wins
+                    FROM daily_pnl
+                ''')
+            }
+        finally:
+            conn.close()
+        
+        mismatches = []
+        for key in sorted(set(expected) | set(actual)):
+            exp = expected.get(key)
+            act = actual.get(key)
+            if exp is None or act is None or any(
+                    abs((a or 0) - (b or 0)) > tolerance for a, b in zip(exp, act)):
+                mismatches.append(key)
+        return mismatches
+    
+    def rebuild_daily_pnl(self) -> Future:
+        """Rollup neu aufbauen (z.B. nach gefundener Abweichung), inkl. archivierter Tage"""
+        # Archive vorab lesen - ATTACH ist im Writer-Job (Transaktion) nicht möglich
+        archived = self._archived_daily_pnl()
+        return self.writer.submit(lambda cursor: self._rebuild_daily_pnl(cursor, archived),
+                                  key='rebuild_daily_pnl')
+    
+    def save_account_sample(self, account_info: Dict, at: Optional[float] = None) -> Optional[Future]:
+        """
+        Kontostand (account_info vom Broker) als Rohwert speichern.
+        
+        Unveränderte Werte werden nur alle ACCOUNT_SAMPLE_HEARTBEAT Sekunden
+        geschrieben; einmal je ACCOUNT_PRUNE_INTERVAL räumt derselbe Auftrag auf.
+        """
+        account = int(account_info.get('login') or 0)
+        now = int(time.time() if at is None else at)
+        values = tuple(account_info.get(name) for name in ('balance', 'equity', 'margin', 'margin_level'))
+        
+        last = self._account_samples.get(account)
+        if last is not None and (now <= last[0] or
+                                 (values == last[1] and now - last[0] < ACCOUNT_SAMPLE_HEARTBEAT)):
+            return None
+        
+        prune = now - self._account_pruned >= ACCOUNT_PRUNE_INTERVAL
+        if prune:
+            self._account_pruned = now
+        
+        def job(cursor: sqlite3.Cursor):
+            cursor.execute('''
+                INSERT OR IGNORE INTO account_samples (account, time, balance, equity, margin, margin_level)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (account, now) + values)
+            if prune:
+                self._prune_account_history(cursor, now)
+        
+        def remember(future: Future):
+            # Erst nach erfolgreichem Schreiben vergleichen weitere Werte mit diesem
+            if not future.cancelled() and future.exception() is None:
+                self._account_samples[account] = (now, values)
+        
+        future = self.writer.submit(job)
+        future.add_done_callback(remember)
+        return future
+        
+    def _prune_account_history(self, cursor: sqlite3.Cursor, now: float):
+        """Rohwerte und Verdichtungen jenseits von ACCOUNT_RETENTION löschen"""
+        for tier, retention in self.ACCOUNT_RETENTION.items():
+            if retention is None:
+                continue
+            if tier == 0:
+                cursor.execute("DELETE FROM account_samples WHERE time < ?", (now - retention,))
+            else:
+                cursor.execute("DELETE FROM account_rollup WHERE tier = ? AND bucket < ?",
+                               (tier, now - retention))
+        
+    def prune_account_history(self, now: Optional[float] = None) -> Future:
+        """Konto-Verlauf sofort aufräumen"""
+        now = time.time() if now is None else now
+        return self.writer.submit(lambda cursor: self._prune_account_history(cursor, now),
+                                  key='prune_account_history')
+        
+    def account_tier(self, start: float, end: float, max_points: int, now: Optional[float] = None) -> int:
+        """
+        Feinste Stufe für den Zeitraum: noch aufbewahrt und höchstens max_points
+        Buckets (Stufe 0 = Rohwerte, ungefähr ein Wert je Minute); sonst die gröbste.
+        """
+        now = time.time() if now is None else now
+        span = max(end - start, 0)
+        for tier, retention in self.ACCOUNT_RETENTION.items():
+            if retention is not None and start < now - retention:
+                continue
+            if span / (tier or ACCOUNT_SAMPLE_HEARTBEAT) <= max_points:
+                return tier
+        return self.ACCOUNT_TIERS[-1]
+        
+    def get_account_history(self, start: float, end: float, max_points: int = 1000,
+                            account: Optional[int] = None) -> Tuple[int, List[tuple]]:
+        """
+        Konto-Verlauf für den Chart: (Stufe, Zeilen). Die Stufe richtet sich nach
+        dem Zeitraum (account_tier). Zeilen: (Unix-Sekunden, balance, equity,
+        equity_low, equity_high, margin_max, margin_level_min). Ohne account
+        wird das zuletzt aufgezeichnete Konto verwendet.
+        """
+        tier = self.account_tier(start, end, max_points)
+        try:
+            conn = self._connect()
+            if account is None:
+                row = conn.execute('''
+                    SELECT account FROM account_rollup WHERE tier = ? ORDER BY last_time DESC LIMIT 1
+                ''', (self.ACCOUNT_TIERS[-1],)).fetchone()
+                if row is None:
+                    conn.close()
+                    return tier, []
+                account = row[0]
+        
+            if tier == 0:
+                rows = conn.execute('''
+                    SELECT time, balance, equity, equity, equity, margin, margin_level
+                    FROM account_samples
+                    WHERE account = ? AND time BETWEEN ? AND ?
+                    ORDER BY time
+                ''', (account, int(start), int(end))).fetchall()
+            else:
+                # Buckets, die in den Zeitraum hineinreichen
+                rows = conn.execute('''
+                    SELECT bucket, balance, equity, equity_low, equity_high, margin_max, margin_level_min
+                    FROM account_rollup
+                    WHERE tier = ? AND account = ? AND bucket BETWEEN ? AND ?
+                    ORDER BY bucket
+                ''', (tier, account, int(start) - int(start) % tier, int(end))).fetchall()
+            conn.close()
+            return tier, rows
+            
+        except Exception as e:
+            print(f"Konto-Verlauf Fehler: {e}")
+            return tier, []
+    
+    def get_equity_peak(self) -> Optional[float]:
+        """Equity-Hoch aus account_rollup (Summe der Höchststände je Konto), None ohne Verlauf"""
+        try:
+            conn = self._connect()
+            row = conn.execute('''
+                SELECT SUM(peak) FROM (
+                    SELECT MAX(equity_high) AS peak FROM account_rollup WHERE tier = ? GROUP BY account
+                )
+            ''', (self.ACCOUNT_TIERS[-1],)).fetchone()
+            conn.close()
+            return row[0]
+            
+        except Exception as e:
+            print(f"Konto-Verlauf Fehler: {e}")
+            return None
+    
+    def get_closed_trade_profits(self):
+        """Netto-Ergebnisse der geschlossenen Trades als NumPy-Array (nach close_time)"""
+        # NumPy erst bei Bedarf laden (Headless-Start bleibt schlank)
+        import numpy as np
+        from drx_analytics import load_closed_trades
+        
+        try:
+            return load_closed_trades(self).net
+        except Exception as e:
+            print(f"Profit-Laden Fehler: {e}")
+            return np.empty(0)
+    
+    def get_trades_without_excursions(self) -> List[tuple]:
+        """Geschlossene Trades ohne MAE/MFE-Eintrag"""
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT t.id, s.name, t.type, t.open_price, t.close_price,
+                       t.open_time, t.close_time
+                FROM trades t
+                JOIN symbols s ON s.id = t.symbol_id
+                LEFT JOIN trade_excursions e ON e.trade_id = t.id
+                WHERE t.status = 'closed' AND e.trade_id IS NULL
+                  AND t.open_time IS NOT NULL AND t.close_time IS NOT NULL
+                  AND t.close_price IS NOT NULL
+            ''')
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+            
+        except Exception as e:
+            print(f"Excursion-Laden Fehler: {e}")
+            return []
+    
+    def save_excursions(self, rows: List[tuple]) -> Future:
+        """MAE/MFE speichern: (trade_id, source, mae, mfe, time_to_mfe, left_on_table)"""
+        computed_at = datetime.now().isoformat()
+        params = [tuple(row) + (computed_at,) for row in rows]
+        
+        def job(cursor: sqlite3.Cursor) -> int:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO trade_excursions
+                (trade_id, source, mae, mfe, time_to_mfe, left_on_table, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', params)
+            return len(params)
+        
+        return self.writer.submit(job)
+    
+    def get_excursions(self) -> Dict[str, Dict]:
+        """Alle MAE/MFE-Werte nach Trade-ID"""
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT trade_id, source, mae, mfe, time_to_mfe, left_on_table
+                FROM trade_excursions
+            ''')
+            rows = cursor.fetchall()
+            conn.close()
+            
+            return {
+                row[0]: {
+                    'source': row[1], 'mae': row[2], 'mfe': row[3],
+                    'time_to_mfe': row[4], 'left_on_table': row[5]
+                }
+                for row in rows
+            }
+            
+        except Exception as e:
+            print(f"Excursion-Laden Fehler: {e}")
+            return {}
+    
+    def archive_files(self) -> List[Tuple[int, Path]]:
+        """Jahres-Archive als (Jahr, Datei), älteste zuerst (.db oder komprimiert .db.gz)"""
+        if not self.archive_dir.is_dir():
+            return []
+        
+        files: Dict[int, Path] = {}
+        for path in self.archive_dir.iterdir():
+            name = path.name
+            if not name.startswith(self.ARCHIVE_PREFIX):
+                continue
+            for suffix in ('.db', '.db.gz'):
+                year = name[len(self.ARCHIVE_PREFIX):-len(suffix)]
+                if name.endswith(suffix) and year.isdigit():
+                    # Unkomprimierte Datei hat Vorrang (Komprimieren unterbrochen)
+                    if suffix == '.db' or int(year) not in files:
+                        files[int(year)] = path
+        return sorted(files.items())
+    
+    def _archive_signature(self) -> tuple:
+        """(Jahr, Datei, mtime, Größe) aller Archive - ändert sich mit jedem Archivlauf"""
+        signature = []
+        for year, path in self.archive_files():
+            info = path.stat()
+            signature.append((year, str(path), info.st_mtime_ns, info.st_size))
+        return tuple(signature)
+    
+    def _archive_source(self, path: Path) -> Path:
+        """Lesbare Archiv-Datei - .db.gz wird einmal je Prozess in einen Cache entpackt"""
+        if path.suffix != '.gz':
+            return path
+        
+        with self._archive_lock:
+            if self._archive_cache is None:
+                self._archive_cache = tempfile.TemporaryDirectory(prefix="drx_archive_")
+            target = Path(self._archive_cache.name) / path.stem
+            if not target.exists() or target.stat().st_mtime < path.stat().st_mtime:
+                tmp = target.with_name(target.name + ".tmp")
+                with gzip.open(path, 'rb') as src, open(tmp, 'wb') as dest:
+                    shutil.copyfileobj(src, dest, 1 << 20)
+                os.replace(tmp, target)
+        return target
+    
+    def _archive_uri(self, path: Path) -> str:
+        """Schreibgeschützte file:-URI eines Archivs"""
+        return self._archive_source(path).resolve().as_uri() + "?mode=ro"
+    
+    def _open_archive(self, path: Path) -> sqlite3.Connection:
+        """Eigene schreibgeschützte Verbindung auf ein Archiv"""
+        return sqlite3.connect(self._archive_uri(path), uri=True)
+    
+    def _attach_archives(self, conn: sqlite3.Connection):
+        """
+        Archive als archive_<Jahr> anhängen und die Sicht temp.trades_all anlegen.
+        
+        UNION ALL über trades und alle Archive: SQLite reicht WHERE-Bedingungen in
+        jeden Teil weiter (Indizes je Datei) und mischt sortierte Teile per Index.
+        Bei zu vielen Archiven (SQLITE_MAX_ATTACHED) fehlen die jüngsten.
+        """
+        columns = ', '.join(self.TRADE_COLUMNS)
+        selects = [f"SELECT rowid AS rowid, {columns} FROM main.trades"]
+        for year, path in self.archive_files():
+            schema = f"archive_{year}"
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (self._archive_uri(path),))
+            except (OSError, sqlite3.Error) as e:
+                print(f"Archiv {year} nicht verfügbar: {e}")
+                continue
+            # Keine rowid: sie gehört zur Archiv-Datei und überschneidet sich mit trades
+            selects.append(f"SELECT NULL, {columns} FROM {schema}.trades")
+        conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS trades_all AS {' UNION ALL '.join(selects)}")
+    
+    @staticmethod
+    def _trades_source(archives: bool) -> str:
+        """FROM-Ausdruck: mit Archiven die Sicht trades_all (Spalten bleiben als trades.* ansprechbar)"""
+        return "trades_all AS trades" if archives else "trades"
+    
+    def _archive_stats(self) -> Dict[int, tuple]:
+        """
+        Je Archiv-Jahr (Trades, offene, geschlossene, Summe profit, neueste close_time).
+        
+        Archive ändern sich nur beim Archivieren - die Werte bleiben gecacht, bis
+        sich eine Datei ändert (Zusammenfassung und Zählung scannen sie nicht erneut).
+        """
+        signature = self._archive_signature()
+        if signature == self._archive_stats_cache[0]:
+            return self._archive_stats_cache[1]
+        
+        stats: Dict[int, tuple] = {}
+        for year, path in self.archive_files():
+            try:
+                conn = self._open_archive(path)
+                stats[year] = conn.execute('''
+                    SELECT COUNT(*),
+                           COALESCE(SUM(status = 'open'), 0),
+                           COALESCE(SUM(status = 'closed' AND close_time IS NOT NULL), 0),
+                           COALESCE(SUM(profit), 0),
+                           MAX(close_time)
+                    FROM trades
+                ''').fetchone()
+                conn.close()
+            
+            except (OSError, sqlite3.Error) as e:
+                print(f"Archiv {year} nicht lesbar: {e}")
+        self._archive_stats_cache = (signature, stats)
+        return stats
+    
+    def _use_archives(self, trade_filter: Optional[TradeFilter]) -> bool:
+        """
+        Muss eine Abfrage die Archive einbeziehen? Nein für offene Trades und für
+        Zeitfilter nach dem jüngsten archivierten close_time (open_time <= close_time).
+        """
+        stats = self._archive_stats()
+        if not stats:
+            return False
+        if trade_filter is None:
+            return True
+        if trade_filter.status == 'open':
+            return False
+        
+        newest = max((row[4] for row in stats.values() if row[4]), default=None)
+        if newest is None:
+            return False
+        for start in (trade_filter.open_from, trade_filter.close_from):
+            if start is None:
+                continue
+            start = start.isoformat() if isinstance(start, datetime) else str(start)
+            if start > newest:
+                return False
+        return True
+    
+    def _archived_daily_pnl(self) -> List[tuple]:
+        """Tages-Aggregate aller Archive (Spalten wie daily_pnl) für den Rollup-Neuaufbau"""
+        totals: Dict[tuple, List] = {}
+        for year, path in self.archive_files():
+            conn = self._open_archive(path)
+            try:
+                rows = conn.execute(self.DAILY_PNL_SQL.format(
+                    where="status = 'closed' AND close_time IS NOT NULL")).fetchall()
+            finally:
+                conn.close()
+            for row in rows:
+                values = totals.setdefault(row[:2], [0] * (len(row) - 2))
+                for i, value in enumerate(row[2:]):
+                    values[i] += value
+        return [key + tuple(values) for key, values in totals.items()]
+    
+    def archive_trades(self, before: Union[datetime, str], compress: bool = False) -> Dict[int, int]:
+        """
+        Geschlossene Trades mit close_time vor `before` in Jahres-Archive verschieben.
+        
+        Je Jahr zuerst in <db>_archive/drx_trades_<Jahr>.db kopieren (wiederholbar),
+        dann in trades nur die Zeilen löschen, die unverändert (rowversion) im Archiv
+        stehen - ein Abbruch verliert nichts. daily_pnl behält die archivierten Tage.
+        Vollständig archivierte Jahre werden verdichtet und schreibgeschützt (compress:
+        gzip); spätere Trades eines solchen Jahres bleiben in trades.
+        
+        Läuft außerhalb des Writer-Threads (ATTACH ist in dessen Transaktion nicht
+        möglich), die Schreibsperre hält jeweils nur der Lösch-Schritt.
+        Gibt die Anzahl verschobener Trades je Jahr zurück.
+        """
+        cutoff = before.isoformat() if isinstance(before, datetime) else str(before)
+        self.flush()
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        
+        moved: Dict[int, int] = {}
+        conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA recursive_triggers = ON")
+        try:
+            years = {int(row[0]) for row in conn.execute('''
+                SELECT DISTINCT substr(close_time, 1, 4) FROM trades
+                WHERE status = 'closed' AND close_time IS NOT NULL AND close_time < ?
+            ''', (cutoff,)) if row[0].isdigit()}
+            # Offene Archive ohne neue Trades, deren Jahr inzwischen abgelaufen ist
+            years.update(year for year, path in self.archive_files() if not self._archive_sealed(path))
+            
+            for year in sorted(years):
+                path = self.archive_dir / f"{self.ARCHIVE_PREFIX}{year}.db"
+                if self._archive_sealed(path.with_name(path.name + ".gz")) or self._archive_sealed(path):
+                    print(f"Archiv {year} ist abgeschlossen - neuere Trades bleiben in der Datenbank")
+                    continue
+                
+                year_end = f"{year + 1}-01-01"
+                end = min(cutoff, year_end)
+                conn.execute("ATTACH DATABASE ? AS archive", (str(path),))
+                try:
+                    moved[year] = self._archive_year(conn, f"{year}-01-01", end)
+                finally:
+                    conn.execute("DETACH DATABASE archive")
+                
+                if year_end <= cutoff:
+                    # Jahr vollständig archiviert
+                    self._seal_archive(path, compress)
+        finally:
+            conn.close()
+        return moved
+    
+    @staticmethod
+    def _archive_sealed(path: Path) -> bool:
+        """Abgeschlossenes Archiv: komprimiert oder schreibgeschützt (Dateirechte, auch als root)"""
+        if not path.exists():
+            return False
+        return path.suffix == '.gz' or not path.stat().st_mode & stat.S_IWUSR
+    
+    def _archive_year(self, conn: sqlite3.Connection, start: str, end: str) -> int:
+        """Geschlossene Trades mit start <= close_time < end nach archive verschieben"""
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS archive.trades ({self.TRADES_TABLE_SQL})")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive.symbols (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        self._create_trade_indexes(cursor, "archive")
+        
+        columns = ', '.join(self.TRADE_COLUMNS)
+        where = "t.status = 'closed' AND t.close_time >= ? AND t.close_time < ?"
+        
+        # 1. Kopieren - eigene Rowids im Archiv, id bleibt eindeutig
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO archive.trades ({columns}, rowversion)
+            SELECT {columns}, rowversion FROM main.trades t WHERE {where}
+        ''', (start, end))
+        cursor.execute('''
+            INSERT OR REPLACE INTO archive.symbols (id, name)
+            SELECT id, name FROM main.symbols
+            WHERE id IN (SELECT DISTINCT symbol_id FROM archive.trades)
+        ''')
+        cursor.execute("COMMIT")
+        
+        # 2. Löschen, was unverändert im Archiv steht; Tage im Rollup wieder addieren
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("DROP TABLE IF EXISTS temp.archive_moved")
+            cursor.execute(f'''
+                CREATE TEMP TABLE archive_moved AS
+                SELECT t.id FROM main.trades t
+                JOIN archive.trades a ON a.id = t.id AND a.rowversion = t.rowversion
+                WHERE {where}
+            ''', (start, end))
+            self._daily_pnl_add_table(cursor)
+            cursor.execute(f'''
+                INSERT INTO temp.daily_pnl_add
+                {self.DAILY_PNL_SQL.format(where="id IN (SELECT id FROM temp.archive_moved)")}
+            ''')
+            generation = cursor.execute(
+                "SELECT value FROM main.db_meta WHERE key = 'trades_generation'").fetchone()[0]
+            cursor.execute("DELETE FROM main.trades WHERE id IN (SELECT id FROM temp.archive_moved)")
+            count = cursor.rowcount
+            # Änderungs-Log: die eben protokollierten Löschungen sind Verschiebungen
+            cursor.execute('''
+                UPDATE main.trade_changes SET op = 'archive'
+                WHERE version > ? AND op = 'delete'
+                  AND trade_id IN (SELECT id FROM temp.archive_moved)
+            ''', (generation,))
+            self._add_daily_pnl(cursor)
+            cursor.execute("COMMIT")
+        
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        return count
+    
+    @staticmethod
+    def _seal_archive(path: Path, compress: bool):
+        """Abgeschlossenes Jahr verdichten, optional gzip, dann schreibgeschützt"""
+        conn = sqlite3.connect(str(path))
+        conn.execute("VACUUM")
+        conn.close()
+        
+        if compress:
+            target = path.with_name(path.name + ".gz")
+            tmp = path.with_name(path.name + ".gz.tmp")
+            with open(path, 'rb') as src, gzip.open(tmp, 'wb', compresslevel=6) as dest:
+                shutil.copyfileobj(src, dest, 1 << 20)
+            os.replace(tmp, target)
+            path.unlink()
+            path = target
+        os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+class BrokerConnector:
+    """Basis-Klasse für Broker-Verbindungen"""
+    
+    def __init__(self, broker_name: str):
+        super().__init__()
+        self.broker_name = broker_name
+        self.connected = False
+        self.account_info = {}
+        self.credentials = {}
+        self.system = SYSTEM
+    
+    def connect(self, credentials: Dict) -> bool:
+        """Verbindung herstellen"""
+        self.credentials = credentials
+        return True
+    
+    def disconnect(self):
+        """Verbindung trennen"""
+        self.connected = False
+        self.account_info = {}
+    
+    def get_account_info(self) -> Dict:
+        """Account-Info"""
+        return self.account_info
+    
+    def get_open_trades(self) -> List[Trade]:
+        """Offene Trades"""
+        return []
+    
+    def get_symbol_infos(self) -> List[SymbolInfo]:
+        """Metadaten aller Symbole"""
+        return []
+
+class MT5Connector(BrokerConnector):
+    """MetaTrader 5 Connector"""
+    
+    def __init__(self):
+        super().__init__("MetaTrader 5")
+        self.mt5_available = mt5_available
+        self.mt5 = None
+        
+        if SYSTEM == "Windows" and mt5_available:
+            try:
+                import MetaTrader5 as mt5
+                self.mt5 = mt5
+                self.mt5_available = True
+                print("✅ MT5 verfügbar")
+            except ImportError as e:
+                print(f"❌ MT5 Fehler: {e}")
+                self.mt5_available = False
+        else:
+            print(f"ℹ️ MT5 nur unter Windows (aktuell: {SYSTEM})")
+    
+    def connect(self, credentials: Dict) -> bool:
+        """MT5 Verbindung"""
+        if not self.mt5_available or self.mt5 is None:
+            print(f"❌ MT5 nicht verfügbar unter {SYSTEM}!")
+            return False
+        
+        try:
+            if not self.mt5.initialize():
+                error_code = self.mt5.last_error()
+                print(f"❌ MT5 Init fehlgeschlagen: {error_code}")
+                return False
+            
+            account = int(credentials.get('account', ''))
+            password = credentials.get('password', '')
+            server = credentials.get('server', '')
+            
+            if not self.mt5.login(account, password=password, server=server):
+                error_code = self.mt5.last_error()
+                print(f"❌ MT5 Login fehlgeschlagen: {error_code}")
+                return False
+            
+            account_info = self.mt5.account_info()
+            if account_info is None:
+                print("❌ Kontoinfo nicht verfügbar!")
+                return False
+            
+            self.connected = True
+            self.account_info = account_info._asdict()
+            
+            print(f"✅ MT5 VERBUNDEN!")
+            print(f"   Account: {self.account_info.get('login')}")
+            print(f"   Balance: €{self.account_info.get('balance', 0):.2f}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ MT5 Verbindung: {e}")
+            return False
+    
+    def get_account_info(self) -> Dict:
+        """Aktuelle Kontoinfo vom Terminal (Equity, Margin ändern sich laufend)"""
+        if self.connected and self.mt5 is not None:
+            try:
+                info = self.mt5.account_info()
+                if info is not None:
+                    self.account_info = info._asdict()
+            except Exception as e:
+                print(f"❌ Kontoinfo: {e}")
+        return self.account_info
+    
+    def get_open_trades(self) -> List[Trade]:
+        """MT5 Trades laden"""
+        if not self.connected or not self.mt5_available or self.mt5 is None:
+            return []
+        
+        try:
+            positions = self.mt5.positions_get()
+            if positions is None:
+                return []
+            
+            trades = []
+            for pos in positions:
+                trade = Trade(
+                    id=str(pos.ticket),
+                    symbol=pos.symbol,
+                    type='buy' if pos.type == 0 else 'sell',
+                    lots=pos.volume,
+                    open_price=pos.price_open,
+                    open_time=datetime.fromtimestamp(pos.time),
+                    profit=pos.profit,
+                    commission=pos.commission,
+                    swap=pos.swap,
+                    comment=pos.comment,
+                    magic=pos.magic,
+                    status='open'
+                )
+                trades.append(trade)
+            
+            return trades
+            
+        except Exception as e:
+            print(f"❌ Trade-Laden: {e}")
+            return []
+    
+    def get_symbol_infos(self) -> List[SymbolInfo]:
+        """Metadaten aller Symbole des Terminals (ein symbols_get-Aufruf)"""
+        if not self.connected or not self.mt5_available or self.mt5 is None:
+            return []
+        
+        try:
+            symbols = self.mt5.symbols_get()
+            if symbols is None:
+                return []
+            
+            now = datetime.now()
+            return [
+                SymbolInfo(
+                    name=info.name,
+                    digits=info.digits,
+                    point=info.point,
+                    contract_size=info.trade_contract_size,
+                    tick_size=info.trade_tick_size,
+                    tick_value=info.trade_tick_value,
+                    currency_base=info.currency_base,
+                    currency_profit=info.currency_profit,
+                    currency_margin=info.currency_margin,
+                    updated_at=now
+                )
+                for info in symbols
+            ]
+            
+        except Exception as e:
+            print(f"❌ Symbol-Laden: {e}")
+            return []
+
+
+class SymbolCache:
+    """
+    Symbol-Metadaten für Formatierung und Risiko-Rechnungen.
+    
+    Lesen ist ein reiner Dict-Zugriff (kein Terminal, keine DB). Der Stand kommt
+    beim Start aus der symbols-Tabelle und wird per symbols_get komplett erneuert,
+    wenn er älter als die TTL ist oder ein benötigtes Symbol fehlt. Symbole, die
+    das Terminal nicht kennt, lösen erst nach miss_ttl wieder einen Abruf aus.
+    """
+    
+    def __init__(self, db: DatabaseManager, ttl: float = SYMBOL_INFO_TTL,
+                 miss_ttl: float = SYMBOL_INFO_MISS_TTL):
+        self.db = db
+        self.ttl = ttl
+        self.infos: Dict[str, SymbolInfo] = db.get_symbol_infos()
+        # Ältester gespeicherter Stand (Unix-Zeit), 0 = nie abgerufen
+        self.refreshed = min((info.updated_at.timestamp() for info in self.infos.values()
+                              if info.updated_at), default=0.0)
+        self.last_attempt: Optional[float] = None
+        # Symbol -> Zeitpunkt (monotonic) des Abrufs, der es nicht geliefert hat
+        self.miss_ttl = miss_ttl
+        self.misses: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        return self.infos.get(symbol)
+    
+    def format_price(self, symbol: str, price: float) -> str:
+        """Preis mit den Nachkommastellen des Symbols (unbekannt: 5)"""
+        info = self.infos.get(symbol)
+        return f"{price:.{info.digits if info else 5}f}"
+    
+    def is_stale(self, symbols: Iterable[str] = ()) -> bool:
+        if time.time() - self.refreshed > self.ttl:
+            return True
+        now = time.monotonic()
+        for symbol in symbols:
+            if symbol in self.infos:
+                continue
+            missed = self.misses.get(symbol)
+            if missed is None or now - missed >= self.miss_ttl:
+                return True
+        return False
+    
+    def refresh(self, connector: BrokerConnector) -> int:
+        """Alle Symbole in einem Aufruf vom Terminal holen und speichern"""
+        with self._lock:
+            self.last_attempt = time.monotonic()
+            infos = connector.get_symbol_infos()
+            if not infos:
+                return 0
+            
+            merged = dict(self.infos)
+            merged.update((info.name, info) for info in infos)
+            # Austausch in einem Schritt - Leser in anderen Threads sehen alt oder neu
+            self.infos = merged
+            self.refreshed = time.time()
+        
+        self.db.save_symbol_infos(infos)
+        return len(infos)
+    
+    def refresh_if_stale(self, connector: BrokerConnector, symbols: Iterable[str] = ()) -> bool:
+        """Erneuern, wenn veraltet oder Symbole fehlen (höchstens alle SYMBOL_INFO_RETRY s)"""
+        symbols = set(symbols)
+        if not self.is_stale(symbols):
+            return False
+        if self.last_attempt is not None and time.monotonic() - self.last_attempt < SYMBOL_INFO_RETRY:
+            return False
+        refreshed = self.refresh(connector) > 0
+        if refreshed:
+            # Nicht gelieferte Symbole als Fehltreffer merken
+            self.misses.update((symbol, self.last_attempt) for symbol in symbols
+                               if symbol not in self.infos)
+        return refreshed
+    
+    def refresh_async(self, connector: BrokerConnector, on_done: Optional[Callable[[], None]] = None):
+        """refresh_if_stale im Hintergrund; on_done läuft im Hintergrund-Thread"""
+        def worker():
+            try:
+                if self.refresh_if_stale(connector) and on_done:
+                    on_done()
+            except Exception as e:
+                print(f"Symbol-Aktualisierung Fehler: {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+
+
+def sync_open_trades(connector: BrokerConnector, db: DatabaseManager,
+                     symbols: Optional[SymbolCache] = None,
+                     exposure: Optional["ExposureEngine"] = None) -> int:
+    """Offene Positionen vom Broker in die Datenbank (und die Exposure-Summen) übernehmen"""
+    open_trades = connector.get_open_trades()
+    if symbols is not None:
+        # Läuft im Sync-Thread - Anzeige und Rechnungen lesen nur den Cache
+        symbols.refresh_if_stale(connector, {trade.symbol for trade in open_trades})
+    account_info = connector.get_account_info()
+    if account_info:
+        # Konto-Verlauf (Write-Behind, der Sync wartet nicht)
+        db.save_account_sample(account_info)
+    if exposure is not None:
+        account = str(account_info.get('login', ''))
+        exposure.set_account(account, account_info)
+        exposure.update(account, open_trades)
+    if open_trades:
+        # Warten, damit die anschließende Anzeige den neuen Stand liest
+        db.save_trades(open_trades).result()
+    return len(open_trades)
+
+
+def archive_cutoff(config: Dict, now: Optional[datetime] = None) -> datetime:
+    """Stichtag für archive_trades aus dem Config-Abschnitt "archive" (keep_days)"""
+    keep_days = float(config.get('keep_days', ARCHIVE_KEEP_DAYS))
+    return (now or datetime.now()) - timedelta(days=keep_days)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Trade-Excursions (MAE/MFE)
+Batch-Berechnung pro geschlossenem Trade aus dem lokalen Marktdaten-Cache
+
+Kennzahlen (in Preis-Einheiten, immer >= 0):
+    mae            Maximum Adverse Excursion zwischen open_time und close_time
+    mfe            Maximum Favorable Excursion zwischen open_time und close_time
+    time_to_mfe    Sekunden vom Einstieg bis zum ersten Erreichen der MFE
+    left_on_table  Weitere günstige Bewegung nach dem Exit (post_exit_window)
+
+Alle Trades eines Symbols werden gemeinsam über ein Preis-Array gerechnet:
+Bereichsgrenzen per searchsorted, Extremwerte per reduceat - keine
+Python-Schleife pro Trade.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from drx_market_data import KIND_M1, KIND_TICKS, MarketDataStore, to_epoch
+
+# Standard: 1 Stunde nach dem Exit für "left on the table"
+DEFAULT_POST_EXIT_WINDOW = 3600
+
+# Maximale Anzahl gesammelter Preispunkte pro Rechenblock
+CHUNK_POINTS = 5_000_000
+
+
+def _price_series(data: np.ndarray, kind: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                        np.ndarray, np.ndarray]:
+    """Zeit, Buy-High/Low (Bid) und Sell-High/Low (Ask) aus Cache-Daten"""
+    if kind == KIND_TICKS:
+        times = data['time_msc'] / 1000.0
+        bid = data['bid'].astype(np.float64)
+        ask = data['ask'].astype(np.float64)
+        return times, bid, bid, ask, ask
+
+    # M1-Bars sind Bid-basiert - für Sells als Näherung verwendet
+    times = data['time'].astype(np.float64)
+    high = data['high'].astype(np.float64)
+    low = data['low'].astype(np.float64)
+    return times, high, low, high, low
+
+
+def _segment_extremes(values: np.ndarray, lengths: np.ndarray,
+                      use_max: bool = True) -> np.ndarray:
+    """Max/Min je Segment eines flachen Arrays (leere Segmente = NaN)"""
+    result = np.full(len(lengths), np.nan)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return result
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+    ufunc = np.maximum if use_max else np.minimum
+    result[nonempty] = ufunc.reduceat(values, starts)
+    return result
+
+
+def _gather(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flache Indexliste aller Bereiche [lo, hi) plus Segment-Zuordnung"""
+    lengths = np.maximum(hi - lo, 0)
+    total = int(lengths.sum())
+    seg = np.repeat(np.arange(len(lo)), lengths)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    idx = np.arange(total) - np.repeat(offsets, lengths) + np.repeat(lo, lengths)
+    return idx, seg, lengths
+
+
+def compute_excursions(times: np.ndarray, buy_high: np.ndarray, buy_low: np.ndarray,
+                       sell_high: np.ndarray, sell_low: np.ndarray,
+                       direction: np.ndarray, open_price: np.ndarray,
+                       close_price: np.ndarray, open_time: np.ndarray,
+                       close_time: np.ndarray,
+                       post_exit_window: float = DEFAULT_POST_EXIT_WINDOW) -> Dict[str, np.ndarray]:
+    """
+    Vektorisierte MAE/MFE-Berechnung für Trades eines Symbols.
+
+    direction: +1 für Buy, -1 für Sell. Zeiten in Unix-Sekunden,
+    `times` aufsteigend sortiert.
+    """
+    n = len(direction)
+
+    # Bereichsgrenzen im Preis-Array
+    lo = np.searchsorted(times, open_time, side='left')
+    hi = np.searchsorted(times, close_time, side='right')
+    post_lo = hi
+    post_hi = np.searchsorted(times, close_time + post_exit_window, side='right')
+
+    result = {
+        'mae': np.full(n, np.nan),
+        'mfe': np.full(n, np.nan),
+        'time_to_mfe': np.full(n, np.nan),
+        'left_on_table': np.full(n, np.nan),
+        'points': hi - lo,
+    }
+
+    # Trades so aufteilen, dass die gesammelten Preispunkte begrenzt bleiben
+    points = np.maximum(hi - lo, 0) + np.maximum(post_hi - post_lo, 0)
+    batch_ids = np.cumsum(points) // CHUNK_POINTS
+    bounds = np.flatnonzero(np.diff(batch_ids)) + 1
+    series = (times, buy_high, buy_low, sell_high, sell_low)
+
+    for part in np.split(np.arange(n), bounds):
+        if len(part) == 0:
+            continue
+        _compute_batch(series, part, direction > 0, open_price, close_price, open_time,
+                       lo, hi, post_lo, post_hi, result)
+
+    for key in ('mae', 'mfe', 'time_to_mfe', 'left_on_table'):
+        result[key] = np.maximum(result[key], 0.0)
+    return result
+
+
+def _compute_batch(series: Tuple[np.ndarray, ...], part: np.ndarray, is_buy: np.ndarray,
+                   open_price: np.ndarray, close_price: np.ndarray, open_time: np.ndarray,
+                   lo: np.ndarray, hi: np.ndarray, post_lo: np.ndarray, post_hi: np.ndarray,
+                   result: Dict[str, np.ndarray]):
+    """Ein Block von Trades - schreibt direkt in `result`"""
+    times, buy_high, buy_low, sell_high, sell_low = series
+    part_buy = is_buy[part]
+
+    # Während des Trades
+    idx, seg, lengths = _gather(lo[part], hi[part])
+    seg_buy = part_buy[seg]
+    seg_open = open_price[part][seg]
+    highs = np.where(seg_buy, buy_high[idx], sell_high[idx])
+    lows = np.where(seg_buy, buy_low[idx], sell_low[idx])
+
+    favorable = np.where(seg_buy, highs - seg_open, seg_open - lows)
+    adverse = np.where(seg_buy, seg_open - lows, highs - seg_open)
+
+    mfe = _segment_extremes(favorable, lengths)
+    result['mfe'][part] = mfe
+    result['mae'][part] = _segment_extremes(adverse, lengths)
+
+    # Zeit bis MFE: erster Index je Segment, an dem das Maximum erreicht wird
+    if len(favorable):
+        hits = np.flatnonzero(favorable == mfe[seg])
+        hit_segments, first = np.unique(seg[hits], return_index=True)
+        result['time_to_mfe'][part[hit_segments]] = (
+            times[idx[hits[first]]] - open_time[part[hit_segments]]
+        )
+
+    # Nach dem Exit
+    idx, seg, lengths = _gather(post_lo[part], post_hi[part])
+    seg_buy = part_buy[seg]
+    post_high = _segment_extremes(np.where(seg_buy, buy_high[idx], sell_high[idx]), lengths)
+    post_low = _segment_extremes(np.where(seg_buy, buy_low[idx], sell_low[idx]), lengths,
+                                 use_max=False)
+    result['left_on_table'][part] = np.where(part_buy, post_high - close_price[part],
+                                             close_price[part] - post_low)
+
+
+class ExcursionAnalyzer:
+    """MAE/MFE für neue geschlossene Trades berechnen und speichern"""
+
+    def __init__(self, db: Any, store: MarketDataStore, kind: str = KIND_M1,
+                 post_exit_window: int = DEFAULT_POST_EXIT_WINDOW):
+        self.db = db
+        self.store = store
+        self.kind = kind
+        self.post_exit_window = post_exit_window
+
+    def update(self) -> int:
+        """Nur Trades ohne Eintrag in trade_excursions berechnen"""
+        rows = self.db.get_trades_without_excursions()
+        if not rows:
+            return 0
+
+        by_symbol: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_symbol.setdefault(row[1], []).append(row)
+
+        saved = 0
+        for symbol, symbol_rows in by_symbol.items():
+            results = self.compute_symbol(symbol, symbol_rows)
+            self.db.save_excursions(results)
+            saved += len(results)
+
+        print(f"📐 MAE/MFE berechnet: {saved} von {len(rows)} Trades")
+        return saved
+
+    def compute_symbol(self, symbol: str, rows: List[tuple]) -> List[tuple]:
+        """Alle Trades eines Symbols gegen ein gemeinsames Preis-Array rechnen"""
+        ids = [row[0] for row in rows]
+        direction = np.array([1 if str(row[2]).lower() == 'buy' else -1 for row in rows],
+                             dtype=np.int8)
+        open_price = np.array([row[3] for row in rows], dtype=np.float64)
+        close_price = np.array([row[4] for row in rows], dtype=np.float64)
+        open_time = np.array([to_epoch(datetime.fromisoformat(row[5])) for row in rows],
+                             dtype=np.float64)
+        close_time = np.array([to_epoch(datetime.fromisoformat(row[6])) for row in rows],
+                              dtype=np.float64)
+
+        # Trades nach Einstieg sortieren und in Blöcke mit begrenztem Zeitraum teilen
+        order = np.argsort(open_time, kind='stable')
+        results: List[tuple] = []
+
+        for block in self._blocks(order, open_time, close_time):
+            start = int(open_time[block].min())
+            end = int(close_time[block].max() + self.post_exit_window) + 1
+            data = self._load(symbol, start, end)
+            if len(data) == 0:
+                continue
+
+            times, buy_high, buy_low, sell_high, sell_low = _price_series(data, self.kind)
+            metrics = compute_excursions(
+                times, buy_high, buy_low, sell_high, sell_low,
+                direction[block], open_price[block], close_price[block],
+                open_time[block], close_time[block], self.post_exit_window
+            )
+
+            for pos, i in enumerate(block):
+                # Ohne Preisdaten im Trade-Zeitraum nichts speichern (später erneut)
+                if metrics['points'][pos] <= 0:
+                    continue
+                results.append((
+                    ids[i], self.kind,
+                    float(metrics['mae'][pos]),
+                    float(metrics['mfe'][pos]),
+                    int(metrics['time_to_mfe'][pos]),
+                    None if np.isnan(metrics['left_on_table'][pos])
+                    else float(metrics['left_on_table'][pos]),
+                ))
+
+        return results
+
+    def _load(self, symbol: str, start: int, end: int) -> np.ndarray:
+        if self.kind == KIND_TICKS:
+            return self.store.get_ticks(symbol, start, end)
+        return self.store.get_bars(symbol, start, end)
+
+    def _blocks(self, order: np.ndarray, open_time: np.ndarray,
+                close_time: np.ndarray) -> List[np.ndarray]:
+        """Trades zu Blöcken zusammenfassen, deren Preisbereich nicht zu groß wird"""
+        # Grobe Schätzung der Punkte pro Sekunde (M1: 1/60, Ticks: ~2/s)
+        density = 2.0 if self.kind == KIND_TICKS else 1.0 / 60.0
+        max_span = CHUNK_POINTS / density
+
+        blocks: List[np.ndarray] = []
+        current: List[int] = []
+        block_start: Optional[float] = None
+        block_end = 0.0
+
+        for i in order:
+            end = close_time[i] + self.post_exit_window
+            if current and block_start is not None and max(block_end, end) - block_start > max_span:
+                blocks.append(np.array(current))
+                current = []
+                block_start = None
+
+            if block_start is None:
+                block_start = open_time[i]
+                block_end = end
+            current.append(int(i))
+            block_end = max(block_end, end)
+
+        if current:
+            blocks.append(np.array(current))
+        return blocks
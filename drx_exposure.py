@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Exposure
+Netto-Exposure je Symbol und Währung, Margin und offene P&L der offenen Positionen
+
+Die Summen werden bei jedem Sync aus dem Unterschied zum vorherigen Stand
+nachgeführt: reine Preisänderungen ändern nur die offene P&L, neue, geänderte
+und geschlossene Positionen tragen ihren alten Beitrag aus und den neuen ein.
+Kontraktgrößen und Währungen kommen aus dem SymbolCache (nie vom Terminal).
+
+Die Margin je Symbol ist eine Schätzung (Kontraktwert / Hebel, ohne
+Hedging-Rabatt); die Auslastung nutzt Margin und Equity aus account_info.
+
+Nur Standardbibliothek - läuft auch im Headless-Sync.
+
+Benchmark (Kosten je Sync bei n offenen Positionen):
+    python drx_exposure.py --benchmark 5000
+"""
+
+import heapq
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from drx_core import SymbolCache, SymbolInfo, Trade
+
+
+@dataclass
+class SymbolExposure:
+    """Offene Positionen eines Symbols über alle Konten"""
+    symbol: str
+    positions: int = 0
+    long_lots: float = 0.0
+    short_lots: float = 0.0
+    unrealized: float = 0.0  # Kontowährung (profit + swap + commission)
+    margin: float = 0.0  # geschätzt, in margin_currency
+    margin_currency: str = ""
+
+    @property
+    def net_lots(self) -> float:
+        return self.long_lots - self.short_lots
+
+
+@dataclass
+class ExposureSnapshot:
+    """Kopie der Summen für die Anzeige"""
+    symbols: Dict[str, SymbolExposure]
+    currencies: Dict[str, float]  # Netto-Betrag je Währung (+ long, - short)
+    margin: Dict[str, float]  # geschätzte Margin je Margin-Währung
+    unrealized: float
+    positions: int
+    accounts: Dict[str, Dict]  # account_info je Konto
+    unknown_symbols: List[str]  # ohne Metadaten - fehlen in Exposure und Margin
+    oldest: Optional[Tuple[str, str, datetime]] = None  # (id, Symbol, open_time) der ältesten Position
+
+    @property
+    def margin_usage(self) -> Optional[float]:
+        """Margin / Equity in % laut Terminal (alle Konten)"""
+        equity = sum(info.get('equity') or 0.0 for info in self.accounts.values())
+        margin = sum(info.get('margin') or 0.0 for info in self.accounts.values())
+        return margin / equity * 100 if equity else None
+
+
+class _Position:
+    """Beitrag einer Position zu den Summen"""
+    __slots__ = ('state', 'pnl', 'opened', 'long_lots', 'short_lots', 'exposure', 'margin',
+                 'margin_currency', 'known')
+
+    def __init__(self, state: tuple, pnl: float, info: Optional[SymbolInfo], leverage: float,
+                 opened: Optional[datetime] = None):
+        symbol, side, lots, open_price = state
+        self.state = state
+        self.pnl = pnl
+        self.opened = opened
+        self.long_lots = lots if side == 'buy' else 0.0
+        self.short_lots = 0.0 if side == 'buy' else lots
+        self.known = info is not None
+        self.exposure: Tuple[Tuple[str, float], ...] = ()
+        self.margin = 0.0
+        self.margin_currency = ""
+        if info is None:
+            return
+
+        units = (lots if side == 'buy' else -lots) * info.contract_size
+        if info.currency_base and info.currency_base != info.currency_profit:
+            # Devisen: long Basiswährung, short Gegenwährung zum Einstiegskurs
+            self.exposure = ((info.currency_base, units),
+                             (info.currency_profit, -units * open_price))
+            self.margin = abs(units) / leverage
+        else:
+            # CFDs, Indizes, Metalle mit gleicher Basis- und Gewinnwährung: Nominalwert
+            self.exposure = ((info.currency_profit, units * open_price),)
+            self.margin = abs(units) * open_price / leverage
+        self.margin_currency = info.currency_margin or info.currency_profit
+
+
+class ExposureEngine:
+    """
+    Summen der offenen Positionen mehrerer Konten, per Positions-Diff nachgeführt.
+
+    update() läuft im Sync-Thread, snapshot() kopiert nur die Summen (Aufwand
+    je Symbol/Währung, nicht je Position) und ist aus jedem Thread nutzbar.
+    """
+
+    def __init__(self, symbols: SymbolCache, default_leverage: float = 100.0):
+        self.symbols = symbols
+        self.default_leverage = default_leverage
+        self._books: Dict[str, Dict[str, _Position]] = {}
+        self._accounts: Dict[str, Dict] = {}
+        self._by_symbol: Dict[str, SymbolExposure] = {}
+        self._currencies: Dict[str, float] = {}
+        self._currency_refs: Dict[str, int] = {}
+        self._margin: Dict[str, float] = {}
+        self._margin_refs: Dict[str, int] = {}
+        self._unknown: Dict[str, int] = {}
+        self._unrealized = 0.0
+        self._positions = 0
+        # (open_time, Konto, id) - veraltete Einträge werden erst an der Spitze entfernt
+        self._opened: List[Tuple[datetime, str, str]] = []
+        self._lock = threading.Lock()
+
+    def _leverage(self, account: str) -> float:
+        return float(self._accounts.get(account, {}).get('leverage') or self.default_leverage)
+
+    def set_account(self, account: str, info: Dict):
+        """account_info eines Kontos (Equity, Margin, Hebel) - neuer Hebel schätzt die Margin neu"""
+        with self._lock:
+            old = self._leverage(account)
+            self._accounts[account] = dict(info)
+            if self._leverage(account) != old and account in self._books:
+                book = self._books[account]
+                for key, position in book.items():
+                    self._apply(position, -1)
+                    book[key] = self._position(position.state, position.pnl, account, position.opened)
+                    self._apply(book[key], 1)
+
+    def update(self, account: str, trades: Iterable[Trade]) -> int:
+        """
+        Offene Positionen eines Kontos übernehmen (vollständige Liste wie positions_get).
+
+        Gibt die Anzahl geänderter Positionen zurück.
+        """
+        with self._lock:
+            book = self._books.setdefault(account, {})
+            seen = set()
+            changed = 0
+            for trade in trades:
+                seen.add(trade.id)
+                state = (trade.symbol, trade.type, trade.lots, trade.open_price)
+                pnl = (trade.profit or 0.0) + (trade.swap or 0.0) + (trade.commission or 0.0)
+                position = book.get(trade.id)
+
+                if position is not None and position.state == state and (
+                        position.known or self.symbols.get(trade.symbol) is None):
+                    if position.pnl != pnl:
+                        # Nur der Kurs hat sich bewegt
+                        self._by_symbol[trade.symbol].unrealized += pnl - position.pnl
+                        self._unrealized += pnl - position.pnl
+                        position.pnl = pnl
+                        changed += 1
+                    continue
+
+                if position is not None:
+                    self._apply(position, -1)
+                elif trade.open_time is not None:
+                    heapq.heappush(self._opened, (trade.open_time, account, trade.id))
+                position = self._position(state, pnl, account, trade.open_time)
+                book[trade.id] = position
+                self._apply(position, 1)
+                changed += 1
+
+            for key in [key for key in book if key not in seen]:
+                self._apply(book.pop(key), -1)
+                changed += 1
+
+            if len(self._opened) > 2 * self._positions + 100:
+                self._opened = [(position.opened, owner, key)
+                                for owner, positions in self._books.items()
+                                for key, position in positions.items() if position.opened]
+                heapq.heapify(self._opened)
+            return changed
+
+    def remove_account(self, account: str):
+        """Alle Positionen eines Kontos austragen (z.B. nach dem Trennen)"""
+        with self._lock:
+            for position in self._books.pop(account, {}).values():
+                self._apply(position, -1)
+            self._accounts.pop(account, None)
+
+    def _position(self, state: tuple, pnl: float, account: str,
+                  opened: Optional[datetime] = None) -> _Position:
+        return _Position(state, pnl, self.symbols.get(state[0]), self._leverage(account), opened)
+
+    def _oldest(self) -> Optional[Tuple[str, str, datetime]]:
+        """Älteste offene Position (geschlossene Einträge an der Heap-Spitze verwerfen)"""
+        while self._opened:
+            opened, account, key = self._opened[0]
+            position = self._books.get(account, {}).get(key)
+            if position is not None and position.opened == opened:
+                return key, position.state[0], opened
+            heapq.heappop(self._opened)
+        return None
+
+    def _apply(self, position: _Position, sign: int):
+        """Beitrag einer Position ein- (sign=1) oder austragen (sign=-1)"""
+        symbol = position.state[0]
+        entry = self._by_symbol.get(symbol)
+        if entry is None:
+            entry = self._by_symbol[symbol] = SymbolExposure(symbol)
+        entry.positions += sign
+        if entry.positions == 0:
+            # Leere Symbole entfernen - keine Rundungsreste aus dem Nachführen
+            del self._by_symbol[symbol]
+        else:
+            entry.long_lots += sign * position.long_lots
+            entry.short_lots += sign * position.short_lots
+            entry.unrealized += sign * position.pnl
+            entry.margin += sign * position.margin
+            entry.margin_currency = position.margin_currency or entry.margin_currency
+
+        for currency, amount in position.exposure:
+            _add(self._currencies, self._currency_refs, currency, sign * amount, sign)
+        if position.margin_currency:
+            _add(self._margin, self._margin_refs, position.margin_currency,
+                 sign * position.margin, sign)
+        if not position.known:
+            count = self._unknown.get(symbol, 0) + sign
+            if count:
+                self._unknown[symbol] = count
+            else:
+                del self._unknown[symbol]
+
+        self._positions += sign
+        self._unrealized += sign * position.pnl
+        if self._positions == 0:
+            self._unrealized = 0.0
+
+    def snapshot(self) -> ExposureSnapshot:
+        """Kopie der aktuellen Summen"""
+        with self._lock:
+            return ExposureSnapshot(
+                symbols={symbol: replace(entry) for symbol, entry in self._by_symbol.items()},
+                currencies=dict(self._currencies),
+                margin=dict(self._margin),
+                unrealized=self._unrealized,
+                positions=self._positions,
+                accounts={account: dict(info) for account, info in self._accounts.items()},
+                unknown_symbols=sorted(self._unknown),
+                oldest=self._oldest(),
+            )
+
+    def recompute(self) -> ExposureSnapshot:
+        """Summen aus allen Positionen neu bilden (Kontrolle des Nachführens)"""
+        with self._lock:
+            books = {account: dict(book) for account, book in self._books.items()}
+        check = ExposureEngine(self.symbols, self.default_leverage)
+        check._accounts = {account: dict(info) for account, info in self._accounts.items()}
+        for account, book in books.items():
+            check._books[account] = book
+            for key, position in book.items():
+                check._apply(position, 1)
+                if position.opened:
+                    check._opened.append((position.opened, account, key))
+        heapq.heapify(check._opened)
+        return check.snapshot()
+
+
+def _add(totals: Dict[str, float], refs: Dict[str, int], key: str, value: float, ref: int):
+    """Betrag addieren; Schlüssel ohne verbleibende Positionen entfernen"""
+    refs[key] = refs.get(key, 0) + ref
+    if refs[key] == 0:
+        del totals[key]
+        del refs[key]
+    else:
+        totals[key] = totals.get(key, 0.0) + value
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+class _StaticSymbols(SymbolCache):
+    """SymbolCache ohne Datenbank (nur für den Benchmark)"""
+
+    def __init__(self, infos: Dict[str, SymbolInfo]):
+        self.infos = infos
+
+
+def run_benchmark(n: int = 5000, ticks: int = 50, seed: int = 42):
+    """Nachführen je Sync vs. Neuberechnung bei n offenen Positionen (4 Konten)"""
+    rng = random.Random(seed)
+    currencies = ["EUR", "USD", "GBP", "JPY", "CHF", "AUD"]
+    infos = {}
+    for base in currencies:
+        for quote in currencies:
+            if base != quote:
+                infos[base + quote] = SymbolInfo(base + quote, contract_size=100_000.0,
+                                                 currency_base=base, currency_profit=quote,
+                                                 currency_margin=base)
+    infos["XAUUSD"] = SymbolInfo("XAUUSD", digits=2, contract_size=100.0, currency_base="XAU",
+                                 currency_profit="USD", currency_margin="USD")
+    symbols = _StaticSymbols(infos)
+    names = list(infos)
+
+    accounts = [str(1000 + i) for i in range(4)]
+    books = {account: [] for account in accounts}
+    for i in range(n):
+        books[accounts[i % 4]].append(Trade(
+            id=str(i), symbol=rng.choice(names), type=rng.choice(("buy", "sell")),
+            lots=rng.choice((0.01, 0.1, 0.5, 1.0)), open_price=1.0 + rng.random(),
+            profit=rng.gauss(0, 50), status='open'))
+
+    engine = ExposureEngine(symbols)
+    start = time.perf_counter()
+    for account, trades in books.items():
+        engine.update(account, trades)
+    full = time.perf_counter() - start
+
+    # Je Tick: alle Kurse bewegen sich, wenige Positionen öffnen/schließen
+    tick_times = []
+    next_id = n
+    for _ in range(ticks):
+        for account, trades in books.items():
+            for i, trade in enumerate(trades):
+                trades[i] = replace(trade, profit=trade.profit + rng.gauss(0, 1))
+            trades.pop(rng.randrange(len(trades)))
+            trades.append(Trade(id=str(next_id), symbol=rng.choice(names), type="buy",
+                                lots=0.1, open_price=1.1, status='open'))
+            next_id += 1
+        start = time.perf_counter()
+        for account, trades in books.items():
+            engine.update(account, trades)
+        tick_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        snapshot = engine.snapshot()
+    read = (time.perf_counter() - start) / 100
+
+    check = engine.recompute()
+    drift = max(abs(check.currencies[c] - snapshot.currencies.get(c, 0.0)) for c in check.currencies)
+
+    tick_times.sort()
+    print(f"🧪 Exposure Benchmark mit {n:,} Positionen ({len(accounts)} Konten)")
+    print(f"   Erstaufbau:       {full * 1000:.1f} ms")
+    print(f"   Sync (Diff):      Median {tick_times[len(tick_times) // 2] * 1000:.1f} ms "
+          f"({tick_times[len(tick_times) // 2] / n * 1e6:.2f} µs je Position)")
+    print(f"   Snapshot lesen:   {read * 1e6:.0f} µs ({len(snapshot.symbols)} Symbole)")
+    print(f"   Rundungsdrift:    {drift:.2e}")
+    return snapshot
+
+
+if __name__ == "__main__":
+    count = 5000
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        count = int(sys.argv[2])
+    run_benchmark(count)
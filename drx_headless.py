@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Headless Sync
+Synchronisiert MT5-Positionen in die Datenbank ohne Tk, matplotlib oder pandas
+
+Verwendung:
+    python drx_headless.py --account 123456 --server Broker-Server
+    python "Drx Trading Tracker.py" --headless --interval 10
+    python drx_headless.py --once
+    python drx_headless.py --archive   (alte geschlossene Trades in Jahres-Archive)
+
+Das Passwort kommt nie von der Kommandozeile (sonst in ps und /proc sichtbar):
+entweder aus der Umgebungsvariable DRX_MT5_PASSWORD oder per Abfrage im Terminal.
+Konto/Server auch über DRX_MT5_ACCOUNT, DRX_MT5_SERVER.
+"""
+
+import argparse
+import getpass
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from drx_backup import BackupManager, format_size
+from drx_core import (
+    APP_NAME, APP_VERSION, CONFIG_FILE, DATABASE_FILE, SYSTEM,
+    DatabaseManager, MT5Connector, SymbolCache, archive_cutoff, sync_open_trades
+)
+
+DEFAULT_INTERVAL = 5
+MAX_RECONNECT_DELAY = 300
+
+
+def log(message: str):
+    """Zeitgestempelte Ausgabe (stdout, für systemd/Docker-Logs)"""
+    print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}", flush=True)
+
+
+class SyncScheduler:
+    """
+    Fester Takt auf Basis der monotonen Uhr - kein Aufsummieren von Verzögerungen.
+    Läuft ein Job länger als das Intervall, werden verpasste Ticks übersprungen.
+    """
+
+    def __init__(self, interval: float, job: Callable[[], None]):
+        self.interval = interval
+        self.job = job
+        self.stop_event = threading.Event()
+
+    def run(self):
+        next_run = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                self.job()
+            except Exception as e:
+                log(f"❌ Sync Fehler: {e}")
+
+            next_run += self.interval
+            now = time.monotonic()
+            if next_run < now:
+                skipped = int((now - next_run) // self.interval) + 1
+                next_run += skipped * self.interval
+            self.stop_event.wait(next_run - now)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class HeadlessSync:
+    """Verbindung halten und Positionen periodisch speichern"""
+
+    def __init__(self, credentials: Dict, db_file: str = DATABASE_FILE):
+        self.credentials = credentials
+        self.db = DatabaseManager(db_file)
+        self.symbols = SymbolCache(self.db)
+        self.connector: Optional[MT5Connector] = None
+        self.reconnect_delay = 1.0
+        self.next_reconnect = 0.0
+        self.synced_total = 0
+
+    def ensure_connected(self) -> bool:
+        """Verbindung aufbauen, bei Fehlern mit exponentiellem Backoff"""
+        if self.connector and self.connector.connected:
+            return True
+
+        now = time.monotonic()
+        if now < self.next_reconnect:
+            return False
+
+        self.connector = MT5Connector()
+        if self.connector.mt5_available and self.connector.connect(self.credentials):
+            self.reconnect_delay = 1.0
+            return True
+
+        log(f"⏳ Neuer Verbindungsversuch in {self.reconnect_delay:.0f}s")
+        self.next_reconnect = now + self.reconnect_delay
+        self.reconnect_delay = min(self.reconnect_delay * 2, MAX_RECONNECT_DELAY)
+        return False
+
+    def sync_once(self):
+        """Ein Sync-Durchlauf"""
+        if not self.ensure_connected():
+            return
+        assert self.connector is not None
+
+        try:
+            count = sync_open_trades(self.connector, self.db, self.symbols)
+            self.synced_total += count
+        except Exception as e:
+            log(f"❌ Sync Fehler, Verbindung wird neu aufgebaut: {e}")
+            self.connector.disconnect()
+
+    def shutdown(self):
+        # Ausstehende Schreibaufträge vor dem Beenden schreiben
+        self.db.close()
+        metrics = self.db.writer.metrics()
+        log(f"📝 DB-Writer: {metrics['jobs']} Aufträge, {metrics['batches']} Batches, "
+            f"Commit Ø {metrics['avg_commit_ms']:.1f} ms / max {metrics['max_commit_ms']:.1f} ms")
+        
+        if self.connector:
+            self.connector.disconnect()
+            if self.connector.mt5 is not None:
+                try:
+                    self.connector.mt5.shutdown()
+                except Exception:
+                    pass
+
+
+def load_config() -> Dict:
+    """Gemeinsame Config der GUI (leer, wenn nicht vorhanden)"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        log(f"Config Fehler: {e}")
+    return {}
+
+
+def load_interval() -> float:
+    """Sync-Intervall aus der Config (sync_interval), sonst Standard"""
+    try:
+        return float(load_config().get('sync_interval', DEFAULT_INTERVAL))
+    except (TypeError, ValueError) as e:
+        log(f"Config Fehler: {e}")
+    return DEFAULT_INTERVAL
+
+
+def read_password() -> str:
+    """MT5-Passwort aus DRX_MT5_PASSWORD, sonst Abfrage wenn ein Terminal vorhanden ist"""
+    password = os.environ.get('DRX_MT5_PASSWORD', '')
+    if password or not sys.stdin.isatty():
+        return password
+    try:
+        return getpass.getpass("MT5 Passwort: ")
+    except (EOFError, KeyboardInterrupt):
+        return ''
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} - Headless Sync")
+    parser.add_argument('--headless', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--account', default=os.environ.get('DRX_MT5_ACCOUNT', ''))
+    parser.add_argument('--server', default=os.environ.get('DRX_MT5_SERVER', ''))
+    parser.add_argument('--interval', type=float, default=None,
+                        help="Sync-Intervall in Sekunden (Standard: Config oder 5)")
+    parser.add_argument('--db', default=DATABASE_FILE, help="Pfad zur Datenbank")
+    parser.add_argument('--once', action='store_true', help="Nur einen Durchlauf ausführen")
+    parser.add_argument('--archive', action='store_true',
+                        help="Alte geschlossene Trades in Jahres-Archive verschieben und beenden")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Einstiegspunkt für den Headless-Betrieb"""
+    args = parse_args(argv)
+    interval = args.interval if args.interval else load_interval()
+
+    log(f"🎯 {APP_NAME} v{APP_VERSION} - Headless ({SYSTEM})")
+    log(f"💾 DB: {args.db}")
+
+    if args.archive:
+        # Ohne Broker-Verbindung: Stichtag und Kompression aus dem Abschnitt "archive"
+        archive_config = load_config().get('archive') or {}
+        db = DatabaseManager(args.db)
+        moved = db.archive_trades(archive_cutoff(archive_config),
+                                  compress=bool(archive_config.get('compress')))
+        db.close()
+        for year, count in moved.items():
+            log(f"🗄️ {year}: {count} Trades archiviert")
+        log(f"✅ {sum(moved.values())} Trades archiviert ({db.archive_dir})")
+        return 0
+
+    credentials = {'account': args.account, 'password': read_password(), 'server': args.server}
+    if not all(credentials.values()):
+        log("❌ Konto, Passwort und Server angeben (Argumente, DRX_MT5_* Variablen "
+            "oder Passwort-Abfrage im Terminal)")
+        return 2
+
+    sync = HeadlessSync(credentials, args.db)
+
+    if args.once:
+        sync.sync_once()
+        sync.shutdown()
+        log(f"✅ {sync.synced_total} Positionen synchronisiert")
+        return 0
+
+    scheduler = SyncScheduler(interval, sync.sync_once)
+
+    # Automatische Backups wie in der GUI (Abschnitt "backup" der Config)
+    backup_config = load_config().get('backup') or {}
+    backups = BackupManager.from_config(args.db, backup_config)
+    if backup_config.get('auto'):
+        backups.start(lambda result: log(f"💾 Backup: {result.path} "
+                                         f"({format_size(result.stored_bytes)} in {result.seconds:.1f}s)"))
+
+    def handle_signal(signum, frame):
+        log("🛑 Beende Headless-Sync...")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    log(f"🔄 Sync alle {interval:g}s")
+    scheduler.run()
+    backups.stop()
+    sync.shutdown()
+    log(f"✅ Beendet ({sync.synced_total} Positionen synchronisiert)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
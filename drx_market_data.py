@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Marktdaten-Cache
+Lokaler Tick- und M1-Speicher auf Basis von copy_ticks_range / copy_rates_range
+
+Ablage pro Symbol und Tag als NumPy Structured Array (.npy, memory-mapped):
+    <base_dir>/<SYMBOL>/ticks/YYYYMMDD.npy
+    <base_dir>/<SYMBOL>/m1/YYYYMMDD.npy
+    <base_dir>/<SYMBOL>/<kind>/coverage.json  (bereits geladene Zeitbereiche)
+
+Zeiten sind Unix-Sekunden (Ticks zusätzlich in Millisekunden). Jeder Bereich
+mit Daten wird nur einmal vom Terminal geholt; danach kommen Abfragen aus dem
+Cache. Leere Antworten werden beim nächsten Zugriff erneut angefragt.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Spalten-Layout der Cache-Dateien
+TICK_DTYPE = np.dtype([
+    ('time_msc', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<f8'),
+    ('flags', '<u4'),
+])
+
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<i8'),
+    ('spread', '<i4'),
+    ('real_volume', '<i8'),
+])
+
+KIND_TICKS = "ticks"
+KIND_M1 = "m1"
+
+DAY_SECONDS = 86400
+
+# MT5 Konstanten (identisch zu mt5_stubs.py)
+TIMEFRAME_M1 = 1
+COPY_TICKS_ALL = -1
+
+TimeLike = Union[datetime, int, float]
+
+
+def to_epoch(value: TimeLike) -> int:
+    """Zeitpunkt in Unix-Sekunden umwandeln (naive datetimes = lokale Zeit wie im Sync)"""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _day_key(day_start: int) -> str:
+    """Dateiname für einen Tag"""
+    return datetime.fromtimestamp(day_start, tz=timezone.utc).strftime("%Y%m%d")
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Überlappende oder angrenzende Intervalle zusammenfassen"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_intervals(start: int, end: int,
+                        covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Lücken in [start, end) gegenüber bereits abgedeckten Intervallen"""
+    gaps = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _convert(raw: Any, dtype: np.dtype) -> np.ndarray:
+    """MT5-Ergebnis (Structured Array) in das Cache-Layout übertragen"""
+    if raw is None or len(raw) == 0:
+        return np.empty(0, dtype=dtype)
+
+    raw = np.asarray(raw)
+    out = np.zeros(len(raw), dtype=dtype)
+    names = raw.dtype.names or ()
+
+    for field in dtype.names:
+        if field in names:
+            out[field] = raw[field]
+
+    # Ticks ohne time_msc (ältere Builds): aus Sekunden ableiten
+    if dtype is TICK_DTYPE and 'time_msc' not in names and 'time' in names:
+        out['time_msc'] = raw['time'].astype('<i8') * 1000
+    if dtype is TICK_DTYPE and 'volume_real' in names and 'volume' not in names:
+        out['volume'] = raw['volume_real']
+
+    return out
+
+
+class MarketDataStore:
+    """Lokaler Marktdaten-Cache mit Lückenfüllung über das MT5-Terminal"""
+
+    def __init__(self, base_dir: Union[str, Path], mt5: Optional[Any] = None,
+                 max_open_files: int = 64):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.mt5 = mt5
+        self.max_open_files = max_open_files
+
+        self._lock = threading.RLock()
+        self._maps: "OrderedDict[Path, np.ndarray]" = OrderedDict()
+        self._coverage: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+
+        # Statistik: wie oft wurde wirklich das Terminal gefragt?
+        self.terminal_requests = 0
+
+    def set_source(self, mt5: Optional[Any]):
+        """Datenquelle (MetaTrader5 Modul) setzen oder entfernen"""
+        self.mt5 = mt5
+
+    # =========================================================================
+    # ÖFFENTLICHE ABFRAGEN
+    # =========================================================================
+
+    def get_ticks(self, symbol: str, start: TimeLike, end: TimeLike,
+                  fetch: bool = True) -> np.ndarray:
+        """Ticks in [start, end) - fehlende Bereiche werden nachgeladen"""
+        return self._get(symbol, KIND_TICKS, to_epoch(start), to_epoch(end), fetch)
+
+    def get_bars(self, symbol: str, start: TimeLike, end: TimeLike,
+                 fetch: bool = True) -> np.ndarray:
+        """M1-Bars in [start, end) - fehlende Bereiche werden nachgeladen"""
+        return self._get(symbol, KIND_M1, to_epoch(start), to_epoch(end), fetch)
+
+    def missing_ranges(self, symbol: str, kind: str, start: TimeLike,
+                       end: TimeLike) -> List[Tuple[int, int]]:
+        """Noch nicht gecachte Bereiche in [start, end)"""
+        with self._lock:
+            covered = self._load_coverage(symbol, kind)
+            return _subtract_intervals(to_epoch(start), to_epoch(end), covered)
+
+    def prefetch(self, symbol: str, kind: str, start: TimeLike, end: TimeLike) -> int:
+        """Bereich vorab füllen, gibt Anzahl neu geladener Datensätze zurück"""
+        return self._fill_gaps(symbol, kind, to_epoch(start), to_epoch(end))
+
+    def symbols(self) -> List[str]:
+        """Alle Symbole mit Cache-Daten"""
+        return sorted(p.name for p in self.base_dir.iterdir() if p.is_dir())
+
+    def clear(self, symbol: Optional[str] = None):
+        """Cache leeren (ein Symbol oder alles)"""
+        import shutil
+
+        with self._lock:
+            self._maps.clear()
+            if symbol is None:
+                self._coverage.clear()
+                targets = [p for p in self.base_dir.iterdir() if p.is_dir()]
+            else:
+                for key in [k for k in self._coverage if k[0] == symbol]:
+                    del self._coverage[key]
+                targets = [self._symbol_dir(symbol)]
+
+            for target in targets:
+                shutil.rmtree(target, ignore_errors=True)
+
+    # =========================================================================
+    # INTERN: LESEN
+    # =========================================================================
+
+    def _get(self, symbol: str, kind: str, start: int, end: int, fetch: bool) -> np.ndarray:
+        dtype = TICK_DTYPE if kind == KIND_TICKS else BAR_DTYPE
+        if end <= start:
+            return np.empty(0, dtype=dtype)
+
+        if fetch:
+            self._fill_gaps(symbol, kind, start, end)
+
+        with self._lock:
+            parts = []
+            for day_start in range(start - start % DAY_SECONDS, end, DAY_SECONDS):
+                data = self._open_day(symbol, kind, day_start)
+                if data is None or len(data) == 0:
+                    continue
+
+                # Zeitindex: Dateien sind sortiert, Bereich per Binärsuche
+                if kind == KIND_TICKS:
+                    times = data['time_msc']
+                    lo = np.searchsorted(times, start * 1000, side='left')
+                    hi = np.searchsorted(times, end * 1000, side='left')
+                else:
+                    times = data['time']
+                    lo = np.searchsorted(times, start, side='left')
+                    hi = np.searchsorted(times, end, side='left')
+
+                if hi > lo:
+                    parts.append(data[lo:hi])
+
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        # Kopie zurückgeben, damit keine Map über das Ergebnis offen bleibt
+        if len(parts) == 1:
+            return np.array(parts[0])
+        return np.concatenate(parts)
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.base_dir / symbol.replace("/", "_")
+
+    def _day_path(self, symbol: str, kind: str, day_start: int) -> Path:
+        return self._symbol_dir(symbol) / kind / f"{_day_key(day_start)}.npy"
+
+    def _open_day(self, symbol: str, kind: str, day_start: int) -> Optional[np.ndarray]:
+        """Tagesdatei memory-mapped öffnen (LRU-begrenzt)"""
+        path = self._day_path(symbol, kind, day_start)
+
+        cached = self._maps.get(path)
+        if cached is not None:
+            self._maps.move_to_end(path)
+            return cached
+
+        if not path.exists():
+            return None
+
+        try:
+            data = np.load(str(path), mmap_mode='r')
+        except Exception as e:
+            print(f"Marktdaten-Datei defekt ({path.name}): {e}")
+            return None
+
+        self._maps[path] = data
+        while len(self._maps) > self.max_open_files:
+            self._maps.popitem(last=False)
+        return data
+
+    # =========================================================================
+    # INTERN: NACHLADEN
+    # =========================================================================
+
+    def _fill_gaps(self, symbol: str, kind: str, start: int, end: int) -> int:
+        """Nur fehlende Bereiche vom Terminal holen"""
+        with self._lock:
+            # Zukunft nie als "abgedeckt" markieren
+            now = int(datetime.now(tz=timezone.utc).timestamp())
+            end = min(end, now)
+            if end <= start:
+                return 0
+
+            gaps = _subtract_intervals(start, end, self._load_coverage(symbol, kind))
+            if not gaps or self.mt5 is None:
+                return 0
+
+            loaded = 0
+            for gap_start, gap_end in gaps:
+                # Pro Tag holen, damit große Lücken nicht einen Riesen-Request erzeugen
+                chunk_start = gap_start
+                while chunk_start < gap_end:
+                    chunk_end = min(gap_end, chunk_start - chunk_start % DAY_SECONDS + DAY_SECONDS)
+                    data = self._fetch(symbol, kind, chunk_start, chunk_end)
+                    if data is None:
+                        # Terminal-Fehler: Bereich bleibt offen, nächster Versuch später
+                        return loaded
+
+                    # Leer heißt oft nur "Historie noch nicht im Terminal" - nicht als
+                    # abgedeckt merken, sonst wird der Bereich nie wieder geholt
+                    if len(data):
+                        self._store(symbol, kind, data)
+                        self._add_coverage(symbol, kind, chunk_start, chunk_end)
+                    loaded += len(data)
+                    chunk_start = chunk_end
+
+            return loaded
+
+    def _fetch(self, symbol: str, kind: str, start: int, end: int) -> Optional[np.ndarray]:
+        """Ein Zeitfenster vom Terminal laden"""
+        date_from = datetime.fromtimestamp(start, tz=timezone.utc)
+        date_to = datetime.fromtimestamp(end, tz=timezone.utc)
+
+        try:
+            self.terminal_requests += 1
+            if kind == KIND_TICKS:
+                flags = getattr(self.mt5, 'COPY_TICKS_ALL', COPY_TICKS_ALL)
+                raw = self.mt5.copy_ticks_range(symbol, date_from, date_to, flags)
+                if raw is None:
+                    return None
+                data = _convert(raw, TICK_DTYPE)
+                # copy_ticks_range ist inklusiv - Ende ausschließen
+                return data[(data['time_msc'] >= start * 1000) & (data['time_msc'] < end * 1000)]
+            else:
+                timeframe = getattr(self.mt5, 'TIMEFRAME_M1', TIMEFRAME_M1)
+                raw = self.mt5.copy_rates_range(symbol, timeframe, date_from, date_to)
+                if raw is None:
+                    return None
+                data = _convert(raw, BAR_DTYPE)
+                return data[(data['time'] >= start) & (data['time'] < end)]
+
+        except Exception as e:
+            print(f"❌ Marktdaten-Abruf {symbol} ({kind}): {e}")
+            return None
+
+    def _store(self, symbol: str, kind: str, data: np.ndarray):
+        """Neue Datensätze in die Tagesdateien einsortieren"""
+        if len(data) == 0:
+            return
+
+        time_field = 'time_msc' if kind == KIND_TICKS else 'time'
+        scale = 1000 if kind == KIND_TICKS else 1
+        days = (data[time_field] // scale) // DAY_SECONDS * DAY_SECONDS
+
+        for day_start in np.unique(days):
+            day_start = int(day_start)
+            new = data[days == day_start]
+            path = self._day_path(symbol, kind, day_start)
+
+            existing = self._open_day(symbol, kind, day_start)
+            if existing is not None and len(existing):
+                combined = np.concatenate([np.asarray(existing), new])
+            else:
+                combined = new
+
+            # Stabil nach Zeit sortieren; bei Bars doppelte Zeitstempel entfernen
+            combined = combined[np.argsort(combined[time_field], kind='stable')]
+            if kind == KIND_M1 and len(combined) > 1:
+                keep = np.ones(len(combined), dtype=bool)
+                keep[:-1] = combined[time_field][1:] != combined[time_field][:-1]
+                combined = combined[keep]
+
+            # Alle Referenzen auf die alte Map freigeben, dann atomar ersetzen
+            # (Windows erlaubt kein Ersetzen einer noch gemappten Datei)
+            self._maps.pop(path, None)
+            existing = None
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp.npy')
+            np.save(str(tmp_path), np.ascontiguousarray(combined))
+            os.replace(str(tmp_path), str(path))
+
+    # =========================================================================
+    # INTERN: ABDECKUNG
+    # =========================================================================
+
+    def _coverage_path(self, symbol: str, kind: str) -> Path:
+        return self._symbol_dir(symbol) / kind / "coverage.json"
+
+    def _load_coverage(self, symbol: str, kind: str) -> List[Tuple[int, int]]:
+        key = (symbol, kind)
+        if key not in self._coverage:
+            intervals: List[Tuple[int, int]] = []
+            path = self._coverage_path(symbol, kind)
+            if path.exists():
+                try:
+                    with open(path, 'r') as f:
+                        intervals = [(int(a), int(b)) for a, b in json.load(f)]
+                except Exception as e:
+                    print(f"Coverage-Datei defekt ({symbol}/{kind}): {e}")
+            self._coverage[key] = _merge_intervals(intervals)
+        return self._coverage[key]
+
+    def _add_coverage(self, symbol: str, kind: str, start: int, end: int):
+        key = (symbol, kind)
+        intervals = self._load_coverage(symbol, kind) + [(start, end)]
+        self._coverage[key] = _merge_intervals(intervals)
+
+        path = self._coverage_path(symbol, kind)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._coverage[key], f)
+        os.replace(str(tmp_path), str(path))
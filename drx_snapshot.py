@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Dashboard-Snapshot
+Kompakter Zustand des Dashboards für den sofortigen Start
+
+Beim Beenden speichert die GUI Kennzahlen, eine ausgedünnte Equity-Kurve,
+die erste Seite der Trades-Tabelle und die Generation der trades-Tabelle.
+Beim nächsten Start wird der Snapshot vor dem ersten DB-Zugriff angezeigt und
+im Hintergrund gegen die aktuelle Generation geprüft.
+
+Nur Standardbibliothek - wird vor numpy/matplotlib geladen.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+SNAPSHOT_VERSION = 2
+
+# Größen im Snapshot
+EQUITY_POINTS = 500
+TRADES_PAGE = 100
+
+REQUIRED_KEYS = ('generation', 'summary', 'stats', 'rolling', 'equity', 'trades')
+
+
+def downsample(points: Sequence, max_points: int = EQUITY_POINTS) -> List:
+    """Gleichmäßig ausdünnen, erster und letzter Punkt bleiben erhalten"""
+    n = len(points)
+    if n <= max_points:
+        return list(points)
+    if max_points < 2:
+        return [points[-1]]
+
+    step = (n - 1) / (max_points - 1)
+    return [points[round(i * step)] for i in range(max_points)]
+
+
+def load_snapshot(path: str, db_file: str) -> Optional[Dict[str, Any]]:
+    """Snapshot laden - None, wenn fehlend, veraltet oder für eine andere DB"""
+    try:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except Exception as e:
+        print(f"Snapshot Fehler: {e}")
+        return None
+
+    if snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('db_file') != db_file:
+        return None
+    if any(key not in snapshot for key in REQUIRED_KEYS):
+        return None
+
+    # JSON kennt nur String-Schlüssel
+    snapshot['rolling'] = {int(size): values for size, values in snapshot['rolling'].items()}
+    return snapshot
+
+
+def save_snapshot(path: str, db_file: str, data: Dict[str, Any]) -> bool:
+    """Snapshot atomar schreiben (temporäre Datei + os.replace)"""
+    if any(data.get(key) is None for key in REQUIRED_KEYS):
+        return False
+
+    snapshot = dict(data)
+    snapshot['version'] = SNAPSHOT_VERSION
+    snapshot['db_file'] = db_file
+    snapshot['equity'] = downsample(data['equity'])
+    snapshot['trades'] = list(data['trades'])[:TRADES_PAGE]
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, default=float)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        print(f"Snapshot-Speichern Fehler: {e}")
+        return False
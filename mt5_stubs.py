@@ -103,6 +103,26 @@ class TerminalInfo(NamedTuple):
     data_path: str
     commondata_path: str
 
+class SymbolInfo(NamedTuple):
+    """MT5 Symbol Info Structure (fields used by the tracker)"""
+    name: str
+    description: str
+    path: str
+    digits: int
+    point: float
+    spread: int
+    trade_contract_size: float
+    trade_tick_size: float
+    trade_tick_value: float
+    volume_min: float
+    volume_max: float
+    volume_step: float
+    currency_base: str
+    currency_profit: str
+    currency_margin: str
+    margin_initial: float
+    margin_maintenance: float
+
 # Type stubs für MetaTrader5 Module
 def initialize(path: Optional[str] = None, login: Optional[int] = None, 
                password: Optional[str] = None, server: Optional[str] = None, 
@@ -148,7 +168,7 @@ def history_deals_get(date_from: Any = None, date_to: Any = None,
     """Get historical deals"""
     ...
 
-def symbols_get(group: str = "") -> Optional[Tuple[Any, ...]]:
+def symbols_get(group: str = "") -> Optional[Tuple[SymbolInfo, ...]]:
     """Get available symbols"""
     ...
 
@@ -156,7 +176,7 @@ def symbols_total() -> int:
     """Get total symbols count"""
     ...
 
-def symbol_info(symbol: str) -> Optional[Any]:
+def symbol_info(symbol: str) -> Optional[SymbolInfo]:
     """Get symbol information"""
     ...
 
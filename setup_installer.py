@@ -210,8 +210,6 @@ class DRXInstaller:
             "tkinter",  # Meist bereits enthalten
             "pandas",
             "matplotlib",
-            "seaborn", 
-            "requests",
             "python-dateutil"
         ]
         
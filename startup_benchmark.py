@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+DRX Trading Tracker - Startup-Benchmark
+Import-Zeiten (python -X importtime) und Zeit bis zum ersten Frame der GUI
+
+Verwendung:
+    python startup_benchmark.py
+    python startup_benchmark.py --runs 5 --max-first-frame 0.8
+
+Die App wird mit DRX_STARTUP_PROBE=1 gestartet, meldet "first_frame" und
+"ready" auf stderr und beendet sich danach selbst. Der Benchmark schlägt fehl
+(Exit-Code 1), wenn der erste Frame zu spät kommt oder schwere Module
+(numpy, pandas, matplotlib, ...) schon vor dem ersten Frame geladen sind.
+Benötigt ein Display (unter Linux z.B. xvfb-run).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+APP_SCRIPT = Path(__file__).resolve().parent / "Drx Trading Tracker.py"
+
+# Dürfen erst nach dem ersten Frame geladen werden
+LAZY_MODULES = ("numpy", "pandas", "matplotlib", "seaborn", "requests")
+
+DEFAULT_MAX_FIRST_FRAME = 1.0
+DEFAULT_TOP = 15
+TIMEOUT = 120
+
+
+@dataclass
+class StartupRun:
+    """Ergebnis eines App-Starts"""
+    first_frame: float
+    ready: Optional[float]
+    heavy_modules: List[str] = field(default_factory=list)
+    # (kumuliert µs, eigen µs, Modul) der Top-Level-Imports vor dem ersten Frame
+    imports: List[Tuple[int, int, str]] = field(default_factory=list)
+
+
+def parse_importtime(lines: List[str]) -> List[Tuple[int, int, str]]:
+    """Top-Level-Einträge aus der -X importtime Ausgabe"""
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Kopfzeile
+        name = parts[2]
+        # Untermodule sind mit zwei Leerzeichen pro Ebene eingerückt
+        if len(name) - len(name.lstrip()) > 1:
+            continue
+        imports.append((int(parts[1]), int(parts[0]), name.strip()))
+    return imports
+
+
+def run_once(script: Path = APP_SCRIPT) -> StartupRun:
+    """App einmal im Probe-Modus starten und stderr auswerten"""
+    env = dict(os.environ)
+    env["DRX_STARTUP_PROBE"] = "1"
+    env["DRX_STARTUP_T0"] = repr(time.time())
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(script)],
+        cwd=str(script.parent), env=env, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, universal_newlines=True, timeout=TIMEOUT
+    )
+
+    before_frame: List[str] = []
+    first_frame: Optional[float] = None
+    ready: Optional[float] = None
+    heavy: List[str] = []
+
+    for line in proc.stderr.splitlines():
+        if line.startswith("STARTUP "):
+            _, stage, seconds, modules = line.split(" ", 3)
+            if stage == "first_frame":
+                first_frame = float(seconds)
+                heavy = [] if modules == "-" else modules.split(",")
+            elif stage == "ready":
+                ready = float(seconds)
+        elif first_frame is None:
+            before_frame.append(line)
+
+    if first_frame is None:
+        tail = "\n".join(proc.stderr.splitlines()[-10:])
+        raise RuntimeError(f"App hat keinen ersten Frame gemeldet (Exit {proc.returncode}):\n{tail}")
+
+    return StartupRun(first_frame, ready, heavy, parse_importtime(before_frame))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="DRX Trading Tracker - Startup-Benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Anzahl Starts (Median)")
+    parser.add_argument("--max-first-frame", type=float, default=DEFAULT_MAX_FIRST_FRAME,
+                        help="Grenze für den ersten Frame in Sekunden")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Anzahl der teuersten Imports in der Übersicht")
+    args = parser.parse_args(argv)
+
+    runs: List[StartupRun] = []
+    for i in range(max(1, args.runs)):
+        try:
+            runs.append(run_once())
+        except Exception as e:
+            print(f"❌ Start {i + 1} fehlgeschlagen: {e}")
+            return 1
+
+    first_frame = statistics.median(r.first_frame for r in runs)
+    ready_values = [r.ready for r in runs if r.ready is not None]
+    last = runs[-1]
+    import_total = sum(cumulative for cumulative, _, _ in last.imports)
+
+    print(f"🚀 Startup-Benchmark ({len(runs)} Starts)")
+    print(f"   Erster Frame:  {first_frame * 1000:.0f} ms (Grenze {args.max_first_frame * 1000:.0f} ms)")
+    if ready_values:
+        print(f"   Vollständig:   {statistics.median(ready_values) * 1000:.0f} ms")
+    print(f"   Imports vor dem ersten Frame: {import_total / 1000:.0f} ms")
+    print()
+    print(f"   {'kumuliert':>10}  {'eigen':>8}  Modul")
+    for cumulative, own, name in sorted(last.imports, reverse=True)[:args.top]:
+        print(f"   {cumulative / 1000:>8.1f}ms  {own / 1000:>6.1f}ms  {name}")
+    print()
+
+    failed = False
+    heavy = sorted({name for r in runs for name in r.heavy_modules if name in LAZY_MODULES})
+    if heavy:
+        print(f"❌ Vor dem ersten Frame geladen: {', '.join(heavy)}")
+        failed = True
+    if first_frame > args.max_first_frame:
+        print(f"❌ Erster Frame zu langsam: {first_frame * 1000:.0f} ms")
+        failed = True
+
+    if not failed:
+        print("✅ Startup OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
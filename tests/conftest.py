@@ -0,0 +1,105 @@
+"""Gemeinsame Fixtures: temporäre Datenbank und Trade-Fabrik"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drx_core import BrokerConnector, DatabaseManager, Trade  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Leere Datenbank im Temp-Verzeichnis (Archive daneben)"""
+    manager = DatabaseManager(str(tmp_path / "drx_trades.db"))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def make_trade():
+    """Geschlossener Trade; Zeiten als Stunden-Abstand zu einem festen Start"""
+    start = datetime(2023, 1, 2, 9, 0)
+
+    def factory(trade_id, symbol="EURUSD", hours=0, profit=10.0, status="closed",
+                comment="", **fields):
+        open_time = start + timedelta(hours=hours)
+        values = dict(
+            id=str(trade_id), symbol=symbol, type="buy", lots=0.1, open_price=1.1,
+            close_price=1.2 if status == "closed" else None, open_time=open_time,
+            close_time=open_time + timedelta(hours=1) if status == "closed" else None,
+            profit=profit, commission=-0.5, swap=0.0, comment=comment, status=status,
+        )
+        values.update(fields)
+        return Trade(**values)
+
+    return factory
+
+
+@pytest.fixture
+def fetch_all():
+    """Alle Seiten über next_key abrufen - Trade-ids in Reihenfolge"""
+
+    def fetch(page, limit):
+        ids, after = [], None
+        while True:
+            result = page(limit=limit, after=after)
+            assert len(result.trades) <= limit
+            ids.extend(trade.id for trade in result.trades)
+            if result.next_key is None:
+                return ids
+            after = result.next_key
+
+    return fetch
+
+
+class FakeBroker(BrokerConnector):
+    """Broker ohne Terminal: feste Positionen, Kontodaten und Symbole"""
+
+    mt5 = None
+    mt5_available = True
+
+    def __init__(self, trades=(), account_info=None, symbol_infos=()):
+        super().__init__("Fake")
+        self.trades = list(trades)
+        self.account = dict(account_info or {})
+        self.symbol_infos = list(symbol_infos)
+        self.fail_connect = False
+        self.symbol_requests = 0
+
+    def connect(self, credentials):
+        super().connect(credentials)
+        self.connected = not self.fail_connect
+        self.account_info = dict(self.account) if self.connected else {}
+        return self.connected
+
+    def get_account_info(self):
+        return dict(self.account)
+
+    def get_open_trades(self):
+        return list(self.trades)
+
+    def get_symbol_infos(self):
+        self.symbol_requests += 1
+        return list(self.symbol_infos)
+
+
+@pytest.fixture
+def broker():
+    return FakeBroker()
+
+
+@pytest.fixture(scope="session")
+def gui():
+    """GUI-Modul (Dateiname mit Leerzeichen) - ohne Fenster, Tk wird nur importiert"""
+    import importlib.util
+
+    pytest.importorskip("tkinter")
+    path = Path(__file__).resolve().parent.parent / "Drx Trading Tracker.py"
+    spec = importlib.util.spec_from_file_location("drx_gui", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
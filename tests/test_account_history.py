@@ -0,0 +1,87 @@
+"""Konto-Verlauf: Rohwerte, Verdichtung je Stufe und Equity-Hoch"""
+
+import time
+
+import pytest
+
+
+def sample(db, at, equity, balance=1000.0, login=7, margin=50.0):
+    future = db.save_account_sample({'login': login, 'balance': balance, 'equity': equity,
+                                     'margin': margin, 'margin_level': equity / margin * 100}, at=at)
+    if future is not None:
+        future.result()
+    db.flush()
+    return future
+
+
+@pytest.fixture
+def now():
+    # Auf volle Tage gerundet - Buckets aller Stufen beginnen gleich
+    return int(time.time()) // 86400 * 86400 - 86400
+
+
+def test_unchanged_values_only_every_heartbeat(db, now):
+    assert sample(db, now, 1000.0) is not None
+    assert sample(db, now + 10, 1000.0) is None
+    assert sample(db, now + 20, 1005.0) is not None
+    # Gleiche oder ältere Zeit wird nie geschrieben
+    assert sample(db, now + 20, 990.0) is None
+    assert sample(db, now + 80, 1005.0) is not None
+
+    tier, rows = db.get_account_history(now, now + 100, max_points=1000)
+    assert tier == 0
+    assert [(row[0], row[2]) for row in rows] == [(now, 1000.0), (now + 20, 1005.0), (now + 80, 1005.0)]
+
+
+def test_rollup_tiers(db, now):
+    for minute, equity in enumerate([1000.0, 980.0, 1040.0, 1010.0]):
+        sample(db, now + minute * 60, equity, margin=50.0 + minute)
+
+    # Längerer Zeitraum: Stundenstufe mit Tief/Hoch und letztem Stand
+    tier, rows = db.get_account_history(now, now + 3600, max_points=10)
+    assert tier == 3600
+    assert rows == [(now, 1000.0, 1010.0, 980.0, 1040.0, 53.0, pytest.approx(1010.0 / 53 * 100))]
+
+    # Älter als die Rohwerte: Minutenstufe
+    tier, rows = db.get_account_history(now - 2 * 86400, now + 3600, max_points=3000)
+    assert tier == 60 and [row[2] for row in rows] == [1000.0, 980.0, 1040.0, 1010.0]
+
+    tier, rows = db.get_account_history(now - 400 * 86400, now, max_points=1000)
+    assert tier == 86400 and rows[-1][2] == 1010.0
+
+
+def test_latest_account_and_equity_peak(db, now):
+    assert db.get_equity_peak() is None
+
+    sample(db, now, 1000.0, login=1)
+    sample(db, now + 60, 1200.0, login=1)
+    sample(db, now + 120, 1100.0, login=1)
+    sample(db, now + 180, 500.0, login=2)
+
+    # Summe der Höchststände je Konto
+    assert db.get_equity_peak() == 1700.0
+    # Ohne account: zuletzt aufgezeichnetes Konto
+    _, rows = db.get_account_history(now, now + 600, max_points=1000)
+    assert [row[2] for row in rows] == [500.0]
+    _, rows = db.get_account_history(now, now + 600, max_points=1000, account=1)
+    assert [row[2] for row in rows] == [1000.0, 1200.0, 1100.0]
+
+
+def test_prune_keeps_coarse_tiers(db, now):
+    old = now - 40 * 86400
+    sample(db, old, 900.0)
+    sample(db, now, 1000.0)
+
+    db.prune_account_history(now).result()
+
+    # Rohwerte nach 2, Minuten nach 30 Tagen gelöscht - Stunden und Tage bleiben
+    conn = db._connect()
+    try:
+        samples = [row[0] for row in conn.execute("SELECT time FROM account_samples")]
+        tiers = sorted(row[0] for row in conn.execute(
+            "SELECT tier FROM account_rollup WHERE bucket <= ?", (old,)))
+    finally:
+        conn.close()
+    assert samples == [now]
+    assert tiers == [3600, 86400]
+    assert db.get_account_history(old, now, max_points=1000, account=7)[1][0][2] == 900.0
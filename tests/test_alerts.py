@@ -0,0 +1,118 @@
+"""Hysterese, Cooldown und Stundenlimit der AlertEngine"""
+
+from datetime import datetime
+
+import pytest
+
+from drx_alerts import AlertEngine, AlertRule, AlertState, DailyLossRule, DrawdownRule, ExposureRule
+from drx_exposure import ExposureSnapshot, SymbolExposure
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def snapshot(accounts=None):
+    return ExposureSnapshot(symbols={}, currencies={}, margin={}, unrealized=0.0, positions=0,
+                            accounts=accounts or {}, unknown_symbols=[])
+
+
+def loss(value):
+    """Zustand mit Tagesverlust `value`"""
+    return AlertState(datetime(2024, 1, 1), snapshot(), -value, None, None)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def received():
+    return []
+
+
+def engine(rules, clock, received, **kwargs):
+    return AlertEngine(rules, [received.append], clock=clock, **kwargs)
+
+
+def test_hysteresis(clock, received):
+    alerts = engine([DailyLossRule(100)], clock, received, cooldown=0)
+
+    assert alerts.evaluate(loss(99)) == []
+    assert len(alerts.evaluate(loss(101))) == 1
+    # Bleibt aktiv bis unter 90 % der Schwelle
+    assert alerts.evaluate(loss(150)) == []
+    assert alerts.evaluate(loss(95)) == []
+    assert alerts.evaluate(loss(101)) == []
+    assert alerts.evaluate(loss(89)) == []
+    assert len(alerts.evaluate(loss(101))) == 1
+    assert [alert.rule for alert in received] == ['daily_loss', 'daily_loss']
+
+
+def test_cooldown_delays_instead_of_dropping(clock, received):
+    alerts = engine([DailyLossRule(100)], clock, received, cooldown=600)
+
+    assert len(alerts.evaluate(loss(120))) == 1
+    alerts.evaluate(loss(50))  # rückgestellt
+    clock.now = 300
+    assert alerts.evaluate(loss(120)) == []
+    assert alerts.suppressed == 1
+    # Nach dem Cooldown nachgeholt, solange die Schwelle überschritten ist
+    clock.now = 601
+    assert len(alerts.evaluate(loss(120))) == 1
+    assert len(received) == 2
+
+
+def test_cooldown_skips_cleared_alert(clock, received):
+    alerts = engine([DailyLossRule(100)], clock, received, cooldown=600)
+
+    alerts.evaluate(loss(120))
+    alerts.evaluate(loss(50))
+    clock.now = 300
+    alerts.evaluate(loss(120))
+    clock.now = 601
+    assert alerts.evaluate(loss(50)) == []
+    assert len(received) == 1
+
+
+def test_max_per_hour(clock, received):
+    rules = [ExposureRule(f"SYM{i}", 1.0) for i in range(5)]
+    alerts = engine(rules, clock, received, cooldown=0, max_per_hour=3)
+    state = AlertState(datetime(2024, 1, 1), snapshot(), 0.0, None, None)
+    state.exposure.symbols.update({f"SYM{i}": SymbolExposure(f"SYM{i}", 1, long_lots=2.0)
+                                   for i in range(5)})
+
+    assert len(alerts.evaluate(state)) == 3
+    clock.now = 1800
+    assert alerts.evaluate(state) == []
+    # Zurückgehaltene Regeln kommen nach Ablauf der Stunde
+    clock.now = 3600
+    assert len(alerts.evaluate(state)) == 2
+    assert len({alert.rule for alert in received}) == 5
+
+
+def test_equity_peak_survives_restart(clock, received):
+    alerts = engine([DrawdownRule(10)], clock, received, equity_peak=10_000.0)
+
+    sent = alerts.on_sync(snapshot({'1': {'equity': 8_500.0}}), 0.0)
+
+    assert len(sent) == 1
+    assert sent[0].value == pytest.approx(15.0)
+    assert alerts.equity_peak == 10_000.0
+
+
+
+def test_rule_must_implement_value_and_message():
+    class Incomplete(AlertRule):
+        def value(self, state):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        AlertRule("base", 1.0)
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", 1.0)
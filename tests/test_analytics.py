@@ -0,0 +1,93 @@
+"""Performance-Kennzahlen gegen einfache Schleifen"""
+
+import math
+
+import numpy as np
+import pytest
+
+from drx_analytics import (DAY_SECONDS, TradeArrays, compute_performance, daily_returns,
+                           drawdown, load_closed_trades, streaks)
+
+
+def arrays_from(net, close_time=None):
+    net = np.asarray(net, dtype=np.float64)
+    if close_time is None:
+        close_time = 1_700_000_000 + np.arange(len(net)) * 3600
+    zeros = np.zeros(len(net))
+    return TradeArrays(net, zeros, zeros, np.asarray(close_time, dtype=np.int64))
+
+
+def test_drawdown_against_loop():
+    rng = np.random.default_rng(3)
+    net = rng.normal(1, 20, 500)
+    close_time = 1_700_000_000 + np.cumsum(rng.integers(60, 86400, 500))
+
+    max_dd, max_dd_pct, duration = drawdown(net, close_time, 1000.0)
+
+    equity, peak, peak_time = 1000.0, 1000.0, close_time[0]
+    exp_dd = exp_pct = exp_duration = 0.0
+    for value, t in zip(net, close_time):
+        equity += value
+        if equity >= peak:
+            peak, peak_time = equity, t
+        exp_dd = max(exp_dd, peak - equity)
+        exp_pct = max(exp_pct, (peak - equity) / peak * 100)
+        exp_duration = max(exp_duration, t - peak_time)
+    assert max_dd == pytest.approx(exp_dd)
+    assert max_dd_pct == pytest.approx(exp_pct)
+    assert duration == exp_duration
+
+
+def test_streaks():
+    assert streaks(np.array([1, 2, -1, -1, -1, 3, 0, 4, 5])) == (2, 3)
+    assert streaks(np.array([])) == (0, 0)
+    assert streaks(np.array([-1.0])) == (0, 1)
+
+
+def test_daily_returns_fill_weekdays():
+    # Montag und Mittwoch mit Trades, Dienstag ohne, Samstag mit Trade
+    monday = 1_704_067_200  # 2024-01-01
+    close_time = np.array([monday, monday + 2 * DAY_SECONDS, monday + 5 * DAY_SECONDS])
+    net = np.array([10.0, -5.0, 3.0])
+
+    assert daily_returns(net, close_time).tolist() == [10.0, 0.0, -5.0, 0.0, 0.0, 3.0]
+    returns = daily_returns(net, close_time, 100.0)
+    assert returns[:3] == pytest.approx([0.1, 0.0, -5 / 110])
+
+
+def test_compute_performance():
+    stats = compute_performance(arrays_from([10, -5, 20, -10, 5]), 1000.0)
+
+    assert (stats.trades, stats.wins, stats.losses) == (5, 3, 2)
+    assert stats.win_rate == pytest.approx(60.0)
+    assert stats.net_pnl == pytest.approx(20.0)
+    assert stats.profit_factor == pytest.approx(35 / 15)
+    assert stats.expectancy == pytest.approx(4.0)
+    assert (stats.avg_win, stats.avg_loss) == (pytest.approx(35 / 3), pytest.approx(-7.5))
+    assert stats.max_drawdown == pytest.approx(10.0)
+    assert stats.max_drawdown_pct == pytest.approx(10 / 1025 * 100)
+    assert stats.sharpe is not None and stats.sortino is not None
+
+
+def test_ratios_need_starting_balance():
+    stats = compute_performance(arrays_from([10, -5, 20]))
+
+    assert stats.max_drawdown == pytest.approx(5.0)
+    assert stats.max_drawdown_pct is None
+    assert stats.sharpe is None and stats.sortino is None
+
+
+def test_profit_factor_without_losses():
+    assert math.isinf(compute_performance(arrays_from([1, 2])).profit_factor)
+    assert compute_performance(arrays_from([])).trades == 0
+
+
+def test_load_closed_trades(db, make_trade):
+    db.save_trades([make_trade(i, hours=10 - i, profit=float(i)) for i in range(5)]).result()
+    db.save_trade(make_trade("open", status="open")).result()
+
+    arrays = load_closed_trades(db)
+
+    # Nach close_time sortiert, Netto inkl. Kommission
+    assert arrays.net.tolist() == [3.5, 2.5, 1.5, 0.5, -0.5]
+    assert np.all(np.diff(arrays.close_time) > 0)
@@ -0,0 +1,135 @@
+"""Jahres-Archive: Verschieben, Abfragen über trades_all, Änderungs-Log"""
+
+import sqlite3
+import stat
+from datetime import datetime, timedelta
+
+from drx_core import DatabaseManager, TradeFilter
+
+
+def closed_at(make_trade, trade_id, when, profit=10.0):
+    return make_trade(trade_id, profit=profit, open_time=when - timedelta(hours=1), close_time=when)
+
+
+def main_ids(db):
+    conn = sqlite3.connect(db.db_file)
+    try:
+        return sorted(row[0] for row in conn.execute("SELECT id FROM trades"))
+    finally:
+        conn.close()
+
+
+def test_round_trip(db, make_trade):
+    trades = [closed_at(make_trade, f"a{i}", datetime(2021, 3, 1) + timedelta(days=i)) for i in range(3)]
+    trades += [closed_at(make_trade, f"b{i}", datetime(2022, 6, 1) + timedelta(days=i)) for i in range(2)]
+    trades += [make_trade("open", status="open", open_time=datetime(2021, 5, 1))]
+    db.save_trades(trades).result()
+    before = sorted(t.id for t in db.iter_trades())
+
+    moved = db.archive_trades(datetime(2023, 1, 1))
+
+    assert moved == {2021: 3, 2022: 2}
+    assert [year for year, _ in db.archive_files()] == [2021, 2022]
+    # Offene Trades bleiben unabhängig vom Alter in trades
+    assert main_ids(db) == ["open"]
+
+    # Abfragen sehen archivierte Trades unverändert
+    assert sorted(t.id for t in db.iter_trades()) == before
+    assert db.count_trades() == 6
+    assert db.count_trades(TradeFilter(close_to=datetime(2022, 1, 1))) == 3
+    archived = {t.id: t for t in db.iter_trades(TradeFilter(status="closed"))}
+    assert archived["b1"] == trades[4]
+
+
+def test_rerun_is_idempotent(db, make_trade):
+    db.save_trades([closed_at(make_trade, i, datetime(2021, 3, 1) + timedelta(days=i))
+                    for i in range(4)]).result()
+    db.archive_trades(datetime(2021, 6, 1))
+    version = db.get_generation()
+
+    assert db.archive_trades(datetime(2021, 6, 1)) == {2021: 0}
+    assert db.count_trades() == 4
+    assert db.changes_since(version).changes == []
+
+
+def test_change_log_marks_archive(db, make_trade):
+    db.save_trades([closed_at(make_trade, i, datetime(2021, 3, 1) + timedelta(days=i))
+                    for i in range(3)]).result()
+    version = db.get_generation()
+
+    db.archive_trades(datetime(2022, 1, 1))
+    changes = db.changes_since(version)
+
+    assert changes.complete
+    assert sorted(changes.archived_ids()) == ["0", "1", "2"]
+    assert changes.deleted_ids() == []
+    # Kein Hilfseintrag in db_meta
+    conn = sqlite3.connect(db.db_file)
+    keys = {row[0] for row in conn.execute("SELECT key FROM db_meta")}
+    conn.close()
+    assert "archiving" not in keys
+
+
+def test_newest_trade_can_be_archived(db, make_trade):
+    db.save_trades([closed_at(make_trade, i, datetime(2021, 3, 1) + timedelta(days=i))
+                    for i in range(3)]).result()
+
+    assert db.archive_trades(datetime(2022, 1, 1)) == {2021: 3}
+    assert main_ids(db) == []
+
+    # Neue Trades (rowid wird wieder vergeben) sind über das Log sichtbar
+    version = db.get_generation()
+    db.save_trade(make_trade("new", hours=24 * 900)).result()
+    assert db.changes_since(version).changed_ids() == ["new"]
+    assert db.count_trades() == 4
+
+
+def test_full_year_is_sealed(db, make_trade):
+    db.save_trades([closed_at(make_trade, "old", datetime(2020, 5, 1)),
+                    closed_at(make_trade, "mid", datetime(2021, 5, 1))]).result()
+
+    db.archive_trades(datetime(2021, 1, 1), compress=True)
+    files = dict(db.archive_files())
+    assert files[2020].name.endswith(".db.gz")
+    assert not files[2020].stat().st_mode & stat.S_IWUSR
+
+    # Später geschlossener Trade eines abgeschlossenen Jahres bleibt in trades
+    db.save_trade(closed_at(make_trade, "late", datetime(2020, 12, 30))).result()
+    assert db.archive_trades(datetime(2022, 1, 1)) == {2021: 1}
+    assert main_ids(db) == ["late"]
+    assert sorted(t.id for t in db.iter_trades()) == ["late", "mid", "old"]
+
+
+def test_migrate_archiving_trigger(tmp_path, make_trade):
+    path = tmp_path / "drx_trades.db"
+    DatabaseManager(str(path)).close()
+
+    # Stand von Version 5: Lösch-Trigger prüft einen 'archiving'-Eintrag
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        DROP TRIGGER trades_change_delete;
+        CREATE TRIGGER trades_change_delete AFTER DELETE ON trades BEGIN
+            UPDATE db_meta SET value = value + 1 WHERE key = 'trades_generation';
+            INSERT INTO trade_changes (trade_id, op, version)
+            VALUES (OLD.id, CASE WHEN EXISTS (SELECT 1 FROM db_meta WHERE key = 'archiving')
+                                 THEN 'archive' ELSE 'delete' END,
+                    (SELECT value FROM db_meta WHERE key = 'trades_generation'));
+        END;
+        INSERT INTO db_meta (key, value) VALUES ('archiving', 1);
+        UPDATE db_meta SET value = 5 WHERE key = 'schema_version';
+    ''')
+    conn.close()
+
+    db = DatabaseManager(str(path))
+    try:
+        db.save_trade(make_trade("x")).result()
+        version = db.get_generation()
+        db.writer.submit(lambda cursor: cursor.execute("DELETE FROM trades WHERE id = 'x'")).result()
+
+        assert db.changes_since(version).deleted_ids() == ["x"]
+        conn = sqlite3.connect(path)
+        keys = {row[0] for row in conn.execute("SELECT key FROM db_meta")}
+        conn.close()
+        assert "archiving" not in keys
+    finally:
+        db.close()
@@ -0,0 +1,117 @@
+"""GFS-Aufbewahrung und inkrementeller Seiten-Speicher"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from drx_backup import PageStore, expired_backups
+
+
+def kept(times, **retention):
+    expired = set(expired_backups(times, **retention))
+    return [t for i, t in enumerate(times) if i not in expired]
+
+
+def test_expired_backups_keeps_last():
+    times = [datetime(2024, 1, 1, 12) + timedelta(minutes=i) for i in range(15)]
+    assert kept(times, keep_last=3, keep_daily=0, keep_weekly=0) == times[-3:]
+
+
+def test_expired_backups_daily_and_weekly():
+    # Stündliche Backups über 30 Tage, Eingabe unsortiert
+    times = [datetime(2024, 3, 1) + timedelta(hours=h) for h in range(30 * 24)][::-1]
+
+    result = kept(times, keep_last=2, keep_daily=3, keep_weekly=2)
+
+    days = sorted({t.date() for t in result})
+    # Letzte 2 (30.), Tage 29. und 28., Vorwoche endet am Sonntag 24.
+    assert [d.day for d in days] == [24, 28, 29, 30]
+    assert len(result) == 5
+    # Je Tag das neueste Backup
+    assert all(max(t for t in times if t.date() == d) in result for d in days)
+
+
+def test_expired_backups_nothing_to_expire():
+    times = [datetime(2024, 1, day) for day in range(1, 4)]
+    assert expired_backups(times) == []
+    assert expired_backups([]) == []
+
+
+def write_db(path, rows, start=0):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY, data TEXT)")
+    conn.executemany("INSERT OR REPLACE INTO t VALUES (?, ?)",
+                     [(i, f"row {i} " * 20) for i in range(start, start + rows)])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PageStore(str(tmp_path / "pages.db"))
+
+
+def test_page_store_round_trip(tmp_path, store):
+    source = tmp_path / "source.db"
+    contents = []
+    ids = []
+    for step in range(3):
+        write_db(source, 500, start=step * 200)
+        contents.append(source.read_bytes())
+        ids.append(store.add(str(source))[0])
+
+    for snapshot_id, content in zip(ids, contents):
+        restored = tmp_path / f"restored_{snapshot_id}.db"
+        store.restore(snapshot_id, str(restored))
+        assert restored.read_bytes() == content
+
+
+def test_page_store_stores_only_changed_pages(tmp_path, store):
+    source = tmp_path / "source.db"
+    write_db(source, 2000)
+    _, pages, new_pages, _ = store.add(str(source))
+    assert new_pages == pages
+
+    _, pages, new_pages, _ = store.add(str(source))
+    assert new_pages == 0
+
+    write_db(source, 1, start=1999)
+    _, pages, new_pages, _ = store.add(str(source))
+    assert 0 < new_pages < pages
+
+
+def test_page_store_delete(tmp_path, store):
+    source = tmp_path / "source.db"
+    contents = {}
+    for step in range(4):
+        write_db(source, 300, start=step * 100)
+        contents[store.add(str(source))[0]] = source.read_bytes()
+    first, second, third, fourth = sorted(contents)
+
+    # Nachfolger erben die noch gebrauchten Seiten
+    store.delete([first, third])
+
+    assert [row[0] for row in store.snapshots()] == [second, fourth]
+    for snapshot_id in (second, fourth):
+        restored = tmp_path / "restored.db"
+        store.restore(snapshot_id, str(restored))
+        assert restored.read_bytes() == contents[snapshot_id]
+    with pytest.raises(ValueError):
+        store.restore(first, str(tmp_path / "missing.db"))
+
+
+def test_page_store_delete_removes_unreferenced_pages(tmp_path, store):
+    source = tmp_path / "source.db"
+    write_db(source, 300)
+    old = store.add(str(source))[0]
+    write_db(source, 300, start=1000)
+    latest = store.add(str(source))[0]
+
+    # Vom Nachfolger überschriebene Seiten werden frei, der Rest geht auf ihn über
+    assert store.delete([old]) > 0
+    store.restore(latest, str(tmp_path / "restored.db"))
+    assert (tmp_path / "restored.db").read_bytes() == source.read_bytes()
+
+    assert store.delete([latest]) > 0
+    assert store.snapshots() == []
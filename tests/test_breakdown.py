@@ -0,0 +1,86 @@
+"""Aufschlüsselung per SQL gegen Python-Gruppierung"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def expected(trades, key):
+    groups = defaultdict(list)
+    for trade in trades:
+        if trade.status == 'closed':
+            groups[key(trade)].append(trade.profit + trade.commission + trade.swap)
+    result = {}
+    for group, nets in groups.items():
+        wins = sum(net for net in nets if net > 0)
+        losses = -sum(net for net in nets if net < 0)
+        result[group] = {
+            'trades': len(nets),
+            'wins': sum(net > 0 for net in nets),
+            'net_pnl': sum(nets),
+            'profit_factor': wins / losses if losses else 0.0,
+        }
+    return result
+
+
+def assert_breakdown(rows, trades, key):
+    actual = {row['group']: row for row in rows}
+    wanted = expected(trades, key)
+    assert set(actual) == set(wanted)
+    for group, values in wanted.items():
+        for field, value in values.items():
+            assert actual[group][field] == pytest.approx(value), (group, field)
+        row = actual[group]
+        assert row['expectancy'] == pytest.approx(row['net_pnl'] / row['trades'])
+
+
+@pytest.fixture
+def trades(db, make_trade):
+    symbols = ["EURUSD", "GBPUSD", "XAUUSD"]
+    items = [make_trade(i, symbol=symbols[i % 3], hours=i * 5, profit=float((i * 7) % 11 - 5),
+                        magic=i % 4) for i in range(80)]
+    items.append(make_trade("open", symbol="US30", status="open"))
+    db.save_trades(items).result()
+    return items
+
+
+@pytest.mark.parametrize("dimension, key", [
+    ('symbol', lambda t: t.symbol),
+    ('magic', lambda t: t.magic),
+    ('hour', lambda t: t.open_time.hour),
+    ('weekday', lambda t: int(t.open_time.strftime('%w'))),
+])
+def test_breakdown(db, trades, dimension, key):
+    assert_breakdown(db.get_breakdown(dimension), trades, key)
+
+
+def test_breakdown_follows_changes(db, trades, make_trade):
+    first = db.get_breakdown('symbol')
+    extra = make_trade("extra", symbol="EURUSD", profit=100.0)
+    db.save_trade(extra).result()
+
+    second = db.get_breakdown('symbol')
+    assert second is not first
+    assert_breakdown(second, trades + [extra], lambda t: t.symbol)
+    assert db.get_breakdown('symbol') is second  # unverändert: aus dem Cache
+
+
+def test_breakdown_includes_archives(db, trades, make_trade):
+    old = [make_trade(f"old{i}", symbol="EURUSD", open_time=datetime(2021, 6, 1) + timedelta(days=i),
+                      close_time=datetime(2021, 6, 1, 12) + timedelta(days=i), profit=float(i - 4))
+           for i in range(10)]
+    db.save_trades(old).result()
+    db.save_trade(make_trade("last", symbol="GBPUSD", hours=2000)).result()
+    everything = trades + old + [make_trade("last", symbol="GBPUSD", hours=2000)]
+
+    db.archive_trades(datetime(2022, 1, 1))
+
+    assert db.archive_files()
+    assert_breakdown(db.get_breakdown('symbol'), everything, lambda t: t.symbol)
+    assert_breakdown(db.get_breakdown('magic'), everything, lambda t: t.magic)
+
+
+def test_unknown_dimension(db):
+    with pytest.raises(ValueError):
+        db.get_breakdown('broker')
@@ -0,0 +1,77 @@
+"""Generation und Änderungs-Log (changes_since)"""
+
+from datetime import datetime, timedelta
+
+
+def test_insert_update_delete(db, make_trade):
+    start = db.get_generation()
+    db.save_trades([make_trade(i) for i in range(3)]).result()
+    after_insert = db.changes_since(start)
+
+    assert after_insert.complete
+    assert sorted(after_insert.changed_ids()) == ["0", "1", "2"]
+    assert after_insert.version == db.get_generation() > start
+
+    db.save_trade(make_trade(1, profit=-3.0)).result()
+    db.writer.submit(lambda cursor: cursor.execute("DELETE FROM trades WHERE id = '2'")).result()
+    changes = db.changes_since(after_insert.version)
+
+    assert changes.changed_ids() == ["1"]
+    assert changes.deleted_ids() == ["2"]
+    assert changes.archived_ids() == []
+    # Über den ganzen Zeitraum: 2 zuletzt gelöscht
+    assert db.changes_since(start).latest() == {"0": "insert", "1": "insert", "2": "delete"}
+
+
+def test_unchanged_trade_is_not_logged(db, make_trade):
+    db.save_trade(make_trade("a")).result()
+    version = db.get_generation()
+
+    db.save_trade(make_trade("a")).result()
+
+    changes = db.changes_since(version)
+    assert changes.complete and changes.changes == []
+    assert db.get_generation() == version
+
+
+def test_rowversion_follows_generation(db, make_trade):
+    db.save_trade(make_trade("a")).result()
+    db.save_trade(make_trade("b")).result()
+    conn = db._connect()
+    try:
+        versions = dict(conn.execute("SELECT id, rowversion FROM trades"))
+    finally:
+        conn.close()
+    assert versions["a"] < versions["b"] == db.get_generation()
+
+
+def test_up_to_date_and_pruned_log(db, make_trade):
+    db.save_trades([make_trade(i) for i in range(10)]).result()
+    current = db.get_generation()
+
+    assert db.changes_since(current).complete
+    assert db.changes_since(current).changes == []
+
+    db.prune_changes(keep=3).result()
+    # Log reicht nicht mehr zurück: Konsument muss komplett neu laden
+    assert not db.changes_since(0).complete
+    assert db.changes_since(current - 3).complete
+
+
+def test_archive_is_not_a_delete(db, make_trade):
+    times = [datetime(2021, 4, 1) + timedelta(days=i) for i in range(5)]
+    db.save_trades([make_trade(f"old{i}", open_time=t, close_time=t + timedelta(hours=1))
+                    for i, t in enumerate(times)]).result()
+    db.save_trade(make_trade("recent", hours=24 * 400)).result()
+    version = db.get_generation()
+
+    db.archive_trades(datetime(2022, 1, 1))
+    changes = db.changes_since(version)
+
+    assert sorted(changes.archived_ids()) == [f"old{i}" for i in range(5)]
+    assert changes.deleted_ids() == [] and changes.changed_ids() == []
+    assert changes.version == db.get_generation()
+
+    # Spätere echte Löschungen bleiben Löschungen
+    db.writer.submit(lambda cursor: cursor.execute("DELETE FROM trades WHERE id = 'recent'")).result()
+    assert db.changes_since(changes.version).deleted_ids() == ["recent"]
@@ -0,0 +1,84 @@
+"""daily_pnl-Rollup gegen Neuberechnung aus trades (und Archiven)"""
+
+from datetime import datetime, timedelta
+
+
+def delete_trade(db, trade_id):
+    db.writer.submit(lambda cursor: cursor.execute("DELETE FROM trades WHERE id = ?",
+                                                   (trade_id,))).result()
+
+
+def test_rollup_after_insert(db, make_trade):
+    db.save_trades([make_trade(i, hours=i * 5, profit=i - 10) for i in range(40)]).result()
+    db.save_trade(make_trade("open", status="open")).result()
+
+    assert db.check_daily_pnl() == []
+    total = sum(pnl for _, pnl, _, _ in db.get_daily_pnl('day'))
+    assert abs(total - sum(i - 10 - 0.5 for i in range(40))) < 1e-6
+
+
+def test_rollup_after_update(db, make_trade):
+    db.save_trades([make_trade(i, hours=i * 5) for i in range(10)]).result()
+
+    # Ergebnis, Tag und Symbol ändern sich; offener Trade wird geschlossen
+    db.save_trade(make_trade(3, hours=100, profit=-50.0, symbol="GBPUSD")).result()
+    db.save_trade(make_trade("late", status="open")).result()
+    db.save_trade(make_trade("late", hours=30, profit=7.0)).result()
+
+    assert db.check_daily_pnl() == []
+
+
+def test_rollup_after_delete(db, make_trade):
+    db.save_trades([make_trade(i, hours=i) for i in range(10)]).result()
+
+    delete_trade(db, "4")
+    delete_trade(db, "5")
+
+    assert db.check_daily_pnl() == []
+    assert sum(count for _, _, count, _ in db.get_daily_pnl('day')) == 8
+
+
+def test_rollup_after_archive(db, make_trade):
+    times = [datetime(2021, 3, 1) + timedelta(hours=i * 30) for i in range(60)]
+    db.save_trades([make_trade(i, open_time=t, close_time=t + timedelta(hours=1),
+                               profit=float(i % 7 - 3)) for i, t in enumerate(times)]).result()
+    db.save_trade(make_trade("recent", hours=24 * 400)).result()
+    before = db.get_daily_pnl('day')
+    version = db.get_generation()
+
+    moved = db.archive_trades(datetime(2022, 1, 1))
+
+    assert sum(moved.values()) > 0
+    assert db.check_daily_pnl() == []
+    assert db.get_daily_pnl('day') == before
+    # Archivierte Trades sind weder geändert noch gelöscht
+    changes = db.changes_since(version)
+    assert len(changes.archived_ids()) == sum(moved.values())
+    assert changes.deleted_ids() == []
+    assert changes.changed_ids() == []
+
+
+def test_rebuild_daily_pnl(db, make_trade):
+    db.save_trades([make_trade(i, hours=i * 7, profit=i * 1.5) for i in range(30)]).result()
+    db.writer.submit(lambda cursor: cursor.execute("UPDATE daily_pnl SET gross = gross + 1")).result()
+    db.writer.submit(lambda cursor: cursor.execute(
+        "DELETE FROM daily_pnl WHERE rowid = (SELECT MIN(rowid) FROM daily_pnl)")).result()
+    assert db.check_daily_pnl() != []
+
+    db.rebuild_daily_pnl().result()
+
+    assert db.check_daily_pnl() == []
+
+
+def test_rebuild_daily_pnl_keeps_archived_days(db, make_trade):
+    times = [datetime(2021, 5, 1) + timedelta(days=i) for i in range(20)]
+    db.save_trades([make_trade(i, open_time=t, close_time=t + timedelta(hours=12))
+                    for i, t in enumerate(times)]).result()
+    db.save_trade(make_trade("recent", hours=24 * 400)).result()
+    db.archive_trades(datetime(2022, 1, 1))
+    before = db.get_daily_pnl('day')
+
+    db.rebuild_daily_pnl().result()
+
+    assert db.get_daily_pnl('day') == before
+    assert db.check_daily_pnl() == []
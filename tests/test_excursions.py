@@ -0,0 +1,98 @@
+"""MAE/MFE: vektorisierte Berechnung gegen eine Schleife je Trade"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import drx_excursions
+from drx_excursions import ExcursionAnalyzer, compute_excursions
+from drx_market_data import BAR_DTYPE, KIND_M1, to_epoch
+
+
+def reference(times, high, low, direction, open_price, close_price, open_time, close_time, window):
+    """Ein Trade nach dem anderen - dieselben Definitionen wie compute_excursions"""
+    rows = []
+    for d, op, cp, ot, ct in zip(direction, open_price, close_price, open_time, close_time):
+        inside = (times >= ot) & (times <= ct)
+        after = (times > ct) & (times <= ct + window)
+        mae = mfe = hit = left = np.nan
+        if inside.any():
+            favorable = high[inside] - op if d > 0 else op - low[inside]
+            adverse = op - low[inside] if d > 0 else high[inside] - op
+            mfe = max(favorable.max(), 0)
+            mae = max(adverse.max(), 0)
+            hit = times[inside][np.argmax(favorable == favorable.max())] - ot
+        if after.any():
+            left = max(high[after].max() - cp if d > 0 else cp - low[after].min(), 0)
+        rows.append((mae, mfe, hit, left))
+    return np.array(rows)
+
+
+@pytest.mark.parametrize("chunk_points", [5_000_000, 50])
+def test_matches_reference(monkeypatch, chunk_points):
+    monkeypatch.setattr(drx_excursions, "CHUNK_POINTS", chunk_points)
+    rng = np.random.default_rng(7)
+    times = np.arange(0, 600 * 60, 60, dtype=np.float64)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, len(times)))
+    high = close + rng.uniform(0, 0.0004, len(times))
+    low = close - rng.uniform(0, 0.0004, len(times))
+
+    n = 40
+    open_time = rng.uniform(-3000, times[-1], n).round()
+    close_time = open_time + rng.uniform(0, 6000, n).round()
+    direction = rng.choice([-1, 1], n)
+    open_price = np.interp(open_time, times, close)
+    close_price = np.interp(close_time, times, close)
+
+    result = compute_excursions(times, high, low, high, low, direction, open_price, close_price,
+                                open_time, close_time, post_exit_window=1800)
+    expected = reference(times, high, low, direction, open_price, close_price,
+                         open_time, close_time, 1800)
+
+    for column, key in enumerate(('mae', 'mfe', 'time_to_mfe', 'left_on_table')):
+        np.testing.assert_allclose(result[key], expected[:, column], equal_nan=True, err_msg=key)
+
+
+class BarStore:
+    """Statt MarketDataStore: feste M1-Bars"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.requests = 0
+
+    def get_bars(self, symbol, start, end):
+        self.requests += 1
+        return self.bars[(self.bars['time'] >= start) & (self.bars['time'] < end)]
+
+
+def test_analyzer_saves_only_new_trades(db, make_trade):
+    start = datetime(2023, 1, 2, 9, 0)
+    base = to_epoch(start)
+    bars = np.zeros(24 * 60, dtype=BAR_DTYPE)
+    bars['time'] = base + np.arange(len(bars)) * 60
+    bars['high'] = 1.1 + np.arange(len(bars)) * 1e-5
+    bars['low'] = bars['high'] - 0.0002
+    store = BarStore(bars)
+
+    db.save_trades([
+        make_trade("buy", hours=1, open_price=1.1, close_price=1.101),
+        make_trade("sell", hours=2, type="sell", open_price=1.101, close_price=1.102),
+        # Ohne Preisdaten: bleibt offen für einen späteren Versuch
+        make_trade("nodata", hours=48),
+    ]).result()
+
+    analyzer = ExcursionAnalyzer(db, store, KIND_M1, post_exit_window=600)
+    assert analyzer.update() == 2
+    db.flush()
+
+    excursions = db.get_excursions()
+    assert set(excursions) == {"buy", "sell"}
+    # Steigender Markt: Buy mit MFE nach einer Stunde, Sell ohne günstige Bewegung
+    buy = excursions["buy"]
+    assert buy['mfe'] == pytest.approx(1.1 + 120 * 1e-5 - 1.1)
+    assert buy['time_to_mfe'] == 3600
+    assert excursions["sell"]['mfe'] == pytest.approx(0.0, abs=1e-9)
+    assert buy['source'] == KIND_M1
+
+    assert [row[0] for row in db.get_trades_without_excursions()] == ["nodata"]
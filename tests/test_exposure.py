@@ -0,0 +1,132 @@
+"""ExposureEngine: nachgeführte Summen gegen Neuberechnung"""
+
+import random
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from drx_core import SymbolCache, SymbolInfo, Trade
+from drx_exposure import ExposureEngine
+
+INFOS = {
+    "EURUSD": SymbolInfo("EURUSD", currency_base="EUR", currency_profit="USD", currency_margin="EUR"),
+    "USDJPY": SymbolInfo("USDJPY", digits=3, currency_base="USD", currency_profit="JPY",
+                         currency_margin="USD"),
+    "XAUUSD": SymbolInfo("XAUUSD", digits=2, contract_size=100.0, currency_base="XAU",
+                         currency_profit="USD", currency_margin="USD"),
+    "US500": SymbolInfo("US500", digits=1, contract_size=1.0, currency_base="USD",
+                        currency_profit="USD", currency_margin="USD"),
+}
+START = datetime(2023, 1, 2, 9)
+
+
+@pytest.fixture
+def symbols(db):
+    cache = SymbolCache(db)
+    cache.infos = dict(INFOS)
+    return cache
+
+
+def position(trade_id, symbol="EURUSD", side="buy", lots=1.0, price=1.1, profit=0.0, hours=0):
+    return Trade(id=str(trade_id), symbol=symbol, type=side, lots=lots, open_price=price,
+                 profit=profit, open_time=START + timedelta(hours=hours), status='open')
+
+
+def assert_matches(snapshot, check):
+    assert snapshot.positions == check.positions
+    assert snapshot.unrealized == pytest.approx(check.unrealized, abs=1e-6)
+    assert snapshot.unknown_symbols == check.unknown_symbols
+    assert snapshot.oldest == check.oldest
+    assert snapshot.symbols.keys() == check.symbols.keys()
+    for symbol, entry in check.symbols.items():
+        ours = snapshot.symbols[symbol]
+        assert ours.positions == entry.positions
+        assert ours.net_lots == pytest.approx(entry.net_lots, abs=1e-9)
+        assert ours.unrealized == pytest.approx(entry.unrealized, abs=1e-6)
+        assert ours.margin == pytest.approx(entry.margin, rel=1e-9)
+    for totals, expected in ((snapshot.currencies, check.currencies), (snapshot.margin, check.margin)):
+        assert totals.keys() == expected.keys()
+        for key, value in expected.items():
+            assert totals[key] == pytest.approx(value, rel=1e-9, abs=1e-6)
+
+
+def test_forex_and_cfd_exposure(symbols):
+    engine = ExposureEngine(symbols)
+    engine.set_account("1", {'leverage': 50})
+    engine.update("1", [position(1, lots=2.0, price=1.1),
+                        position(2, "US500", "sell", lots=3.0, price=4000.0, profit=-5.0)])
+
+    snapshot = engine.snapshot()
+
+    # EURUSD long: +EUR, -USD zum Einstiegskurs; US500 short: Nominalwert in USD
+    assert snapshot.currencies["EUR"] == pytest.approx(200_000.0)
+    assert snapshot.currencies["USD"] == pytest.approx(-220_000.0 - 12_000.0)
+    assert snapshot.margin == pytest.approx({"EUR": 4_000.0, "USD": 240.0})
+    assert snapshot.symbols["US500"].net_lots == -3.0
+    assert snapshot.unrealized == -5.0
+
+
+def test_random_syncs_match_recompute(symbols):
+    rng = random.Random(7)
+    engine = ExposureEngine(symbols)
+    names = list(INFOS) + ["BTCUSD"]  # BTCUSD ohne Metadaten
+    books = {"1": {}, "2": {}}
+    next_id = 0
+
+    for step in range(200):
+        account = rng.choice(list(books))
+        book = books[account]
+        action = rng.random()
+        if action < 0.4 or not book:
+            trade = position(next_id, rng.choice(names), rng.choice(("buy", "sell")),
+                             rng.choice((0.01, 0.1, 1.0)), 1.0 + rng.random(), hours=rng.randrange(500))
+            book[trade.id] = trade
+            next_id += 1
+        elif action < 0.6:
+            del book[rng.choice(list(book))]
+        elif action < 0.7:
+            key = rng.choice(list(book))
+            book[key] = replace(book[key], lots=book[key].lots * 2)
+        else:
+            # Nur Kursbewegung
+            for key, trade in book.items():
+                book[key] = replace(trade, profit=trade.profit + rng.gauss(0, 10))
+        if step % 50 == 25:
+            engine.set_account(account, {'leverage': rng.choice((30, 100, 500))})
+
+        engine.update(account, list(book.values()))
+        assert_matches(engine.snapshot(), engine.recompute())
+
+    assert engine.snapshot().unknown_symbols == ["BTCUSD"]
+
+
+def test_symbol_info_arrives_later(symbols):
+    engine = ExposureEngine(symbols)
+    engine.update("1", [position(1, "BTCUSD", price=30_000.0)])
+    assert engine.snapshot().unknown_symbols == ["BTCUSD"]
+    assert engine.snapshot().currencies == {}
+
+    symbols.infos["BTCUSD"] = SymbolInfo("BTCUSD", contract_size=1.0, currency_base="BTC",
+                                         currency_profit="USD", currency_margin="USD")
+    assert engine.update("1", [position(1, "BTCUSD", price=30_000.0)]) == 1
+
+    snapshot = engine.snapshot()
+    assert snapshot.unknown_symbols == []
+    assert snapshot.currencies == pytest.approx({"BTC": 1.0, "USD": -30_000.0})
+    assert_matches(snapshot, engine.recompute())
+
+
+def test_closing_everything_leaves_no_residue(symbols):
+    engine = ExposureEngine(symbols)
+    engine.update("1", [position(i, profit=0.1 * i, hours=i) for i in range(10)])
+    engine.update("2", [position(10, "XAUUSD", hours=-5)])
+    assert engine.snapshot().oldest == ("10", "XAUUSD", START - timedelta(hours=5))
+
+    engine.remove_account("2")
+    assert engine.snapshot().oldest == ("0", "EURUSD", START)
+    assert engine.update("1", []) == 10
+
+    snapshot = engine.snapshot()
+    assert (snapshot.positions, snapshot.unrealized, snapshot.oldest) == (0, 0.0, None)
+    assert snapshot.symbols == {} and snapshot.currencies == {} and snapshot.margin == {}
@@ -0,0 +1,84 @@
+"""Headless-Sync: ohne GUI-Abhängigkeiten, Passwort nie von der Kommandozeile"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import drx_headless
+from drx_headless import HeadlessSync, SyncScheduler, parse_args, read_password
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_import_without_gui_modules():
+    code = ("import sys, drx_headless; "
+            "print(sorted({'tkinter', 'matplotlib', 'pandas', 'numpy'} & set(sys.modules)))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_no_password_argument():
+    with pytest.raises(SystemExit):
+        parse_args(["--account", "1", "--password", "secret"])
+
+
+def test_password_from_environment(monkeypatch):
+    monkeypatch.setenv("DRX_MT5_PASSWORD", "from-env")
+    monkeypatch.setattr(drx_headless.getpass, "getpass", pytest.fail)
+    assert read_password() == "from-env"
+
+
+@pytest.mark.parametrize("tty, expected", [(True, "typed"), (False, "")])
+def test_password_prompt_only_on_terminal(monkeypatch, tty, expected):
+    monkeypatch.delenv("DRX_MT5_PASSWORD", raising=False)
+    monkeypatch.setattr(drx_headless.sys.stdin, "isatty", lambda: tty, raising=False)
+    monkeypatch.setattr(drx_headless.getpass, "getpass", lambda prompt: "typed")
+    assert read_password() == expected
+
+
+def test_missing_credentials_exit_code(monkeypatch, tmp_path):
+    monkeypatch.delenv("DRX_MT5_PASSWORD", raising=False)
+    monkeypatch.setattr(drx_headless.sys.stdin, "isatty", lambda: False, raising=False)
+    assert drx_headless.main(["--account", "1", "--server", "x", "--once",
+                              "--db", str(tmp_path / "h.db")]) == 2
+
+
+def test_scheduler_survives_errors_and_stops():
+    calls = []
+
+    def job():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            raise RuntimeError("Terminal weg")
+        if len(calls) == 4:
+            scheduler.stop()
+
+    scheduler = SyncScheduler(0.001, job)
+    scheduler.run()
+    assert calls == [0, 1, 2, 3]
+
+
+def test_sync_saves_positions_and_backs_off(monkeypatch, tmp_path, broker, make_trade):
+    broker.trades = [make_trade("p1", status="open"), make_trade("p2", status="open")]
+    broker.account = {'login': 1, 'balance': 1000.0, 'equity': 990.0}
+    monkeypatch.setattr(drx_headless, "MT5Connector", lambda: broker)
+
+    sync = HeadlessSync({'account': '1', 'password': 'x', 'server': 's'}, str(tmp_path / "h.db"))
+    try:
+        sync.sync_once()
+        assert sync.synced_total == 2
+        assert sync.db.count_trades() == 2
+
+        # Verbindungsfehler: nächster Versuch erst nach dem Backoff
+        broker.disconnect()
+        broker.fail_connect = True
+        sync.sync_once()
+        assert sync.reconnect_delay == 2.0
+        broker.fail_connect = False
+        sync.sync_once()
+        assert not broker.connected
+    finally:
+        sync.shutdown()
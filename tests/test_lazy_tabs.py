@@ -0,0 +1,98 @@
+"""Tabs erst beim ersten Anzeigen bauen, nur den sichtbaren aktualisieren"""
+
+import pytest
+
+
+class FakeNotebook:
+    def __init__(self):
+        self.selected = ""
+
+    def select(self):
+        return self.selected
+
+
+class Recorder:
+    """build/refresh eines Tabs protokollieren"""
+
+    def __init__(self, name, log, result=True):
+        self.name = name
+        self.log = log
+        self.result = result
+
+    def build(self, frame):
+        self.log.append(("build", self.name))
+
+    def refresh(self):
+        self.log.append(("refresh", self.name))
+        return self.result
+
+
+@pytest.fixture
+def app(gui):
+    """DRXTradingApp ohne Tk-Fenster: nur Notebook-Auswahl und Tabs"""
+    app = object.__new__(gui.DRXTradingApp)
+    app.notebook = FakeNotebook()
+    app.lazy_tabs = {}
+    app.log = []
+    for name in ("dashboard", "trades"):
+        recorder = Recorder(name, app.log)
+        app.lazy_tabs[name] = gui.LazyTab(f".tab_{name}", recorder.build, recorder.refresh)
+    return app
+
+
+def show(app, name):
+    app.notebook.selected = f".tab_{name}"
+    app.on_tab_changed()
+
+
+def test_nothing_built_before_shown(app):
+    assert not any(tab.built for tab in app.lazy_tabs.values())
+    assert app.log == []
+
+
+def test_build_once_and_refresh_when_dirty(app):
+    show(app, "dashboard")
+    show(app, "trades")
+    show(app, "dashboard")
+
+    assert app.log == [("build", "dashboard"), ("refresh", "dashboard"),
+                       ("build", "trades"), ("refresh", "trades")]
+
+
+def test_hidden_tab_only_marked_dirty(app):
+    show(app, "dashboard")
+    for tab in app.lazy_tabs.values():
+        tab.dirty = True
+    app.refresh_current_tab()
+
+    assert app.log[-1] == ("refresh", "dashboard")
+    assert ("build", "trades") not in app.log
+    assert app.lazy_tabs["trades"].dirty
+
+    show(app, "trades")
+    assert app.log[-2:] == [("build", "trades"), ("refresh", "trades")]
+
+
+def test_incomplete_refresh_stays_dirty(app, gui):
+    recorder = Recorder("breakdown", app.log, result=False)
+    app.lazy_tabs["breakdown"] = gui.LazyTab(".tab_breakdown", recorder.build, recorder.refresh)
+
+    show(app, "breakdown")
+    assert app.lazy_tabs["breakdown"].dirty
+    app.refresh_current_tab()
+    assert app.log.count(("refresh", "breakdown")) == 2
+
+
+def test_account_chart_only_redrawn_when_visible(app):
+    app.update_account_chart = lambda: app.log.append(("chart", "dashboard"))
+    show(app, "dashboard")
+    show(app, "trades")
+
+    app.refresh_account_chart()
+    assert ("chart", "dashboard") not in app.log
+    assert app.lazy_tabs["dashboard"].dirty
+
+    show(app, "dashboard")
+    assert app.log[-1] == ("refresh", "dashboard")
+    app.refresh_account_chart()
+    assert app.log[-1] == ("chart", "dashboard")
@@ -0,0 +1,66 @@
+"""Spalten direkt als NumPy-Arrays (load_columns)"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from drx_core import NAT_SECONDS
+
+# Naive Zeiten gelten in SQLite als UTC
+EPOCH = datetime(1970, 1, 1)
+
+
+def test_types_and_missing_values(db, make_trade):
+    db.save_trade(make_trade("closed", symbol="GBPUSD", profit=5.0, magic=7)).result()
+    db.save_trade(make_trade("open", status="open")).result()
+
+    columns = db.load_columns(['id', 'symbol', 'close_price', 'open_time', 'close_time', 'magic'],
+                              order_by="id")
+
+    assert columns['id'].tolist() == ["closed", "open"]
+    assert columns['symbol'].tolist() == ["GBPUSD", "EURUSD"]
+    assert columns['close_price'].dtype == np.float64 and np.isnan(columns['close_price'][1])
+    assert columns['open_time'][0] == (datetime(2023, 1, 2, 9) - EPOCH).total_seconds()
+    assert columns['close_time'].tolist()[1] == NAT_SECONDS
+    assert columns['magic'].tolist() == [7, 0]
+
+
+def test_where_params_and_dtype(db, make_trade):
+    db.save_trades([make_trade(i, profit=float(i)) for i in range(6)]).result()
+
+    columns = db.load_columns(['profit'], where="profit >= ?", params=(3,),
+                              order_by="profit DESC", dtype={'profit': np.float32})
+
+    assert columns['profit'].dtype == np.float32
+    assert columns['profit'].tolist() == [5.0, 4.0, 3.0]
+    assert db.load_columns(['profit'], where="profit > 100")['profit'].size == 0
+
+
+def test_small_batches(db, make_trade):
+    db.save_trades([make_trade(i, hours=i) for i in range(25)]).result()
+
+    columns = db.load_columns(['id', 'open_time'], order_by="open_time", batch_size=4)
+
+    assert columns['id'].tolist() == [str(i) for i in range(25)]
+    assert np.all(np.diff(columns['open_time']) == 3600)
+
+
+def test_archived_trades_are_included(db, make_trade):
+    db.save_trade(make_trade("old", open_time=datetime(2020, 3, 1),
+                             close_time=datetime(2020, 3, 2))).result()
+    db.save_trade(make_trade("new", hours=24 * 800)).result()
+    db.archive_trades(datetime(2021, 1, 1))
+
+    columns = db.load_columns(['id', 'symbol', 'rowid'], order_by="open_time")
+
+    assert columns['id'].tolist() == ["old", "new"]
+    assert columns['symbol'].tolist() == ["EURUSD", "EURUSD"]
+    # Archivierte Trades haben keine rowid
+    assert columns['rowid'][0] == 0 and columns['rowid'][1] > 0
+
+
+def test_unknown_column(db):
+    with pytest.raises(ValueError):
+        db.load_columns(['pnl'])
+
@@ -0,0 +1,113 @@
+"""Tick/M1-Cache: Lückenfüllung, Abdeckung und Lesen aus den Tagesdateien"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from drx_market_data import BAR_DTYPE, DAY_SECONDS, KIND_M1, KIND_TICKS, MarketDataStore
+
+DAY = int(datetime(2024, 3, 4, tzinfo=timezone.utc).timestamp())
+
+
+class FakeTerminal:
+    """copy_rates_range / copy_ticks_range mit einem Bar je Minute (inklusive Ende wie MT5)"""
+
+    def __init__(self):
+        self.available_from = 0
+        self.fail = False
+        self.calls = 0
+
+    def _range(self, date_from, date_to, step):
+        start, end = int(date_from.timestamp()), int(date_to.timestamp())
+        start = max(start, self.available_from)
+        first = -(-start // step) * step
+        return np.arange(first, end + 1, step, dtype='<i8')
+
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        self.calls += 1
+        if self.fail:
+            return None
+        times = self._range(date_from, date_to, 60)
+        bars = np.zeros(len(times), dtype=BAR_DTYPE)
+        bars['time'] = times
+        bars['close'] = times % 1000
+        return bars
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags):
+        self.calls += 1
+        if self.fail:
+            return None
+        times = self._range(date_from, date_to, 10)
+        ticks = np.zeros(len(times), dtype=[('time', '<i8'), ('bid', '<f8'), ('ask', '<f8')])
+        ticks['time'] = times
+        ticks['bid'] = 1.0
+        ticks['ask'] = 1.1
+        return ticks
+
+
+@pytest.fixture
+def terminal():
+    return FakeTerminal()
+
+
+@pytest.fixture
+def store(tmp_path, terminal):
+    return MarketDataStore(tmp_path / "market_data", terminal)
+
+
+def test_bars_fetched_once(store, terminal):
+    bars = store.get_bars("EURUSD", DAY + 3600, DAY + 2 * DAY_SECONDS)
+
+    assert len(bars) == (2 * DAY_SECONDS - 3600) // 60
+    assert np.all(np.diff(bars['time']) == 60)
+    calls = terminal.calls
+    again = store.get_bars("EURUSD", DAY + 7200, DAY + DAY_SECONDS)
+    assert terminal.calls == calls
+    assert np.array_equal(again, bars[(bars['time'] >= DAY + 7200) & (bars['time'] < DAY + DAY_SECONDS)])
+
+
+def test_only_gaps_are_fetched(store, terminal):
+    store.get_bars("EURUSD", DAY, DAY + 3600)
+    assert store.missing_ranges("EURUSD", KIND_M1, DAY, DAY + 7200) == [(DAY + 3600, DAY + 7200)]
+
+    bars = store.get_bars("EURUSD", DAY, DAY + 7200)
+    assert len(bars) == 120
+    assert store.missing_ranges("EURUSD", KIND_M1, DAY, DAY + 7200) == []
+
+
+def test_ticks_use_milliseconds(store):
+    ticks = store.get_ticks("EURUSD", DAY, DAY + 60)
+    assert ticks['time_msc'].tolist() == [(DAY + s) * 1000 for s in range(0, 60, 10)]
+
+
+def test_empty_result_is_fetched_again(store, terminal):
+    # Historie noch nicht im Terminal: leer, aber kein Fehler
+    terminal.available_from = DAY + DAY_SECONDS
+    assert len(store.get_bars("EURUSD", DAY, DAY + 3600)) == 0
+    assert store.missing_ranges("EURUSD", KIND_M1, DAY, DAY + 3600) == [(DAY, DAY + 3600)]
+
+    terminal.available_from = 0
+    assert len(store.get_bars("EURUSD", DAY, DAY + 3600)) == 60
+
+
+def test_terminal_error_leaves_gap(store, terminal):
+    terminal.fail = True
+    assert len(store.get_ticks("EURUSD", DAY, DAY + 60)) == 0
+    assert store.missing_ranges("EURUSD", KIND_TICKS, DAY, DAY + 60) == [(DAY, DAY + 60)]
+
+
+def test_coverage_persists(tmp_path, store, terminal):
+    store.get_bars("EURUSD", DAY, DAY + 3600)
+    calls = terminal.calls
+
+    reopened = MarketDataStore(tmp_path / "market_data", terminal)
+    assert len(reopened.get_bars("EURUSD", DAY, DAY + 3600)) == 60
+    assert terminal.calls == calls
+    assert reopened.symbols() == ["EURUSD"]
+
+
+def test_without_terminal_reads_cache_only(tmp_path, store):
+    store.get_bars("EURUSD", DAY, DAY + 600)
+    offline = MarketDataStore(tmp_path / "market_data")
+    assert len(offline.get_bars("EURUSD", DAY, DAY + 1200)) == 10
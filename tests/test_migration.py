@@ -0,0 +1,110 @@
+"""Migration alter Datenbanken und internierte Symbole"""
+
+import sqlite3
+from dataclasses import replace
+
+from drx_core import DatabaseManager, TradeFilter
+
+# Schema vor SCHEMA_VERSION (ohne db_meta, Symbol als Text je Zeile)
+V1_TRADES = '''
+    CREATE TABLE trades (
+        id TEXT PRIMARY KEY,
+        symbol TEXT NOT NULL,
+        type TEXT NOT NULL,
+        lots REAL NOT NULL,
+        open_price REAL NOT NULL,
+        close_price REAL,
+        open_time TEXT,
+        close_time TEXT,
+        profit REAL DEFAULT 0,
+        commission REAL DEFAULT 0,
+        swap REAL DEFAULT 0,
+        comment TEXT,
+        magic INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'open'
+    )
+'''
+
+V1_ROWS = [
+    ("1", "EURUSD", "buy", 0.1, 1.1, 1.2, "2023-01-02T09:00:00", "2023-01-02T10:00:00",
+     10.0, -0.5, 0.0, "breakout", 7, "closed"),
+    ("2", "GBPUSD", "sell", 0.2, 1.3, 1.25, "2023-01-02T11:00:00", "2023-01-03T08:00:00",
+     -4.0, -0.5, -0.1, "", 0, "closed"),
+    ("3", "EURUSD", "buy", 0.1, 1.15, None, "2023-01-04T09:00:00", None,
+     0.0, 0.0, 0.0, None, 0, "open"),
+]
+
+
+def create_v1(path):
+    conn = sqlite3.connect(path)
+    conn.execute(V1_TRADES)
+    conn.executemany("INSERT INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", V1_ROWS)
+    conn.commit()
+    conn.close()
+
+
+def columns(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return {info[1] for info in conn.execute(f"PRAGMA table_info({table})")}
+    finally:
+        conn.close()
+
+
+def test_migrate_v1(tmp_path):
+    path = tmp_path / "drx_trades.db"
+    create_v1(path)
+
+    db = DatabaseManager(str(path))
+    try:
+        assert {'symbol_id', 'rowversion'} <= columns(path, "trades")
+        assert 'symbol' not in columns(path, "trades")
+
+        trades = {t.id: t for t in db.iter_trades()}
+        assert [trades[i].symbol for i in "123"] == ["EURUSD", "GBPUSD", "EURUSD"]
+        assert trades["2"].swap == -0.1 and trades["1"].magic == 7
+        assert trades["3"].close_price is None and trades["3"].close_time is None
+
+        # Rollup und Volltextsuche über die übernommenen Trades
+        assert db.get_daily_pnl() == [("2023-01-02", 9.5, 1, 1), ("2023-01-03", -4.6, 1, 0)]
+        assert [t.id for t in db.search_trades(TradeFilter(text="break")).trades] == ["1"]
+        assert db.count_trades(TradeFilter(symbol="GBPUSD")) == 1
+
+        # Neue Änderungen landen im Log
+        version = db.get_generation()
+        db.save_trade(replace(trades["3"], profit=2.0)).result()
+        assert db.changes_since(version).changed_ids() == ["3"]
+    finally:
+        db.close()
+
+
+def test_reopen_keeps_data(tmp_path):
+    path = tmp_path / "drx_trades.db"
+    create_v1(path)
+    DatabaseManager(str(path)).close()
+
+    db = DatabaseManager(str(path))
+    try:
+        assert sorted(t.id for t in db.iter_trades()) == ["1", "2", "3"]
+        conn = sqlite3.connect(path)
+        version = conn.execute("SELECT value FROM db_meta WHERE key = 'schema_version'").fetchone()[0]
+        conn.close()
+        assert version == DatabaseManager.SCHEMA_VERSION
+    finally:
+        db.close()
+
+
+def test_symbols_are_stored_once(db, make_trade):
+    db.save_trades([make_trade(i, symbol="EURUSD" if i % 2 else "XAUUSD") for i in range(6)]).result()
+    db.save_trade(make_trade("x", symbol="EURUSD")).result()
+
+    conn = sqlite3.connect(db.db_file)
+    names = [name for (name,) in conn.execute("SELECT name FROM symbols ORDER BY name")]
+    conn.close()
+    assert names == ["EURUSD", "XAUUSD"]
+
+    trades = [t for t in db.iter_trades() if t.symbol == "EURUSD"]
+    assert len(trades) == 4
+    # Internierte Namen: ein String-Objekt je Symbol
+    assert len({id(t.symbol) for t in trades}) == 1
+
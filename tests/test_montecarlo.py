@@ -0,0 +1,75 @@
+"""Monte-Carlo: reproduzierbar und unabhängig von der Anzahl Prozesse"""
+
+import numpy as np
+import pytest
+
+import drx_montecarlo
+from drx_montecarlo import METHOD_BLOCK, METHOD_BOOTSTRAP, PERCENTILES, run_monte_carlo, simulate_paths
+
+
+@pytest.fixture
+def profits():
+    return np.random.default_rng(5).normal(3, 40, 300)
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    # Mehrere Batches, damit der Prozess-Pool wirklich verteilt
+    monkeypatch.setattr(drx_montecarlo, "BATCH_ELEMENTS", 300 * 250)
+
+
+def assert_same(a, b):
+    assert a.ruin_probability == b.ruin_probability
+    assert a.final_pnl == b.final_pnl
+    assert a.max_drawdown == b.max_drawdown
+    assert a.max_drawdown_pct == b.max_drawdown_pct
+    np.testing.assert_array_equal(a.band_x, b.band_x)
+    for p in PERCENTILES:
+        np.testing.assert_array_equal(a.bands[p], b.bands[p])
+
+
+@pytest.mark.parametrize("method", [METHOD_BOOTSTRAP, METHOD_BLOCK])
+def test_workers_do_not_change_result(profits, small_batches, method):
+    inline = run_monte_carlo(profits, n_paths=1000, method=method, initial_balance=1000.0, workers=0)
+    pooled = run_monte_carlo(profits, n_paths=1000, method=method, initial_balance=1000.0, workers=2)
+
+    assert inline.paths == pooled.paths == 1000
+    assert_same(inline, pooled)
+
+
+def test_pool_without_shared_memory(profits, small_batches, monkeypatch):
+    inline = run_monte_carlo(profits, n_paths=600, workers=0)
+    monkeypatch.setattr(drx_montecarlo, "shared_memory", None)
+    assert_same(inline, run_monte_carlo(profits, n_paths=600, workers=2))
+
+
+def test_seed_reproducible(profits):
+    assert_same(run_monte_carlo(profits, n_paths=500, seed=1, workers=0),
+                run_monte_carlo(profits, n_paths=500, seed=1, workers=0))
+    other = run_monte_carlo(profits, n_paths=500, seed=2, workers=0)
+    assert other.final_pnl != run_monte_carlo(profits, n_paths=500, seed=1, workers=0).final_pnl
+
+
+def test_simulate_paths_against_loop(profits):
+    checkpoints = np.array([0, 99, 299])
+    result = simulate_paths(profits, 50, np.random.default_rng(0), METHOD_BOOTSTRAP, 20,
+                            1000.0, 500.0, checkpoints)
+
+    # Dieselben Ziehungen nachbilden und Pfad für Pfad prüfen
+    draws = np.random.default_rng(0).integers(0, len(profits), size=(50, len(profits)),
+                                              dtype=np.int32)
+    for path in range(50):
+        equity = 1000.0 + np.cumsum(profits[draws[path]])
+        peak = np.maximum.accumulate(np.concatenate(([1000.0], equity)))[1:]
+        # Simulation rechnet in float32
+        assert result['final'][path] == pytest.approx(equity[-1] - 1000.0, abs=0.05)
+        assert result['max_dd'][path] == pytest.approx((peak - equity).max(), abs=0.05)
+        assert result['max_dd_pct'][path] == pytest.approx(((peak - equity) / peak).max() * 100,
+                                                           abs=0.01)
+        assert result['ruined'][path] == (equity <= 500.0).any()
+        np.testing.assert_allclose(result['bands'][path], equity[checkpoints] - 1000.0, atol=0.05)
+
+
+def test_empty_input():
+    result = run_monte_carlo(np.array([]), workers=0)
+    assert result.paths == 0 and result.ruin_probability == 0.0
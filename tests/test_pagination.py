@@ -0,0 +1,66 @@
+"""Keyset-Pagination und Filter (query_trades)"""
+
+import pytest
+
+from drx_core import TradeFilter
+
+
+def expected_order(trades, key, descending):
+    """Sortierung wie in SQLite: NULL aufsteigend vorne, absteigend hinten; dann id"""
+    present = sorted((t for t in trades if key(t) is not None), key=lambda t: (key(t), t.id),
+                     reverse=descending)
+    missing = sorted((t for t in trades if key(t) is None), key=lambda t: t.id, reverse=descending)
+    return [t.id for t in (present + missing if descending else missing + present)]
+
+
+@pytest.fixture
+def trades(db, make_trade):
+    """Gleiche Sortwerte in Gruppen, offene Trades ohne close_time, mehrere Symbole"""
+    symbols = ["EURUSD", "GBPUSD", "XAUUSD", "US30"]
+    items = [make_trade(f"t{i:03d}", symbol=symbols[i % 4], hours=i // 6, profit=float(i % 5))
+             for i in range(90)]
+    items += [make_trade(f"o{i:02d}", symbol=symbols[i % 3], hours=i // 2, status="open")
+              for i in range(13)]
+    db.save_trades(items).result()
+    return items
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 7, 100, 200])
+def test_keyset_open_time_with_ties(db, trades, descending, limit, fetch_all):
+    ids = fetch_all(lambda **kw: db.query_trades(sort='open_time', descending=descending, **kw),
+                    limit)
+    assert ids == expected_order(trades, lambda t: t.open_time, descending)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 5, 13, 50])
+def test_keyset_close_time_with_nulls(db, trades, descending, limit, fetch_all):
+    ids = fetch_all(lambda **kw: db.query_trades(sort='close_time', descending=descending, **kw),
+                    limit)
+    assert ids == expected_order(trades, lambda t: t.close_time, descending)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 6, 26, 500])
+def test_keyset_symbol(db, trades, descending, limit, fetch_all):
+    ids = fetch_all(lambda **kw: db.query_trades(sort='symbol', descending=descending, **kw),
+                    limit)
+    assert ids == expected_order(trades, lambda t: t.symbol, descending)
+
+
+def test_keyset_with_filter(db, trades, fetch_all):
+    trade_filter = TradeFilter(symbol="GBPUSD", status="closed")
+    ids = fetch_all(lambda **kw: db.query_trades(trade_filter, sort='profit', **kw), 4)
+    matching = [t for t in trades if t.symbol == "GBPUSD" and t.status == "closed"]
+    assert ids == expected_order(matching, lambda t: t.profit, True)
+
+
+def test_keyset_exact_page_boundary(db, make_trade):
+    db.save_trades([make_trade(i, hours=i) for i in range(10)]).result()
+
+    first = db.query_trades(limit=10)
+    assert len(first.trades) == 10
+    # Volle letzte Seite: die Folgeseite ist leer und beendet die Pagination
+    last = db.query_trades(limit=10, after=first.next_key)
+    assert last.trades == [] and last.next_key is None
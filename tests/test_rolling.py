@@ -0,0 +1,152 @@
+"""Rollierende Fenster: inkrementell, vektorisiert und direkt gerechnet"""
+
+import numpy as np
+import pytest
+
+from drx_analytics import RollingMetrics, RollingWindow, load_closed_trades, rolling_series
+
+
+def direct(values, size):
+    tail = np.asarray(values[-size:], dtype=np.float64)
+    return {
+        'trades': len(tail),
+        'win_rate': (tail > 0).mean() * 100,
+        'expectancy': tail.mean(),
+        'volatility': tail.std(ddof=1) if len(tail) > 1 else 0.0,
+        'best': tail.max(),
+        'worst': tail.min(),
+    }
+
+
+def assert_window(snapshot, values, size):
+    for key, value in direct(values, size).items():
+        assert snapshot[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+@pytest.fixture
+def net():
+    return np.random.default_rng(11).normal(2, 50, 400).round(2)
+
+
+def test_window_append(net):
+    window = RollingWindow(20)
+    for i, value in enumerate(net, start=1):
+        window.append(value)
+        if i in (1, 2, 19, 20, 21, 137, 400):
+            snapshot = {'trades': window.filled, 'win_rate': window.win_rate,
+                        'expectancy': window.expectancy, 'volatility': window.volatility,
+                        'best': window.maximum, 'worst': window.minimum}
+            assert_window(snapshot, net[:i], 20)
+
+
+def test_rolling_series(net):
+    series = rolling_series(net, 50)
+    for i in (1, 2, 49, 50, 51, 400):
+        expected = direct(net[:i], 50)
+        assert series['expectancy'][i - 1] == pytest.approx(expected['expectancy'])
+        assert series['volatility'][i - 1] == pytest.approx(expected['volatility'])
+        assert series['win_rate'][i - 1] == pytest.approx(expected['win_rate'])
+
+
+@pytest.mark.parametrize("count", [0, 1, 30, 400])
+def test_initialize_then_extend(net, count):
+    metrics = RollingMetrics()
+    metrics.initialize(net[:count])
+    metrics.extend(net[count:])
+
+    assert metrics.count == len(net)
+    for size, snapshot in metrics.snapshot().items():
+        assert_window(snapshot, net, size)
+
+
+def test_can_extend():
+    metrics = RollingMetrics()
+    metrics.initialize(np.array([1.0, 2.0]), np.array([100, 200]))
+
+    assert metrics.can_extend(np.array([200, 300]))
+    assert not metrics.can_extend(np.array([150]))
+    metrics.extend([3.0], np.array([300]))
+    assert metrics.last_close_time == 300
+    assert metrics.can_extend(np.array([], dtype=np.int64))
+
+
+def test_load_closed_trades_by_id(db, make_trade):
+    db.save_trades([make_trade(i, hours=i, profit=float(i)) for i in range(6)]).result()
+    db.save_trade(make_trade("open", status="open")).result()
+
+    arrays = load_closed_trades(db, ids=["4", "1", "open", "missing"])
+    assert arrays.profit.tolist() == [1.0, 4.0]
+    assert len(load_closed_trades(db, ids=[])) == 0
+
+
+class CountingMetrics(RollingMetrics):
+    """Zählt vollständige Neuberechnungen"""
+
+    def __init__(self):
+        super().__init__()
+        self.initializations = 0
+
+    def initialize(self, net, close_time=None):
+        self.initializations += 1
+        super().initialize(net, close_time)
+
+
+def assert_matches_db(metrics, db):
+    net = load_closed_trades(db).net
+    for size, snapshot in metrics.snapshot().items():
+        assert_window(snapshot, net, size)
+
+
+def test_refresh_appends_new_trades(db, make_trade):
+    metrics = CountingMetrics()
+    db.save_trades([make_trade(i, hours=i, profit=float(i % 7 - 3)) for i in range(60)]).result()
+    metrics.refresh(db)
+
+    db.save_trades([make_trade(i, hours=i, profit=float(i % 5 - 1)) for i in range(60, 70)]).result()
+    # Offener Trade wird geschlossen: Änderung, aber noch nicht gezählt
+    db.save_trade(make_trade("late", status="open")).result()
+    metrics.refresh(db)
+    db.save_trade(make_trade("late", hours=80, profit=-4.0)).result()
+    metrics.refresh(db)
+
+    assert metrics.initializations == 1
+    assert metrics.count == 71
+    assert_matches_db(metrics, db)
+
+
+def test_refresh_after_delete_and_insert(db, make_trade):
+    metrics = CountingMetrics()
+    db.save_trades([make_trade(i, hours=i, profit=float(i)) for i in range(30)]).result()
+    metrics.refresh(db)
+
+    # Anzahl bleibt gleich - das Änderungs-Log zeigt die Löschung
+    db.writer.submit(lambda cursor: cursor.execute("DELETE FROM trades WHERE id = '29'")).result()
+    db.save_trade(make_trade("new", hours=40, profit=-100.0)).result()
+    metrics.refresh(db)
+
+    assert metrics.initializations == 2
+    assert_matches_db(metrics, db)
+
+
+def test_refresh_after_update(db, make_trade):
+    metrics = CountingMetrics()
+    db.save_trades([make_trade(i, hours=i, profit=float(i)) for i in range(30)]).result()
+    metrics.refresh(db)
+
+    db.save_trade(make_trade(29, hours=29, profit=-500.0)).result()
+    metrics.refresh(db)
+
+    assert metrics.initializations == 2
+    assert_matches_db(metrics, db)
+
+
+def test_refresh_out_of_order(db, make_trade):
+    metrics = CountingMetrics()
+    db.save_trades([make_trade(i, hours=i, profit=float(i)) for i in range(30)]).result()
+    metrics.refresh(db)
+
+    db.save_trade(make_trade("early", hours=-5, profit=-50.0)).result()
+    metrics.refresh(db)
+
+    assert metrics.initializations == 2
+    assert_matches_db(metrics, db)
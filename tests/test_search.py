@@ -0,0 +1,50 @@
+"""Volltextsuche über Kommentare (search_trades, FTS5)"""
+
+from datetime import datetime
+
+import pytest
+
+from drx_core import TradeFilter
+
+
+@pytest.fixture
+def searchable(db, make_trade):
+    if not db.search_available:
+        pytest.skip("SQLite ohne FTS5")
+    comments = ["scalping london", "swing trade", "rescalp test", "scalp news", "london breakout"]
+    items = [make_trade(i, hours=i, comment=comments[i % len(comments)]) for i in range(60)]
+    db.save_trades(items).result()
+    return items
+
+
+def test_search_prefix_boundaries(db, searchable):
+    def found(text):
+        return {t.id for t in db.search_trades(TradeFilter(text=text), limit=1000).trades}
+
+    def expected(*words):
+        return {t.id for t in searchable if any(w in t.comment.split() for w in words)}
+
+    # Präfix am Wortanfang, nicht mitten im Wort
+    assert found("scalp") == expected("scalping", "scalp")
+    assert found("rescalp") == expected("rescalp")
+    assert found("calp") == set()
+    # Alle Wörter müssen vorkommen
+    assert found("lond scal") == expected("scalping")
+    assert found('"quoted') == set()
+
+
+@pytest.mark.parametrize("limit", [1, 4, 24, 25])
+def test_search_pagination(db, searchable, limit, fetch_all):
+    trade_filter = TradeFilter(text="london")
+    ids = fetch_all(lambda **kw: db.search_trades(trade_filter, **kw), limit)
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {t.id for t in searchable if "london" in t.comment}
+
+
+def test_search_with_filter(db, searchable, fetch_all):
+    trade_filter = TradeFilter(text="scalp", open_to=datetime(2023, 1, 3))
+    ids = fetch_all(lambda **kw: db.search_trades(trade_filter, **kw), 3)
+    assert set(ids) == {t.id for t in searchable
+                        if t.comment.split()[0] in ("scalping", "scalp")
+                        and t.open_time < datetime(2023, 1, 3)}
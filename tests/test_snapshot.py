@@ -0,0 +1,77 @@
+"""Dashboard-Snapshot: Ausdünnen, Round-Trip und Verwerfen ungültiger Stände"""
+
+import json
+
+import pytest
+
+from drx_snapshot import EQUITY_POINTS, TRADES_PAGE, downsample, load_snapshot, save_snapshot
+
+
+@pytest.fixture
+def data():
+    return {
+        'generation': 42,
+        'summary': {'total_trades': 3, 'total_pnl': 12.5},
+        'stats': {'win_rate': 66.7, 'profit_factor': float('inf'), 'sharpe': None},
+        'rolling': {20: {'trades': 3, 'win_rate': 66.7}},
+        'equity': [(f"2024-01-{i % 28 + 1:02d}", float(i)) for i in range(2000)],
+        'trades': [[str(i), "EURUSD"] for i in range(250)],
+    }
+
+
+def test_downsample():
+    points = list(range(1001))
+    thinned = downsample(points, 11)
+    assert thinned == list(range(0, 1001, 100))
+    assert downsample(points[:5], 11) == points[:5]
+    assert downsample(points, 1) == [1000]
+
+
+def test_round_trip(tmp_path, data):
+    path = str(tmp_path / "snapshot.json")
+    assert save_snapshot(path, "a.db", data)
+
+    snapshot = load_snapshot(path, "a.db")
+
+    assert snapshot['generation'] == 42
+    assert snapshot['summary'] == data['summary']
+    assert snapshot['stats']['profit_factor'] == float('inf')
+    assert snapshot['rolling'] == {20: {'trades': 3, 'win_rate': 66.7}}
+    assert len(snapshot['equity']) == EQUITY_POINTS
+    assert snapshot['equity'][-1] == list(data['equity'][-1])
+    assert len(snapshot['trades']) == TRADES_PAGE
+    assert not (tmp_path / "snapshot.json.tmp").exists()
+
+
+def test_incomplete_data_not_saved(tmp_path, data):
+    data['rolling'] = None
+    path = tmp_path / "snapshot.json"
+    assert not save_snapshot(str(path), "a.db", data)
+    assert not path.exists()
+
+
+def test_rejects_other_database(tmp_path, data):
+    path = str(tmp_path / "snapshot.json")
+    save_snapshot(path, "a.db", data)
+    assert load_snapshot(path, "b.db") is None
+
+
+@pytest.mark.parametrize("change", [
+    lambda snapshot: snapshot.update(version=1),
+    lambda snapshot: snapshot.pop('trades'),
+])
+def test_rejects_old_or_incomplete_snapshot(tmp_path, data, change):
+    path = tmp_path / "snapshot.json"
+    save_snapshot(str(path), "a.db", data)
+    snapshot = json.loads(path.read_text())
+    change(snapshot)
+    path.write_text(json.dumps(snapshot))
+
+    assert load_snapshot(str(path), "a.db") is None
+
+
+def test_missing_or_corrupt_file(tmp_path):
+    path = tmp_path / "snapshot.json"
+    assert load_snapshot(str(path), "a.db") is None
+    path.write_text("{kaputt")
+    assert load_snapshot(str(path), "a.db") is None
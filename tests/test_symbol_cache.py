@@ -0,0 +1,81 @@
+"""SymbolCache: TTL, Fehltreffer und Speichern in symbols"""
+
+from datetime import datetime
+
+import pytest
+
+import drx_core
+from drx_core import SymbolCache, SymbolInfo
+
+UPDATED = datetime(2023, 1, 2, 9)
+
+
+@pytest.fixture
+def symbol_broker(broker):
+    broker.symbol_infos = [
+        SymbolInfo("EURUSD", digits=5, updated_at=UPDATED),
+        SymbolInfo("XAUUSD", digits=2, point=0.01, tick_size=0.01, updated_at=UPDATED),
+    ]
+    return broker
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(drx_core, "SYMBOL_INFO_RETRY", 0)
+
+
+def test_infos_are_saved_for_traded_symbols(db, make_trade, symbol_broker):
+    db.save_trade(make_trade("1", symbol="XAUUSD")).result()
+    cache = SymbolCache(db)
+
+    assert cache.refresh_if_stale(symbol_broker, {"XAUUSD"})
+    db.flush()
+
+    # Nur gehandelte Symbole landen in der Datenbank
+    stored = db.get_symbol_infos()
+    assert list(stored) == ["XAUUSD"]
+    assert stored["XAUUSD"].digits == 2 and stored["XAUUSD"].updated_at == UPDATED
+    assert cache.format_price("EURUSD", 1.1) == "1.10000"
+    assert cache.format_price("XAUUSD", 1900) == "1900.00"
+    assert cache.format_price("UNKNOWN", 1) == "1.00000"
+
+    # Neuer Cache startet mit dem gespeicherten Stand
+    assert SymbolCache(db).get("XAUUSD").point == 0.01
+
+
+def test_fresh_cache_does_not_refresh(db, symbol_broker):
+    cache = SymbolCache(db)
+    cache.refresh(symbol_broker)
+
+    assert not cache.refresh_if_stale(symbol_broker, {"EURUSD"})
+    assert symbol_broker.symbol_requests == 1
+
+    cache.refreshed -= cache.ttl + 1
+    assert cache.refresh_if_stale(symbol_broker)
+    assert symbol_broker.symbol_requests == 2
+
+
+def test_missing_symbol_waits_for_miss_ttl(db, symbol_broker):
+    cache = SymbolCache(db, miss_ttl=3600)
+
+    assert cache.refresh_if_stale(symbol_broker, {"EURUSD", "BTCUSD"})
+    assert "BTCUSD" in cache.misses
+    # Fehltreffer löst innerhalb der miss_ttl keinen Abruf aus
+    assert not cache.refresh_if_stale(symbol_broker, {"BTCUSD"})
+    assert symbol_broker.symbol_requests == 1
+
+    cache.miss_ttl = 0
+    assert cache.refresh_if_stale(symbol_broker, {"BTCUSD"})
+    assert symbol_broker.symbol_requests == 2
+
+
+def test_retry_delay_after_attempt(db, symbol_broker, monkeypatch):
+    monkeypatch.setattr(drx_core, "SYMBOL_INFO_RETRY", 60)
+    symbol_broker.symbol_infos = []
+    cache = SymbolCache(db)
+
+    assert not cache.refresh_if_stale(symbol_broker)
+    assert not cache.refresh_if_stale(symbol_broker)
+    # Leere Antwort: ein Versuch, danach Pause bis SYMBOL_INFO_RETRY
+    assert symbol_broker.symbol_requests == 1
+    assert cache.refreshed == 0
@@ -0,0 +1,26 @@
+"""Trade mit __slots__"""
+
+from dataclasses import asdict, fields, replace
+
+import pytest
+
+from drx_core import Trade
+
+
+def test_trade_has_slots_instead_of_dict():
+    trade = Trade(id="1", symbol="EURUSD", type="buy", lots=0.1, open_price=1.1)
+
+    assert not hasattr(trade, "__dict__")
+    assert Trade.__slots__ == tuple(f.name for f in fields(Trade))
+    with pytest.raises(AttributeError):
+        trade.note = "x"
+
+
+def test_slotted_trade_behaves_like_dataclass():
+    trade = Trade(id="1", symbol="EURUSD", type="buy", lots=0.1, open_price=1.1)
+    closed = replace(trade, close_price=1.2, status="closed")
+
+    assert trade.status == "open" and trade.comment == "" and trade.close_price is None
+    assert closed == Trade(id="1", symbol="EURUSD", type="buy", lots=0.1, open_price=1.1,
+                           close_price=1.2, status="closed")
+    assert asdict(closed)["close_price"] == 1.2
@@ -0,0 +1,130 @@
+"""Write-Behind: ein Schreib-Thread, Reihenfolge, Fehler je Auftrag, Zusammenfassen"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from drx_core import DatabaseWriter
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = str(tmp_path / "writer.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE log (id INTEGER PRIMARY KEY, value TEXT UNIQUE)")
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def writer(db_file):
+    writer = DatabaseWriter(db_file, flush_interval=0.01)
+    yield writer
+    writer.close()
+
+
+def read(db_file):
+    conn = sqlite3.connect(db_file)
+    try:
+        return [row[0] for row in conn.execute("SELECT value FROM log ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def insert(value):
+    return lambda cursor: cursor.execute("INSERT INTO log (value) VALUES (?)", (value,)).lastrowid
+
+
+def test_jobs_run_in_submit_order(writer, db_file):
+    futures = [writer.submit(insert(f"v{i}")) for i in range(500)]
+    assert [f.result(5) for f in futures] == list(range(1, 501))
+    assert read(db_file) == [f"v{i}" for i in range(500)]
+    assert writer.metrics()['jobs'] == 500
+    assert writer.metrics()['batches'] < 500
+
+
+def test_order_from_several_threads(writer, db_file):
+    def producer(name):
+        for i in range(100):
+            writer.submit(insert(f"{name}-{i:03d}"))
+
+    threads = [threading.Thread(target=producer, args=(name,)) for name in "abc"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert writer.flush(5)
+
+    values = read(db_file)
+    for name in "abc":
+        own = [value for value in values if value.startswith(name)]
+        assert own == sorted(own) and len(own) == 100
+
+
+def test_failed_job_only_rolls_back_itself(writer, db_file):
+    def partial_then_fail(cursor):
+        cursor.execute("INSERT INTO log (value) VALUES ('partial')")
+        cursor.execute("INSERT INTO log (value) VALUES ('a')")  # UNIQUE verletzt
+
+    first = writer.submit(insert("a"))
+    failing = writer.submit(partial_then_fail)
+    last = writer.submit(insert("b"))
+
+    assert first.result(5) and last.result(5)
+    with pytest.raises(sqlite3.IntegrityError):
+        failing.result(5)
+    assert read(db_file) == ["a", "b"]
+    assert writer.metrics()['failed'] == 1
+
+
+def test_result_only_after_commit(writer, db_file):
+    seen = []
+    future = writer.submit(insert("visible"))
+    future.add_done_callback(lambda f: seen.append(read(db_file)))
+    future.result(5)
+    writer.flush(5)
+    assert seen == [["visible"]]
+
+
+def test_same_key_is_coalesced(db_file):
+    writer = DatabaseWriter(db_file, flush_interval=0.2)
+    try:
+        # Alle innerhalb eines Intervalls eingereiht: ein Batch
+        futures = [writer.submit(insert(f"k{i}"), key="same") for i in range(5)]
+
+        assert {f.result(5) for f in futures} == {futures[-1].result()}
+        assert read(db_file) == ["k4"]
+        assert writer.metrics()['coalesced'] == 4
+    finally:
+        writer.close()
+
+
+def test_close_writes_pending_jobs_and_rejects_new(db_file):
+    writer = DatabaseWriter(db_file, flush_interval=0.5)
+    futures = [writer.submit(insert(f"c{i}")) for i in range(20)]
+    writer.close()
+
+    assert all(f.done() for f in futures)
+    assert len(read(db_file)) == 20
+    with pytest.raises(RuntimeError):
+        writer.submit(insert("late")).result(1)
+
+
+def test_account_sample_cache_only_after_success(db):
+    db.writer.submit(lambda cursor: cursor.execute("ALTER TABLE account_samples RENAME TO hidden")).result()
+    info = {'login': 7, 'balance': 100.0, 'equity': 100.0, 'margin': 0.0, 'margin_level': 0.0}
+
+    failed = db.save_account_sample(info, at=1000)
+    with pytest.raises(sqlite3.OperationalError):
+        failed.result(5)
+    db.flush()
+    assert 7 not in db._account_samples
+
+    db.writer.submit(lambda cursor: cursor.execute("ALTER TABLE hidden RENAME TO account_samples")).result()
+    # Derselbe Wert wird erneut geschrieben, da der erste Versuch fehlschlug
+    assert db.save_account_sample(info, at=1001).result(5) is None
+    db.flush()
+    assert db._account_samples[7][0] == 1001
+    assert db.save_account_sample(info, at=1002) is None